@@ -2,12 +2,44 @@
 This is the 'chess' package. It contains classes 
 related to chess and chess functionality.
 
+The chess logic (positions, moves, FEN, rules and the engine) does not
+depend on pygame or tkinter. The GUI classes (Board, Square, Move and
+PieceCreator) are views on top of it, and are only imported when they
+are used, so that the package can be used without a display.
+
 7/12/2021 - Berk Erdemoglu
 """
 
+import importlib
 
-from .square import Square
-from .board import Board
-from .move import Move
+from .position import Position, encode_move, move_to_uci
+from .transposition import TranspositionTable
+from .engine import Engine
+from .polyglot import PolyglotBook, polyglot_key
+from .tablebase import Tablebase
 from .chess_constants import ChessColor, DEFAULT_POSITION_FEN
-from .piece import PieceCreator
+
+
+# The modules the GUI classes are defined in
+_GUI_MODULES = {
+	'Square': '.square',
+	'Board': '.board',
+	'Move': '.move',
+	'PieceCreator': '.piece',
+}
+
+# Modules that can be run with python -m, importing them here would make runpy warn
+_CLI_MODULES = {
+	'perft': '.perft',
+	'divide': '.perft',
+}
+
+
+def __getattr__(name: str):
+	"""Import the GUI classes and the command line modules only when they are used."""
+	module_name = _GUI_MODULES.get(name) or _CLI_MODULES.get(name)
+	if module_name is not None:
+		module = importlib.import_module(module_name, __name__)
+		return getattr(module, name)
+
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
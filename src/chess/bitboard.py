@@ -0,0 +1,265 @@
+"""
+Bitboard utilities.
+
+A bitboard is a 64-bit integer where bit i stands for the square with
+index i in the board's square list, so a8 is bit 0 and h1 is bit 63.
+Moving 'up' the board (towards rank 8) is a right shift by 8.
+"""
+
+# Type annotations
+from typing import Dict, Iterator, List, Tuple
+
+from .chess_constants import WHITE
+
+
+# Define what can be imported from this module
+__all__ = [
+	'FULL', 'FILE_A', 'FILE_H', 'RANK_1', 'RANK_2', 'RANK_4',
+	'RANK_5', 'RANK_7', 'RANK_8', 'iter_bits', 'lsb', 'popcount',
+	'KNIGHT_ATTACKS', 'KING_ATTACKS', 'PAWN_ATTACKS',
+	'KNIGHT_TARGETS', 'KING_TARGETS', 'PAWN_TARGETS',
+	'knight_attacks', 'king_attacks', 'pawn_attacks',
+	'ROOK_MASKS', 'ROOK_TABLES', 'BISHOP_MASKS', 'BISHOP_TABLES',
+	'rook_attacks', 'bishop_attacks', 'queen_attacks', 'between'
+]
+
+
+# Masks
+FULL = (1 << 64) - 1
+
+FILE_A = 0x0101010101010101
+FILE_B = FILE_A << 1
+FILE_G = FILE_A << 6
+FILE_H = FILE_A << 7
+
+NOT_FILE_A = FULL ^ FILE_A
+NOT_FILE_H = FULL ^ FILE_H
+NOT_FILE_AB = FULL ^ (FILE_A | FILE_B)
+NOT_FILE_GH = FULL ^ (FILE_G | FILE_H)
+
+RANK_8 = 0xFF
+RANK_7 = RANK_8 << 8
+RANK_5 = RANK_8 << 24
+RANK_4 = RANK_8 << 32
+RANK_2 = RANK_8 << 48
+RANK_1 = RANK_8 << 56
+
+
+#############################
+######### UTILITIES #########
+#############################
+
+
+def iter_bits(bb: int) -> Iterator[int]:
+	"""Yield the index of every set bit, lowest first."""
+	while bb:
+		low = bb & -bb
+		yield low.bit_length() - 1
+		bb ^= low
+
+
+def lsb(bb: int) -> int:
+	"""Return the index of the lowest set bit."""
+	return (bb & -bb).bit_length() - 1
+
+
+def popcount(bb: int) -> int:
+	"""Return the number of set bits."""
+	return bin(bb).count('1')
+
+
+#############################
+########## ATTACKS ##########
+#############################
+
+
+def _knight_attacks(b: int) -> int:
+	"""Shift a bitboard to the squares a knight on it attacks."""
+	l1 = (b >> 1) & NOT_FILE_H
+	l2 = (b >> 2) & NOT_FILE_GH
+	r1 = (b << 1) & NOT_FILE_A
+	r2 = (b << 2) & NOT_FILE_AB
+
+	h1 = l1 | r1
+	h2 = l2 | r2
+
+	return ((h1 << 16) | (h1 >> 16) | (h2 << 8) | (h2 >> 8)) & FULL
+
+
+def _king_attacks(b: int) -> int:
+	"""Shift a bitboard to the squares a king on it attacks."""
+	row = b | ((b << 1) & NOT_FILE_A) | ((b >> 1) & NOT_FILE_H)
+
+	return ((row | (row << 8) | (row >> 8)) & FULL) ^ b
+
+
+def _pawn_attacks(b: int, color: int) -> int:
+	"""Shift a bitboard to the squares a pawn of the given color on it attacks."""
+	if color == WHITE:
+		return ((b >> 9) & NOT_FILE_H) | ((b >> 7) & NOT_FILE_A)
+
+	return (((b << 7) & NOT_FILE_H) | ((b << 9) & NOT_FILE_A)) & FULL
+
+
+# Leaper attacks, built once and indexed by square
+KNIGHT_ATTACKS: Tuple[int, ...] = tuple(_knight_attacks(1 << square) for square in range(64))
+KING_ATTACKS: Tuple[int, ...] = tuple(_king_attacks(1 << square) for square in range(64))
+
+# Indexed by color, then by square
+PAWN_ATTACKS: Tuple[Tuple[int, ...], ...] = tuple(
+	tuple(_pawn_attacks(1 << square, color) for square in range(64)) for color in range(2)
+)
+
+# The same attacks as lists of target squares
+KNIGHT_TARGETS: Tuple[Tuple[int, ...], ...] = tuple(tuple(iter_bits(bb)) for bb in KNIGHT_ATTACKS)
+KING_TARGETS: Tuple[Tuple[int, ...], ...] = tuple(tuple(iter_bits(bb)) for bb in KING_ATTACKS)
+PAWN_TARGETS: Tuple[Tuple[Tuple[int, ...], ...], ...] = tuple(
+	tuple(tuple(iter_bits(bb)) for bb in table) for table in PAWN_ATTACKS
+)
+
+
+def knight_attacks(square: int) -> int:
+	"""Get the squares a knight on the given square attacks."""
+	return KNIGHT_ATTACKS[square]
+
+
+def king_attacks(square: int) -> int:
+	"""Get the squares a king on the given square attacks."""
+	return KING_ATTACKS[square]
+
+
+def pawn_attacks(square: int, color: int) -> int:
+	"""Get the squares a pawn of the given color on the given square attacks."""
+	return PAWN_ATTACKS[color][square]
+
+
+# (shift, mask of squares that are still valid after the shift)
+_ROOK_RAYS: Tuple[Tuple[int, int], ...] = ((-8, FULL), (8, FULL), (1, NOT_FILE_A), (-1, NOT_FILE_H))
+_BISHOP_RAYS: Tuple[Tuple[int, int], ...] = (
+	(-9, NOT_FILE_H), (-7, NOT_FILE_A), (7, NOT_FILE_H), (9, NOT_FILE_A)
+)
+
+
+def _slide(square: int, occupied: int, rays: Tuple[Tuple[int, int], ...]) -> int:
+	"""Walk the given rays until a blocker or the edge of the board."""
+	attacks = 0
+
+	for shift, mask in rays:
+		b = 1 << square
+		while True:
+			b = (b << shift if shift > 0 else b >> -shift) & mask & FULL
+			if not b:
+				break
+
+			attacks |= b
+			if b & occupied:
+				# The ray is blocked, the blocker itself is attacked
+				break
+
+	return attacks
+
+
+def _subsets(mask: int) -> Iterator[int]:
+	"""Yield every subset of the bits of a mask, the empty set first."""
+	subset = 0
+	while True:
+		yield subset
+		subset = (subset - mask) & mask
+		if not subset:
+			return
+
+
+def _init_slider_tables(rays: Tuple[Tuple[int, int], ...]) -> Tuple[List[int], List[Dict[int, int]]]:
+	"""
+	Build the blocker masks and attack tables of a slider. The mask of a
+	square holds the squares whose occupancy changes the attacks, which
+	leaves out the last square of every ray. The table of a square maps
+	every subset of the mask to the attacked squares. The attacks are
+	built ray by ray, since a ray only depends on its own blockers.
+	"""
+	masks = []
+	tables = []
+
+	for square in range(64):
+		ray_tables = []
+		for ray in rays:
+			ray_attacks = _slide(square, 0, (ray,))
+
+			# The last square of the ray is attacked whatever stands on it
+			ray_mask = 0
+			if ray_attacks:
+				last = ray_attacks.bit_length() - 1 if ray[0] > 0 else lsb(ray_attacks)
+				ray_mask = ray_attacks ^ (1 << last)
+
+			ray_tables.append(
+				(ray_mask, {blockers: _slide(square, blockers, (ray,)) for blockers in _subsets(ray_mask)})
+			)
+
+		mask = 0
+		for ray_mask, _ in ray_tables:
+			mask |= ray_mask
+
+		(mask_1, table_1), (mask_2, table_2), (mask_3, table_3), (mask_4, table_4) = ray_tables
+		tables.append({
+			blockers: (
+				table_1[blockers & mask_1] | table_2[blockers & mask_2]
+				| table_3[blockers & mask_3] | table_4[blockers & mask_4]
+			)
+			for blockers in _subsets(mask)
+		})
+		masks.append(mask)
+
+	return masks, tables
+
+
+# Slider attacks indexed by square, then by the blockers inside the mask of the square:
+# ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+ROOK_MASKS, ROOK_TABLES = _init_slider_tables(_ROOK_RAYS)
+BISHOP_MASKS, BISHOP_TABLES = _init_slider_tables(_BISHOP_RAYS)
+
+
+def rook_attacks(square: int, occupied: int) -> int:
+	"""Get the squares a rook on the given square attacks."""
+	return ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+	"""Get the squares a bishop on the given square attacks."""
+	return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+def queen_attacks(square: int, occupied: int) -> int:
+	"""Get the squares a queen on the given square attacks."""
+	return (
+		ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+		| BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+	)
+
+
+def _init_between():
+	"""Build the table of squares strictly between two aligned squares."""
+	table = [0] * 4096
+
+	for square in range(64):
+		row, col = divmod(square, 8)
+
+		for d_row, d_col in ((-1, 0), (1, 0), (0, 1), (0, -1), (-1, -1), (-1, 1), (1, -1), (1, 1)):
+			passed = 0
+			r, c = row + d_row, col + d_col
+
+			while 0 <= r < 8 and 0 <= c < 8:
+				target = r*8 + c
+				table[square*64 + target] = passed
+				passed |= 1 << target
+				r, c = r + d_row, c + d_col
+
+	return table
+
+
+# Indexed by from_square*64 + to_square, empty if the squares are not aligned
+BETWEEN = _init_between()
+
+
+def between(square_a: int, square_b: int) -> int:
+	"""Get the squares strictly between two squares on a line, empty if they are not on one."""
+	return BETWEEN[square_a*64 + square_b]
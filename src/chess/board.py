@@ -1,31 +1,42 @@
 # Type annotations
-from typing import List, Tuple, Dict, Union, Type
+from typing import Iterator, List, Tuple, Dict, Union, Type, ValuesView
 
 import pygame as pg
 
-from graphics import Renderable
-from utils import point_in_rect
+from graphics import Renderable, BACKGROUND_COLOR
 
 # Chess stuff
-from .piece import BasePiece
+from .piece import BasePiece, PieceCreator, PIECE_CLASSES
 from .square import Square
 from fen_parser.fen_parser import FENParser
-from .chess_constants import ChessColor
+from .chess_constants import ChessColor, COLOR_INDEX, INDEX_COLOR, WHITE, PAWN, KING
 from .move import Move
+from .position import Position, CASTLING_ROOK
+from .bitboard import iter_bits
 
 
 class BoardCoordinate(Renderable):
 	"""A class that handles drawing coordinates around the board."""
 	RENDER_FONT_PROPERTIES = ('monospace', 18)
 	RENDER_FONT_COLOR = (32, 30, 31)
-	RENDER_FONT = pg.font.SysFont(*RENDER_FONT_PROPERTIES)
+	_render_font: Union[pg.font.Font, None] = None
 
 	def __init__(self, coordinate: str, pos: Tuple[int, int]):
 		"""Initialize the coordinate and its position on the screen."""
-		self.label = BoardCoordinate.RENDER_FONT.render(
+		self.label = BoardCoordinate.get_render_font().render(
 				coordinate, True, BoardCoordinate.RENDER_FONT_COLOR
 			)
 		self.pos = pos
+		self.rect = self.label.get_rect(topleft=pos)
+
+	@classmethod
+	def get_render_font(cls) -> pg.font.Font:
+		"""Get the font of the labels, it is loaded the first time it is needed."""
+		if cls._render_font is None:
+			pg.font.init()
+			cls._render_font = pg.font.SysFont(*cls.RENDER_FONT_PROPERTIES)
+
+		return cls._render_font
 
 	def render(self, surface) -> None:
 		"""Render the coordinate label."""
@@ -35,16 +46,32 @@ class BoardCoordinate(Renderable):
 class Board:
 	"""Represents the chessboard."""
 	
-	def __init__(self, screen: pg.Surface, fen_str: str):
+	def __init__(
+			self, screen: pg.Surface, fen_str: str,
+			background_color: Tuple[int, int, int] = BACKGROUND_COLOR
+	):
 		"""Initialize the chessboard."""
 		self.screen = screen
+		self.background_color = background_color
 		self.board_coordinates: List[BoardCoordinate]  # visual coordinates around the board
 
 		self.squares: List[Square] = []
-		self.pieces: List[BasePiece] = []
 		self.piece_dict: Dict[Square: BasePiece] = {}
-		self.move_turn: ChessColor
-		self._move_number: int = 0
+
+		# (moving piece, captured piece) for every move made, to take moves back
+		self._undo_stack: List[Tuple[BasePiece, Union[BasePiece, None]]] = []
+
+		# What was drawn in the last frame, to find what changed since
+		self._rendered_highlights: List[Union[Tuple, None]] = [None]*64
+		self._rendered_pieces: Dict[BasePiece, pg.Rect] = {}
+
+		# The squares and coordinates drawn once, and what they were drawn with
+		self._background: Union[pg.Surface, None] = None
+		self._background_rect: Union[pg.Rect, None] = None
+		self._background_key: Union[Tuple, None] = None
+
+		# The bitboard position, this is defined in the FEN parser
+		self.position: Position
 
 		# Declare the king variables here, these will be defined in the FEN parser
 		self.white_king: King
@@ -63,17 +90,77 @@ class Board:
 
 		# Pieces
 		self._setup_pieces(fen_str)
-		self.update_piece_dict()
 
 		# Coordinates around the board (for graphics/GUI)
 		self.board_coordinates = self._setup_coordinates()
 
-	def update_piece_dict(self) -> None:
-		"""Update the piece dictionary to match the current position on the board."""
-		self.piece_dict.clear()
+	@property
+	def pieces(self) -> ValuesView[BasePiece]:
+		"""The pieces on the board."""
+		return self.piece_dict.values()
 
-		for piece in self.pieces:
-			self.piece_dict[piece.square] = piece
+	def push(self, move: int) -> None:
+		"""
+		Make an encoded legal move on the board. Only the pieces that the
+		move touches are relocated, and the move can be taken back with pop().
+		"""
+		position = self.position
+		from_index = move & 63
+		to_index = (move >> 6) & 63
+		promotion = move >> 12
+		code = position.piece_at(from_index)
+
+		piece = self.piece_dict.pop(self.squares[from_index])
+		captured = self.piece_dict.pop(self.squares[to_index], None)
+
+		if code % 6 == PAWN and to_index == position.ep_square:
+			# En passant, the captured pawn is behind the TO square
+			behind = to_index + (8 if code // 6 == WHITE else -8)
+			captured = self.piece_dict.pop(self.squares[behind])
+		elif code % 6 == KING and abs(to_index - from_index) == 2:
+			# Castling, move the rook as well
+			rook_from, rook_to = CASTLING_ROOK[to_index]
+			self._relocate_piece(self.squares[rook_from], self.squares[rook_to])
+
+		moved_piece = piece
+		if promotion:
+			moved_piece = PieceCreator.create_piece(
+					PIECE_CLASSES[promotion], piece.color, piece.square, self.screen
+				)
+
+		moved_piece.move_piece(self.squares[to_index], self.screen)
+		self.piece_dict[moved_piece.square] = moved_piece
+
+		self._undo_stack.append((piece, captured))
+		position.push(move)
+
+	def pop(self) -> int:
+		"""Take back the last move made on the board and return it."""
+		move = self.position.pop()
+		piece, captured = self._undo_stack.pop()
+
+		from_index = move & 63
+		to_index = (move >> 6) & 63
+
+		# The moved piece might be a promoted piece, it is thrown away
+		del self.piece_dict[self.squares[to_index]]
+		piece.move_piece(self.squares[from_index], self.screen)
+		self.piece_dict[piece.square] = piece
+
+		if captured is not None:
+			# The captured piece still knows its square
+			self.piece_dict[captured.square] = captured
+		elif piece.piece_type == KING and abs(to_index - from_index) == 2:
+			rook_from, rook_to = CASTLING_ROOK[to_index]
+			self._relocate_piece(self.squares[rook_to], self.squares[rook_from])
+
+		return move
+
+	def _relocate_piece(self, from_square: Square, to_square: Square) -> None:
+		"""Move a piece to another square without any chess logic."""
+		piece = self.piece_dict.pop(from_square)
+		piece.move_piece(to_square, self.screen)
+		self.piece_dict[to_square] = piece
 
 	def _setup_squares(self) -> None:
 		"""Initialize the squares on the chessboard."""
@@ -128,23 +215,24 @@ class Board:
 
 		return pg.Rect(left, top, length, length)
 
-	# TODO: Use binary search since the data is sorted or use dictionaries
 	# Getters
 	def get_square_by_coords(self, x: int, y: int) -> Union[Square, None]:
-		"""Get a square from the board with the specified x, y coordinates."""
-		for square in self.squares:
-			if point_in_rect(x, y, square.rect):
-				return square
+		"""Get a square from the board with the specified x, y coordinates, None if it is off the board."""
+		file = (x - self.border_rect.left) // Square.SQUARE_SIZE
+		rank = (y - self.border_rect.top) // Square.SQUARE_SIZE
 
-		return None  # not required, but it does make it explicit
+		if 0 <= file < 8 and 0 <= rank < 8:
+			return self.squares[rank*8 + file]
+
+		return None
 
 	def get_piece_by_coords(self, x: int, y: int) -> Union[BasePiece, None]:
-		"""Get a piece from the board with the specified coordinates."""
-		for piece in self.pieces:
-			if point_in_rect(x, y, piece.rect):
-				return piece
+		"""Get a piece from the board with the specified coordinates, through the square it is on."""
+		square = self.get_square_by_coords(x, y)
+		if square is None:
+			return None
 
-		return None  # not required, but it does make it explicit
+		return self.piece_dict.get(square, None)
 
 	def get_piece_occupying_square(self, square: Square) -> Union[BasePiece, None]:
 		"""Get a piece from the board occupying the specified square."""
@@ -160,31 +248,116 @@ class Board:
 
 		return pieces_to_return
 
+	def get_squares(self, bitboard: int) -> List[Square]:
+		"""Get the squares that are set in a bitboard."""
+		return [self.squares[index] for index in iter_bits(bitboard)]
+
 	def get_king(self, color: ChessColor):
 		"""Get the king that corresponds to the given color."""
 		return self.white_king if color == ChessColor.LIGHT else self.black_king
 
+	def is_square_attacked(self, square: Square, by_color: ChessColor) -> bool:
+		"""Check if a square is attacked by the pieces of the given color."""
+		return self.position.is_square_attacked(square.index, COLOR_INDEX[by_color])
+
+	def is_check(self) -> bool:
+		"""Check if the side to move is in check."""
+		return self.position.is_check()
+
+	def is_checkmate(self) -> bool:
+		"""Check if the side to move is checkmated."""
+		return self.position.is_checkmate()
+
+	def is_stalemate(self) -> bool:
+		"""Check if the side to move is stalemated."""
+		return self.position.is_stalemate()
+
+	def legal_moves(self) -> Iterator[int]:
+		"""Generate the encoded legal moves of the side to move."""
+		return self.position.generate_legal_moves()
+
+	@property
+	def move_turn(self) -> ChessColor:
+		"""The color whose turn it is to move."""
+		return INDEX_COLOR[self.position.turn]
+
 	def get_fullmove_number(self):
 		"""Returns the full move number of the current game."""
-		return (self._move_number + 2) // 2
+		return self.position.fullmove_number
 
-	def increment_move_number(self, increment=1):
-		"""Increments the number of half moves made."""
-		self._move_number += increment
+	def get_dirty_rects(self) -> List[pg.Rect]:
+		"""
+		Get the rects that changed since the last call: squares that were
+		highlighted or unhighlighted, and where pieces were and are now if
+		they moved, were captured or were created.
+		"""
+		dirty_rects = []
 
-	def render(self, dragged_piece: BasePiece):
-		"""Render the chessboard."""
-		# Render the squares.
 		for square in self.squares:
-			square.render(self.screen)
+			if square.highlight_color != self._rendered_highlights[square.index]:
+				self._rendered_highlights[square.index] = square.highlight_color
+				dirty_rects.append(square.rect)
+
+		last_rects = self._rendered_pieces
+		rendered_pieces = {}
+		for piece in self.pieces:
+			last_rect = last_rects.pop(piece, None)
+			if last_rect != piece.rect:
+				if last_rect is not None:
+					dirty_rects.append(last_rect)
+				last_rect = piece.rect.copy()
+				dirty_rects.append(last_rect)
+			rendered_pieces[piece] = last_rect
 
-		# Render the coordinates.
-		for coord in self.board_coordinates:
-			coord.render(self.screen)
+		# The pieces that are left were taken off the board
+		dirty_rects.extend(last_rects.values())
+		self._rendered_pieces = rendered_pieces
+
+		return dirty_rects
+
+	def invalidate_background(self) -> None:
+		"""Draw the squares and coordinates again on the next render."""
+		self._background = None
+
+	def _get_background(self) -> pg.Surface:
+		"""
+		Get the surface with the squares and coordinates. It is only drawn
+		again when it was invalidated or the colors or sizes changed.
+		"""
+		key = (
+			self.screen.get_size(), Square.SQUARE_SIZE, Square.LIGHT_SQUARE_COLOR,
+			Square.DARK_SQUARE_COLOR, self.background_color
+		)
+		if self._background is None or key != self._background_key:
+			rect = self.border_rect.unionall([coord.rect for coord in self.board_coordinates])
+			background = pg.Surface(rect.size).convert()
+			background.fill(self.background_color)
+
+			for square in self.squares:
+				background.fill(square.draw_color, square.rect.move(-rect.x, -rect.y))
+			for coord in self.board_coordinates:
+				background.blit(coord.label, (coord.pos[0] - rect.x, coord.pos[1] - rect.y))
+
+			self._background = background
+			self._background_rect = rect
+			self._background_key = key
+
+		return self._background
+
+	def render(self, dragged_piece: BasePiece, area: Union[pg.Rect, None] = None):
+		"""Render the chessboard, or only what overlaps the given area."""
+		# Render the squares and coordinates in one blit, then the highlights over them.
+		background = self._get_background()
+		if area is None or area.colliderect(self._background_rect):
+			self.screen.blit(background, self._background_rect)
+
+		for square in self.squares:
+			if square.highlight_color is not None and (area is None or area.colliderect(square.rect)):
+				square.render_highlight(self.screen)
 
 		# Render the pieces.
 		for piece in self.pieces:
-			if piece != dragged_piece:
+			if piece != dragged_piece and (area is None or area.colliderect(piece.rect)):
 				piece.render(self.screen)
 
 		# Render the piece being dragged last so that its on top of the other pieces.
@@ -14,12 +14,25 @@ class ChessColor(Enum):
 		return cls(-color.value)
 
 
-class Direction(Enum):
-	"""
-	A direction on the board from white's perspective represented by 
-	square index differences. For black, just multiply them by -1.
-	"""
-	FORWARD = -8
-	BACK = 8
-	RIGHT = 1
-	LEFT = -1
+# Integer constants used by the bitboard position
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+
+# A piece code is color*6 + piece type, so 'P' is 0 and 'k' is 11
+PIECE_SYMBOLS = 'PNBRQKpnbrqk'
+
+# How much every piece type is worth, the king is priceless
+PIECE_POINTS = (1, 3, 3, 5, 9, 0)
+
+# Castling rights bit flags
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+
+# Square names in board index order, a8 is 0 and h1 is 63
+SQUARE_NAMES = tuple(f + str(8 - rank) for rank in range(8) for f in 'abcdefgh')
+
+# Map between the GUI colors and the integer colors
+COLOR_INDEX = {ChessColor.LIGHT: WHITE, ChessColor.DARK: BLACK}
+INDEX_COLOR = (ChessColor.LIGHT, ChessColor.DARK)
@@ -0,0 +1,9 @@
+"""
+This is the 'engine' package. It searches positions
+for the best move, without depending on the GUI.
+"""
+
+
+from .search import Engine, SearchResult
+from .parallel import ParallelEngine
+from .evaluation import evaluate
@@ -0,0 +1,125 @@
+"""
+Static evaluation of positions.
+
+The evaluation is the material balance, using the piece points, plus
+piece-square tables that reward pieces for standing on good squares.
+Scores are in centipawns from the point of view of the side to move.
+"""
+
+# Type annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+	from ..position import Position
+
+from ..chess_constants import WHITE, PIECE_POINTS
+
+
+# Define what can be imported from this module
+__all__ = ['evaluate', 'PIECE_VALUES']
+
+
+# Piece values in centipawns, indexed by piece type
+PIECE_VALUES = tuple(points*100 for points in PIECE_POINTS)
+
+
+# Piece-square tables for white in board index order (a8 first).
+# Black uses the vertically mirrored square.
+_PAWN_TABLE = (
+	 0,   0,   0,   0,   0,   0,   0,   0,
+	50,  50,  50,  50,  50,  50,  50,  50,
+	10,  10,  20,  30,  30,  20,  10,  10,
+	 5,   5,  10,  25,  25,  10,   5,   5,
+	 0,   0,   0,  20,  20,   0,   0,   0,
+	 5,  -5, -10,   0,   0, -10,  -5,   5,
+	 5,  10,  10, -20, -20,  10,  10,   5,
+	 0,   0,   0,   0,   0,   0,   0,   0,
+)
+
+_KNIGHT_TABLE = (
+	-50, -40, -30, -30, -30, -30, -40, -50,
+	-40, -20,   0,   0,   0,   0, -20, -40,
+	-30,   0,  10,  15,  15,  10,   0, -30,
+	-30,   5,  15,  20,  20,  15,   5, -30,
+	-30,   0,  15,  20,  20,  15,   0, -30,
+	-30,   5,  10,  15,  15,  10,   5, -30,
+	-40, -20,   0,   5,   5,   0, -20, -40,
+	-50, -40, -30, -30, -30, -30, -40, -50,
+)
+
+_BISHOP_TABLE = (
+	-20, -10, -10, -10, -10, -10, -10, -20,
+	-10,   0,   0,   0,   0,   0,   0, -10,
+	-10,   0,   5,  10,  10,   5,   0, -10,
+	-10,   5,   5,  10,  10,   5,   5, -10,
+	-10,   0,  10,  10,  10,  10,   0, -10,
+	-10,  10,  10,  10,  10,  10,  10, -10,
+	-10,   5,   0,   0,   0,   0,   5, -10,
+	-20, -10, -10, -10, -10, -10, -10, -20,
+)
+
+_ROOK_TABLE = (
+	 0,   0,   0,   0,   0,   0,   0,   0,
+	 5,  10,  10,  10,  10,  10,  10,   5,
+	-5,   0,   0,   0,   0,   0,   0,  -5,
+	-5,   0,   0,   0,   0,   0,   0,  -5,
+	-5,   0,   0,   0,   0,   0,   0,  -5,
+	-5,   0,   0,   0,   0,   0,   0,  -5,
+	-5,   0,   0,   0,   0,   0,   0,  -5,
+	 0,   0,   0,   5,   5,   0,   0,   0,
+)
+
+_QUEEN_TABLE = (
+	-20, -10, -10,  -5,  -5, -10, -10, -20,
+	-10,   0,   0,   0,   0,   0,   0, -10,
+	-10,   0,   5,   5,   5,   5,   0, -10,
+	 -5,   0,   5,   5,   5,   5,   0,  -5,
+	  0,   0,   5,   5,   5,   5,   0,  -5,
+	-10,   5,   5,   5,   5,   5,   0, -10,
+	-10,   0,   5,   0,   0,   0,   0, -10,
+	-20, -10, -10,  -5,  -5, -10, -10, -20,
+)
+
+_KING_TABLE = (
+	-30, -40, -40, -50, -50, -40, -40, -30,
+	-30, -40, -40, -50, -50, -40, -40, -30,
+	-30, -40, -40, -50, -50, -40, -40, -30,
+	-30, -40, -40, -50, -50, -40, -40, -30,
+	-20, -30, -30, -40, -40, -30, -30, -20,
+	-10, -20, -20, -20, -20, -20, -20, -10,
+	 20,  20,   0,   0,   0,   0,  20,  20,
+	 20,  30,  10,   0,   0,  10,  30,  20,
+)
+
+_TABLES = (_PAWN_TABLE, _KNIGHT_TABLE, _BISHOP_TABLE, _ROOK_TABLE, _QUEEN_TABLE, _KING_TABLE)
+
+
+def _init_square_scores():
+	"""Combine piece values and tables into one score per piece code and square, white positive."""
+	scores = []
+
+	for code in range(12):
+		piece_type = code % 6
+		table = _TABLES[piece_type]
+		value = PIECE_VALUES[piece_type]
+
+		if code // 6 == WHITE:
+			scores.append(tuple(value + table[square] for square in range(64)))
+		else:
+			scores.append(tuple(-(value + table[square ^ 56]) for square in range(64)))
+
+	return tuple(scores)
+
+
+# Indexed by piece code, then square
+SQUARE_SCORES = _init_square_scores()
+
+
+def evaluate(position: 'Position') -> int:
+	"""Evaluate the position in centipawns for the side to move."""
+	score = 0
+
+	for square, code in enumerate(position.mailbox):
+		if code is not None:
+			score += SQUARE_SCORES[code][square]
+
+	return score if position.turn == WHITE else -score
@@ -0,0 +1,195 @@
+"""
+Parallel search over processes (Lazy SMP).
+
+Every worker process runs its own search of the same root position, but
+they all read and write one transposition table that lives in shared
+memory, so the workers pick up each other's results. The helpers start
+at staggered depths so that they don't all search the same tree at the
+same time. When the main worker is done the helpers are stopped, and the
+result of the deepest finished iteration is taken, the lowest worker
+index winning ties. A worker that dies without a result is left out.
+"""
+
+# Type annotations
+from typing import List, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from ..position import Position
+	from ..polyglot import PolyglotBook
+	from ..tablebase import Tablebase
+
+import multiprocessing as mp
+import os
+import queue
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+
+from ..transposition import TranspositionTable
+from .search import Engine, SearchResult, MAX_PLY
+
+
+# Define what can be imported from this module
+__all__ = ['ParallelEngine']
+
+
+# The number of different start depths of the helpers
+_DEPTH_STAGGER = 3
+
+# Seconds between checks of whether the workers are still alive while waiting for results
+_POLL_INTERVAL = 0.1
+
+
+def _attach_table(shm: SharedMemory, generation: int) -> TranspositionTable:
+	"""Create a transposition table that uses the shared memory block."""
+	table = TranspositionTable(buffer=shm.buf.cast('Q'))
+	table.generation = generation
+
+	return table
+
+
+def _search_worker(
+		index: int, position: 'Position', shm_name: str, generation: int,
+		max_depth: int, time_limit: Union[float, None], node_limit: Union[int, None],
+		stop_event, results
+	) -> None:
+	"""Search the position in a worker process and send back the last finished iteration."""
+	shm = SharedMemory(name=shm_name)
+	table = _attach_table(shm, generation)
+
+	engine = Engine(table=table)
+	engine.stop_event = stop_event
+
+	finished: List[SearchResult] = []
+	engine.search(
+		position, max_depth, time_limit, node_limit, finished.append,
+		start_depth=1 + index % _DEPTH_STAGGER
+	)
+
+	results.put((index, finished[-1] if finished else None, engine.nodes))
+
+	# The view has to be released before the shared memory can be closed
+	table.table.release()
+	shm.close()
+
+
+class ParallelEngine:
+	"""A chess engine that searches with several processes sharing one transposition table."""
+
+	def __init__(
+			self, workers: Union[int, None] = None, hash_mb: float = 16,
+			book: Union['PolyglotBook', None] = None, tablebase: Union['Tablebase', None] = None
+		):
+		"""
+		Initialize the engine with the given number of worker processes
+		(the number of CPUs by default) and a shared table of the given size.
+		Like Engine, it plays moves from the opening book and the tablebase,
+		they are probed before any worker is started.
+		"""
+		self.workers = max(workers or os.cpu_count() or 1, 1)
+		self.book = book
+		self.tablebase = tablebase
+
+		size = TranspositionTable.bucket_count(hash_mb)*32
+		self.shm = SharedMemory(create=True, size=size)
+		self.table = _attach_table(self.shm, 0)
+
+	def search(
+			self, position: 'Position', max_depth: int = MAX_PLY,
+			time_limit: Union[float, None] = None, node_limit: Union[int, None] = None
+		) -> SearchResult:
+		"""
+		Search the position with every worker and combine the results. The
+		node limit applies to each worker, nodes and nps are the totals.
+		"""
+		start = perf_counter()
+		generation = self.table.generation
+
+		engine = Engine(table=self.table, book=self.book, tablebase=self.tablebase)
+		if self.workers == 1:
+			# No need to start a process
+			return engine.search(position, max_depth, time_limit, node_limit)
+
+		if position.has_legal_moves():
+			known = engine.known_move(position)
+			if known is not None:
+				return known._replace(seconds=perf_counter() - start)
+
+		stop_event = mp.Event()
+		results = mp.Queue()
+
+		processes = [
+			mp.Process(
+				target=_search_worker,
+				args=(
+					index, position, self.shm.name, generation,
+					max_depth, time_limit, node_limit, stop_event, results
+				),
+				daemon=True
+			)
+			for index in range(self.workers)
+		]
+		for process in processes:
+			process.start()
+
+		worker_results = [None]*self.workers
+		nodes = 0
+		received = set()
+		suspected = set()
+		while len(received) < self.workers:
+			try:
+				index, result, worker_nodes = results.get(timeout=_POLL_INTERVAL)
+			except queue.Empty:
+				# A worker that exited is given one more poll for its result to arrive, then it is given up
+				exited = {
+					worker for worker, process in enumerate(processes)
+					if worker not in received and process.exitcode is not None
+				}
+				failed = exited & suspected
+				suspected = exited - failed
+				received |= failed
+
+				if 0 in failed:
+					# The main worker died, stop the helpers
+					stop_event.set()
+				continue
+
+			worker_results[index] = result
+			nodes += worker_nodes
+			received.add(index)
+
+			if index == 0:
+				# The main worker is done, stop the helpers
+				stop_event.set()
+
+		for process in processes:
+			process.join()
+
+		self.table.new_search()
+
+		# The deepest finished iteration wins, ties go to the lowest index
+		finished = [result for result in worker_results if result is not None]
+		if not finished:
+			return Engine(table=self.table).search(position, 1)
+		best = max(finished, key=lambda result: result.depth)
+
+		seconds = perf_counter() - start
+		nps = int(nodes / seconds) if seconds > 0 else 0
+
+		return best._replace(nodes=nodes, seconds=seconds, nps=nps)
+
+	def close(self) -> None:
+		"""Free the shared transposition table."""
+		self.table.table.release()
+		self.shm.close()
+		self.shm.unlink()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def __str__(self):
+		return f'<ParallelEngine: {self.workers} workers, {len(self.table)} entries>'
+
+	def __repr__(self):
+		return str(self)
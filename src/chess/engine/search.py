@@ -0,0 +1,391 @@
+"""
+The search of the engine.
+
+Negamax alpha-beta search with iterative deepening, aspiration windows,
+a transposition table and a quiescence search over captures, stopped by
+a time or node budget.
+"""
+
+# Type annotations
+from typing import Callable, List, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from ..position import Position
+	from ..polyglot import PolyglotBook
+	from ..tablebase import Tablebase
+
+from collections import namedtuple
+from time import perf_counter
+
+from ..chess_constants import PAWN
+from ..transposition import TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+from .evaluation import evaluate, PIECE_VALUES
+
+
+# Define what can be imported from this module
+__all__ = ['Engine', 'SearchResult', 'MATE_SCORE']
+
+
+# Scores
+INFINITY = 32000
+MATE_SCORE = 30000
+MAX_PLY = 64
+_MATE_BOUND = MATE_SCORE - MAX_PLY  # scores beyond this are mates
+
+ASPIRATION_WINDOW = 50
+
+# How often the clock is looked at, in nodes
+_CHECK_INTERVAL = 1024
+
+
+# The result of a search, move is None if there are no legal moves
+SearchResult = namedtuple('SearchResult', 'move, score, depth, nodes, seconds, nps, pv')
+
+
+#############################
+######### UTILITIES #########
+#############################
+
+
+def _score_to_table(score: int, ply: int) -> int:
+	"""Store mate scores relative to the position instead of the root."""
+	if score > _MATE_BOUND:
+		return score + ply
+	if score < -_MATE_BOUND:
+		return score - ply
+
+	return score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+	"""Turn a stored mate score back into a score relative to the root."""
+	if score > _MATE_BOUND:
+		return score - ply
+	if score < -_MATE_BOUND:
+		return score + ply
+
+	return score
+
+
+def _captured_piece(position: 'Position', move: int) -> Union[int, None]:
+	"""Get the type of the piece a move captures, None if it doesn't capture."""
+	to_square = (move >> 6) & 63
+	victim = position.mailbox[to_square]
+	if victim is not None:
+		return victim % 6
+
+	# En passant, the TO square is empty and the captured pawn is behind it
+	if to_square == position.ep_square and position.mailbox[move & 63] % 6 == PAWN:
+		return PAWN
+
+	return None
+
+
+def _is_capture(position: 'Position', move: int) -> bool:
+	"""Check if a move captures a piece or promotes a pawn."""
+	return _captured_piece(position, move) is not None or move >> 12 != 0
+
+
+def _order_moves(position: 'Position', moves: List[int], best_move: int = 0) -> List[int]:
+	"""
+	Sort moves so that the best move from the table comes first, then
+	captures of the most valuable victims by the least valuable attackers.
+	"""
+	mailbox = position.mailbox
+
+	def move_score(move: int) -> int:
+		if move == best_move:
+			return 100000
+
+		victim = _captured_piece(position, move)
+		score = 0
+		if victim is not None:
+			score = 10*PIECE_VALUES[victim] - PIECE_VALUES[mailbox[move & 63] % 6] + 1000
+		if move >> 12:
+			score += PIECE_VALUES[move >> 12]
+
+		return score
+
+	moves.sort(key=move_score, reverse=True)
+	return moves
+
+
+#############################
+######### THE ENGINE ########
+#############################
+
+
+class Engine:
+	"""A chess engine that searches positions for the best move."""
+
+	def __init__(
+			self, hash_mb: float = 16, table: Union[TranspositionTable, None] = None,
+			book: Union['PolyglotBook', None] = None, tablebase: Union['Tablebase', None] = None
+		):
+		"""
+		Initialize the engine with a transposition table of the given size.
+		Moves are taken from the opening book while the position is in it,
+		and from the tablebase once the position has a table.
+		"""
+		self.table = table if table is not None else TranspositionTable(hash_mb)
+		self.book = book
+		self.tablebase = tablebase
+
+		# Search state
+		self.nodes = 0
+		self.stopped = False
+		self._deadline: Union[float, None] = None
+		self._node_limit: Union[int, None] = None
+		self._root_best = 0
+
+		# Set from the outside (e.g. a multiprocessing.Event) to stop the search
+		self.stop_event = None
+
+	def search(
+			self, position: 'Position', max_depth: int = MAX_PLY,
+			time_limit: Union[float, None] = None, node_limit: Union[int, None] = None,
+			on_iteration: Union[Callable[[SearchResult], None], None] = None,
+			start_depth: int = 1
+		) -> SearchResult:
+		"""
+		Search the position for the best move. The search deepens one ply at
+		a time from start_depth until max_depth is reached or the time (in
+		seconds) or node budget runs out, and returns the result of the last
+		finished depth. on_iteration is called with every finished depth.
+		Book and tablebase moves are returned without searching, with a
+		depth of 0.
+		"""
+		start = perf_counter()
+		self.nodes = 0
+		self.stopped = False
+		self._deadline = start + time_limit if time_limit is not None else None
+		self._node_limit = node_limit
+		self._root_best = 0
+		self.table.new_search()
+
+		moves = list(position.generate_legal_moves())
+		if not moves:
+			score = -MATE_SCORE if position.is_check() else 0
+			return SearchResult(None, score, 0, 0, 0.0, 0, [])
+
+		known = self.known_move(position)
+		if known is not None:
+			return known._replace(seconds=perf_counter() - start)
+
+		result = None
+		score = 0
+
+		for depth in range(min(start_depth, max_depth), max_depth + 1):
+			score = self._aspiration_search(position, depth, score)
+
+			if self.stopped and result is not None:
+				# The iteration didn't finish, keep the last complete result
+				break
+
+			seconds = perf_counter() - start
+			result = SearchResult(
+				self._root_best or moves[0], score, depth, self.nodes, seconds,
+				int(self.nodes / seconds) if seconds > 0 else 0,
+				self._principal_variation(position, depth)
+			)
+
+			if on_iteration is not None and not self.stopped:
+				on_iteration(result)
+
+			if self.stopped or abs(score) > _MATE_BOUND:
+				break
+
+			# Don't start an iteration that will most likely not finish
+			if self._deadline is not None and perf_counter() - start > (self._deadline - start) / 2:
+				break
+
+		return result
+
+	def known_move(self, position: 'Position') -> Union[SearchResult, None]:
+		"""
+		Get the move of the opening book or the tablebase as a result with a
+		depth of 0, None if neither of them has the position.
+		"""
+		if self.book is not None:
+			book_move = self.book.weighted_choice(position)
+			if book_move is not None:
+				return SearchResult(book_move, 0, 0, 0, 0.0, 0, [book_move])
+
+		if self.tablebase is not None:
+			probe = self.tablebase.probe_plies(position)
+			move = self.tablebase.best_move(position) if probe is not None else None
+			if move is not None:
+				wdl, plies = probe
+				score = wdl*(MATE_SCORE - plies) if wdl else 0
+				return SearchResult(move, score, 0, 0, 0.0, 0, [move])
+
+		return None
+
+	def _aspiration_search(self, position: 'Position', depth: int, previous_score: int) -> int:
+		"""Search with a narrow window around the previous score, widening it on failure."""
+		if depth < 3:
+			return self._negamax(position, depth, -INFINITY, INFINITY, 0)
+
+		alpha = previous_score - ASPIRATION_WINDOW
+		beta = previous_score + ASPIRATION_WINDOW
+
+		while True:
+			score = self._negamax(position, depth, alpha, beta, 0)
+			if self.stopped:
+				return score
+
+			if score <= alpha:
+				alpha = -INFINITY
+			elif score >= beta:
+				beta = INFINITY
+			else:
+				return score
+
+	def _check_budget(self) -> None:
+		"""Stop the search if the time or node budget is used up or a stop was requested."""
+		if self._node_limit is not None and self.nodes >= self._node_limit:
+			self.stopped = True
+		elif self.nodes % _CHECK_INTERVAL == 0:
+			if self._deadline is not None and perf_counter() >= self._deadline:
+				self.stopped = True
+			elif self.stop_event is not None and self.stop_event.is_set():
+				self.stopped = True
+
+	def _negamax(self, position: 'Position', depth: int, alpha: int, beta: int, ply: int) -> int:
+		"""Alpha-beta search of the position, the score is for the side to move."""
+		self.nodes += 1
+		self._check_budget()
+		if self.stopped:
+			return 0
+
+		if ply:
+			# Draws by the fifty move rule or repetition
+			if position.halfmove_clock >= 100 or position.is_repetition(2):
+				return 0
+			if ply >= MAX_PLY:
+				return evaluate(position)
+
+		in_check = position.is_check()
+		if in_check:
+			# Check extension, don't stop searching in the middle of a check
+			depth += 1
+
+		if depth <= 0:
+			return self._quiescence(position, alpha, beta, ply)
+
+		# Look the position up in the transposition table
+		key = position.key
+		best_move = 0
+		entry = self.table.probe(key)
+		if entry is not None:
+			entry_depth, bound, entry_score, best_move = entry
+			entry_score = _score_from_table(entry_score, ply)
+
+			if ply and entry_depth >= depth:
+				if bound == BOUND_EXACT:
+					return entry_score
+				if bound == BOUND_LOWER and entry_score >= beta:
+					return entry_score
+				if bound == BOUND_UPPER and entry_score <= alpha:
+					return entry_score
+
+		moves = list(position.generate_legal_moves())
+		if not moves:
+			# Checkmate or stalemate
+			return -MATE_SCORE + ply if in_check else 0
+
+		original_alpha = alpha
+		best_score = -INFINITY
+
+		for move in _order_moves(position, moves, best_move):
+			position.push(move)
+			score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+			position.pop()
+
+			if self.stopped:
+				return 0
+
+			if score > best_score:
+				best_score = score
+				best_move = move
+
+				if score > alpha:
+					alpha = score
+					if ply == 0:
+						self._root_best = move
+					if alpha >= beta:
+						break
+
+		if best_score <= original_alpha:
+			bound = BOUND_UPPER
+		elif best_score >= beta:
+			bound = BOUND_LOWER
+		else:
+			bound = BOUND_EXACT
+		self.table.store(key, depth, bound, _score_to_table(best_score, ply), best_move)
+
+		return best_score
+
+	def _quiescence(self, position: 'Position', alpha: int, beta: int, ply: int) -> int:
+		"""Search captures only, so that positions are evaluated when they are quiet."""
+		self.nodes += 1
+		self._check_budget()
+		if self.stopped:
+			return 0
+
+		in_check = position.is_check()
+		if ply >= MAX_PLY:
+			return evaluate(position)
+
+		if in_check:
+			# Every evasion has to be looked at when in check
+			best_score = -INFINITY
+			moves = list(position.generate_legal_moves())
+			if not moves:
+				return -MATE_SCORE + ply
+		else:
+			# Standing pat, the side to move doesn't have to capture
+			best_score = evaluate(position)
+			if best_score >= beta:
+				return best_score
+			if best_score > alpha:
+				alpha = best_score
+
+			moves = [move for move in position.generate_legal_moves() if _is_capture(position, move)]
+
+		for move in _order_moves(position, moves):
+			position.push(move)
+			score = -self._quiescence(position, -beta, -alpha, ply + 1)
+			position.pop()
+
+			if self.stopped:
+				return 0
+
+			if score > best_score:
+				best_score = score
+				if score > alpha:
+					alpha = score
+					if alpha >= beta:
+						break
+
+		return best_score
+
+	def _principal_variation(self, position: 'Position', depth: int) -> List[int]:
+		"""Follow the best moves stored in the transposition table."""
+		pv = []
+
+		for _ in range(depth):
+			entry = self.table.probe(position.key)
+			if entry is None or not entry[3]:
+				break
+
+			move = entry[3]
+			if move not in position.generate_legal_moves() or position.is_repetition(2):
+				break
+
+			position.push(move)
+			pv.append(move)
+
+		for _ in pv:
+			position.pop()
+
+		return pv
@@ -1,5 +1,5 @@
 # Type annotations
-from typing import Callable, Sequence, Tuple, List, TYPE_CHECKING
+from typing import Callable, Sequence, List, Union, TYPE_CHECKING
 if TYPE_CHECKING:
 	from .board import Board
 	from .square import Square
@@ -12,15 +12,14 @@ from settings import ASSETS_DIR
 import tkinter as tk
 
 # Chess imports
-from .chess_constants import ChessColor, Direction
+from .chess_constants import ChessColor
+from .position import encode_move
+from .san import move_to_san
 from .piece import *
 
 # Define what can be imported from this module
 __all__ = ['Move']
 
-# Init pygame's sound package
-pg.mixer.init()
-
 
 #################################
 ######### PROMOTION GUI #########
@@ -74,7 +73,8 @@ class PromotionDialog(tk.Tk):
 
 class Move:
 	"""Represents a move on the chessboard."""
-	INVALID_MOVE_SOUND = pg.mixer.Sound(ASSETS_DIR / 'invalid_move.wav')
+	INVALID_MOVE_SOUND: Union[pg.mixer.Sound, None] = None  # loaded when first played
+	_sound_loaded = False
 
 	def __init__(
 			self, to: 'Square', moving_piece: 'BasePiece', 
@@ -88,20 +88,25 @@ class Move:
 		self.moving_piece = moving_piece
 		self.occupying_piece = occupying_piece
 
-	# Checks (Not as in chess checks :))
-	def _update_has_moved(self, piece_type):
-		"""
-		Check if the moving piece has special first moves and if so,
-		set the has_moved flag to True, to stop generating those moves.
-		"""
-		if issubclass(piece_type, FirstMovePiece):
-			self.moving_piece.has_moved = True
+	@classmethod
+	def play_invalid_move_sound(cls) -> None:
+		"""Play the invalid move sound, if there is an audio device to play it on."""
+		if not cls._sound_loaded:
+			cls._sound_loaded = True
+			try:
+				pg.mixer.init()
+				cls.INVALID_MOVE_SOUND = pg.mixer.Sound(ASSETS_DIR / 'invalid_move.wav')
+			except pg.error:
+				cls.INVALID_MOVE_SOUND = None
 
-	def _check_capture(self, pieces_list: List['BasePiece']) -> None:
-		"""Remove the piece on the TO square, if it is being captured."""
-		if self.occupying_piece is not None:
-			pieces_list.remove(self.occupying_piece)
+		if cls.INVALID_MOVE_SOUND is not None:
+			cls.INVALID_MOVE_SOUND.play()
+
+	def encode(self, promotion: int = 0) -> int:
+		"""Get the move as an integer for the bitboard position."""
+		return encode_move(self.moving_piece.square.index, self.to.index, promotion)
 
+	# Checks (Not as in chess checks :))
 	def _check_move_turn(self, move_turn: 'ChessColor') -> bool:
 		"""Check if it is the moving piece's _draw_color's turn."""
 		if move_turn != self.moving_piece.color:
@@ -133,138 +138,59 @@ class Move:
 
 		return True
 
-	def _check_checks(self, board: 'Board') -> bool:
-		"""Check the validity of the move, regarding chess checks."""
-		if self.occupying_piece is not None:
-			# if there is a piece on the TO square, capture it
-			del board.piece_dict[self.to]
-
-		# Move the piece regardless of whether it is valid or not
-		original_square = self.moving_piece.square
-		self.moving_piece.square = self.to
-		del board.piece_dict[original_square]
-		board.piece_dict[self.moving_piece.square] = self.moving_piece
-
-		# Get a list of all attacked squares by the opposite color
-		# except the piece on the TO square
-		attacked_squares = set()
-		for piece in board.pieces:
-			if piece.color != self.moving_piece.color and piece != self.occupying_piece:
-				piece_moves = piece.get_attacked_squares(board)
-				attacked_squares.update(piece_moves)
-
-		# Move is invalid if the moving color's king can be captured
-		king = board.get_king(self.moving_piece.color)
-		check_validity = not king.square in attacked_squares
-
-		# Undo the move.
-		del board.piece_dict[self.moving_piece.square]
-		self.moving_piece.square = original_square
-		board.piece_dict[self.moving_piece.square] = self.moving_piece
-		board.piece_dict[self.to] = self.occupying_piece
-
-		return check_validity
-
-	def _check_castling(self, board: 'Board') -> None:
-		"""Check if the king is castling and if so, move the rook."""
-		# TODO: Make sure the king is not passing through attacked squares
-		index_difference = self._get_index_difference()
-		index = self.moving_piece.square.index
-
-		# Get left's square index difference
-		l_inc = Direction.LEFT.value
-		r_inc = Direction.RIGHT.value
-
-		if index_difference == l_inc*2:
-			# The king is castling queenside
-			self._move_castling_rook(board, index, l_inc, 4)
-		elif index_difference == r_inc*2:
-			# The king is castling kingside
-			self._move_castling_rook(board, index, r_inc, 3)
-
-	def _get_index_difference(self) -> int:
-		"""Get the index difference of the moving piece's square and the
-		square the piece is moving to.""" 
-		return self.to.index - self.moving_piece.square.index
-
-	@staticmethod
-	def _move_castling_rook(
-			board: 'Board', index: int, increment: int, multiply_by: int
-		) -> None:
-		"""Move the rook the king is castling with."""
-		# Get the rook
-		rook_square_index = index + increment*multiply_by
-		rook = board.get_piece_occupying_square(board.squares[rook_square_index])
-
-		# Move the rook
-		rook.move_piece(board.squares[index + increment], board.screen)
-
-	def _check_promotion(self, board: 'Board') -> None:
-		"""Promote the pawn, if it is on the last row."""
-		# TODO: Add promotion cancelling
+	def _check_promotion(self) -> Union[int, None]:
+		"""
+		Ask for the promotion piece, if the pawn is moving to the last row. 
+		Returns the piece type the pawn is promoted to, 0 if there is no 
+		promotion and None if the promotion was cancelled.
+		"""
 		promotion_row = 0 if self.moving_piece.color == ChessColor.LIGHT else 7
 
-		if self.moving_piece.irow(self._get_index_difference()) == promotion_row:
-			# The pawn is being promoted, start the promotion dialog
-			dialog = PromotionDialog(Pawn.PROMOTION_CHOICES)
-			dialog.start_dialog()
-
-			if dialog.promotion_choice is None:
-				return
-			board.pieces.remove(self.moving_piece)
-
-			# Change the moving piece from pawn to the promotion of choice
-			# TODO: Replace eval with something better
-			PromotionClass = eval(dialog.promotion_choice)
-			self.moving_piece = PieceCreator.create_piece(
-					PromotionClass, self.moving_piece.color,
-					self.moving_piece.square, board.screen
-				)
-			board.pieces.append(self.moving_piece)
+		if self.to.index // 8 != promotion_row:
+			return 0
 
-	def make_move(self, board: 'Board', possible_squares: List['Square']) -> None:
-		"""Make the move on the board, if it is valid."""
-		# TODO: Return notation for the move.
-		# TODO: Implement checkmate and stalemate
+		# The pawn is being promoted, start the promotion dialog
+		dialog = PromotionDialog(Pawn.PROMOTION_CHOICES)
+		dialog.start_dialog()
 
-		if self.is_valid(board.move_turn, possible_squares) and self._check_checks(board):
-			# Check if a piece was captured
-			self._check_capture(board.pieces)
+		if dialog.promotion_choice is None:
+			return None
 
-			piece_type = self.moving_piece.__class__
-			if piece_type == King:
-				# Check if the king is castling
-				self._check_castling(board)
-			elif piece_type == Pawn:
-				# Check if a pawn is being promoted
-				self._check_promotion(board)
+		# TODO: Replace eval with something better
+		PromotionClass = eval(dialog.promotion_choice)
 
-			# Check if the moving piece is of type 'FirstMovePiece'.
-			self._update_has_moved(piece_type)
+		return PromotionClass.piece_type
 
-			# Unhighlight the previous square
-			self.moving_piece.square.unhighlight()
+	def make_move(self, board: 'Board', possible_squares: List['Square']) -> Union[str, None]:
+		"""Make the move on the board, if it is valid, and return its SAN notation."""
+		# TODO: Implement checkmate and stalemate
+		# The possible squares only contain legal moves, so checks are already accounted for
+		is_valid = self.is_valid(board.move_turn, possible_squares)
+
+		promotion = 0
+		if is_valid and self.moving_piece.__class__ == Pawn:
+			# Check if a pawn is being promoted, cancelling the promotion cancels the move
+			promotion = self._check_promotion()
+			is_valid = promotion is not None
 
-			# Change the piece's square
-			self.moving_piece.square = self.to
+		# Unhighlight the current square
+		self.moving_piece.square.unhighlight()
 
-			# Change the move turn
-			board.move_turn = ChessColor.negate(self.moving_piece.color)
+		if is_valid:
+			# Relocate the pieces and update the position
+			move = self.encode(promotion)
+			notation = move_to_san(board.position, move)
+			board.push(move)
 
-			# Increment move number
-			board.increment_move_number()
+			return notation
 		else:
 			# Play the invalid move sound
-			Move.INVALID_MOVE_SOUND.play()
-
-			# Unhighlight the current square
-			self.moving_piece.square.unhighlight()
+			Move.play_invalid_move_sound()
 
-		# Center the piece in the square so that it looks nice
-		self.moving_piece.center_in_square(board.screen)
+			# Center the piece in the square so that it looks nice
+			self.moving_piece.center_in_square(board.screen)
 
-		# Update the piece dict of the board.
-		board.update_piece_dict()
+			return None
 
 	def __str__(self):
 		return f'<Move: {self.moving_piece} moving to {self.to}>'
@@ -0,0 +1,192 @@
+"""
+Perft (performance test) for the move generator.
+
+Counts the leaf nodes of the legal move tree to a given depth, which
+can be compared with published numbers to verify the move generator,
+and timed to benchmark it.
+
+Usage (from the src directory):
+	python -m chess.perft 5
+	python -m chess.perft 4 --fen "<FEN>" --divide --workers 4 --cache
+	python -m chess.perft 5 --suite --workers 4
+"""
+
+# Type annotations
+from typing import Dict, List, Tuple, Union
+
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from .chess_constants import DEFAULT_POSITION_FEN
+from .position import Position, move_to_uci
+
+
+# Define what can be imported from this module
+__all__ = ['perft', 'divide', 'run_suite', 'PerftResult', 'PerftCase', 'PERFT_SUITE']
+
+
+# The result of a perft run, divide maps UCI root moves to their node counts
+PerftResult = namedtuple('PerftResult', 'nodes, seconds, nps, divide')
+
+# A standard test position, counts are the published node counts from depth 1
+PerftCase = namedtuple('PerftCase', 'name, fen, counts')
+
+# The standard test positions of the Chess Programming Wiki
+PERFT_SUITE = (
+	PerftCase('start', DEFAULT_POSITION_FEN, (20, 400, 8902, 197281, 4865609, 119060324)),
+	PerftCase(
+		'kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+		(48, 2039, 97862, 4085603, 193690690)
+	),
+	PerftCase(
+		'position 3', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+		(14, 191, 2812, 43238, 674624, 11030083)
+	),
+	PerftCase(
+		'position 4', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+		(6, 264, 9467, 422333, 15833292)
+	),
+	PerftCase(
+		'position 5', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+		(44, 1486, 62379, 2103487, 89941194)
+	),
+	PerftCase(
+		'position 6', 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+		(46, 2079, 89890, 3894594, 164075551)
+	),
+)
+
+
+def perft(position: Position, depth: int, cache: Union[Dict, None] = None) -> int:
+	"""
+	Count the leaf nodes of the legal move tree to the given depth.
+	If a cache dict is given, subtree counts are stored in it and reused.
+	"""
+	if depth == 0:
+		return 1
+
+	if cache is not None:
+		key = (position.key, depth)
+		if key in cache:
+			return cache[key]
+
+	if depth == 1:
+		# Bulk counting, the moves at the last ply don't have to be made
+		nodes = sum(1 for _ in position.generate_legal_moves())
+	else:
+		nodes = 0
+		for move in list(position.generate_legal_moves()):
+			position.push(move)
+			nodes += perft(position, depth - 1, cache)
+			position.pop()
+
+	if cache is not None:
+		cache[key] = nodes
+
+	return nodes
+
+
+def _perft_root_move(args: Tuple[str, int, int, bool]) -> int:
+	"""Count the nodes below one root move, run inside a worker process."""
+	fen, move, depth, use_cache = args
+
+	position = Position(fen)
+	position.push(move)
+
+	return perft(position, depth - 1, {} if use_cache else None)
+
+
+def divide(
+		position: Position, depth: int, workers: int = 1, cache: bool = False
+	) -> PerftResult:
+	"""
+	Run perft and break the node count down by root move. Root moves
+	are split across a process pool if more than one worker is requested.
+	"""
+	start = perf_counter()
+
+	root_moves = list(position.generate_legal_moves())
+
+	if depth < 1:
+		counts = []
+	elif workers > 1:
+		fen = position.fen()
+		tasks = [(fen, move, depth, cache) for move in root_moves]
+
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			counts = list(executor.map(_perft_root_move, tasks))
+	else:
+		shared_cache = {} if cache else None
+		counts = []
+		for move in root_moves:
+			position.push(move)
+			counts.append(perft(position, depth - 1, shared_cache))
+			position.pop()
+
+	nodes = sum(counts) if depth >= 1 else 1
+	seconds = perf_counter() - start
+	nps = int(nodes / seconds) if seconds > 0 else 0
+	breakdown = {move_to_uci(move): count for move, count in zip(root_moves, counts)}
+
+	return PerftResult(nodes, seconds, nps, breakdown)
+
+
+def run_suite(
+		depth: int, workers: int = 1, cache: bool = False
+	) -> List[Tuple[PerftCase, int, PerftResult]]:
+	"""
+	Run perft on every position of the suite to the given depth, or to the
+	deepest published count if that is shallower. Returns (case, depth,
+	result) for every position, the result is correct if its nodes equal
+	case.counts[depth - 1].
+	"""
+	results = []
+	for case in PERFT_SUITE:
+		case_depth = min(depth, len(case.counts))
+		result = divide(Position(case.fen), case_depth, workers, cache)
+		results.append((case, case_depth, result))
+
+	return results
+
+
+def main():
+	"""Run perft from the command line."""
+	arg_parser = argparse.ArgumentParser(description='Count leaf nodes of the move tree.')
+	arg_parser.add_argument('depth', type=int, help='depth to search to')
+	arg_parser.add_argument('--fen', default=DEFAULT_POSITION_FEN, help='starting position')
+	arg_parser.add_argument('--divide', action='store_true', help='print node counts per root move')
+	arg_parser.add_argument('--workers', type=int, default=1, help='number of worker processes')
+	arg_parser.add_argument('--cache', action='store_true', help='cache subtree counts by position key')
+	arg_parser.add_argument(
+		'--suite', action='store_true', help='check the standard test positions against their published counts'
+	)
+	args = arg_parser.parse_args()
+
+	if args.suite:
+		failed = 0
+		for case, depth, result in run_suite(args.depth, args.workers, args.cache):
+			expected = case.counts[depth - 1]
+			status = 'ok' if result.nodes == expected else 'FAILED'
+			failed += result.nodes != expected
+			print(
+				f'{case.name} depth {depth}: {result.nodes} nodes, expected {expected}, {status} '
+				f'({result.seconds:.3f} s, {result.nps} nodes/s)'
+			)
+
+		raise SystemExit(1 if failed else 0)
+
+	result = divide(Position(args.fen), args.depth, args.workers, args.cache)
+
+	if args.divide:
+		for move, count in sorted(result.divide.items()):
+			print(f'{move}: {count}')
+		print()
+
+	print(f'Nodes searched: {result.nodes}')
+	print(f'Time: {result.seconds:.3f} s ({result.nps} nodes/s)')
+
+
+if __name__ == '__main__':
+	main()
@@ -1,29 +1,26 @@
 # Type annotations
-from typing import List, Sequence, Callable, Tuple, Union, TYPE_CHECKING
+from typing import List, Union, TYPE_CHECKING
 if TYPE_CHECKING:
 	from .board import Board
 
-# Built-in utilities
-from abc import abstractmethod
-from functools import wraps
-
 # Pygame
 import pygame as pg
 
 # Graphics and settings imports
-from graphics import Renderable, Spritesheet, PIECE_SIZE_X, PIECE_SIZE_Y
+from graphics import Renderable, Spritesheet, SpriteAtlas, PIECE_SIZE_X, PIECE_SIZE_Y
 from settings import ASSETS_DIR
 
 # Chess imports
 from .square import Square
-from .chess_constants import ChessColor, Direction
+from .chess_constants import (
+	ChessColor, PIECE_POINTS, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+)
 
 
 # Define what can be imported from this module.
 __all__ = [
-	'BasePiece', 'FirstMovePiece', 
-	'Pawn', 'Bishop', 'Knight', 
-	'Rook', 'Queen', 'King', 'PieceCreator'
+	'BasePiece', 'Pawn', 'Bishop', 'Knight', 
+	'Rook', 'Queen', 'King', 'PieceCreator', 'PIECE_CLASSES'
 ]
 
 
@@ -32,16 +29,40 @@ __all__ = [
 #############################
 
 
+# The sprites are made for the default square size, pieces are scaled with the squares
+_PIECE_SCALE = PIECE_SIZE_X / Square.SQUARE_SIZE
+
+
 class PieceCreator:
 	"""Creates piece for the game. Handles graphics for them as well."""
-	spritesheet = Spritesheet(ASSETS_DIR / 'pieces.png')
+	spritesheet: Union[Spritesheet, None] = None  # loaded when the first piece is created
+	atlas: Union[SpriteAtlas, None] = None  # the piece images shared by every piece
+
+	@classmethod
+	def get_spritesheet(cls) -> Spritesheet:
+		"""Get the spritesheet of the pieces, loading it the first time."""
+		if cls.spritesheet is None:
+			cls.spritesheet = Spritesheet(ASSETS_DIR / 'pieces.png')
+
+		return cls.spritesheet
+
+	@classmethod
+	def get_atlas(cls) -> SpriteAtlas:
+		"""Get the atlas of the piece images, creating it the first time."""
+		if cls.atlas is None:
+			cls.atlas = SpriteAtlas(cls.get_spritesheet())
+
+		return cls.atlas
 
 	@classmethod
 	def create_piece(
 			cls, piece_class, color: ChessColor, 
 			square: Square, screen: pg.Surface
 		):
-		"""TODO: Add typing for piece_class and docstring"""
+		"""
+		Create a piece of the given class and color on the square. Pieces of
+		the same type and color share one image, sized for the squares.
+		"""
 		# Init the piece with chess logic
 		piece = piece_class(color, square)
 
@@ -55,8 +76,9 @@ class PieceCreator:
 				PIECE_SIZE_X, PIECE_SIZE_Y
 			)
 
-		# Get image for piece
-		image = cls.spritesheet.get_image_at(image_position_rect)
+		# Get the shared image for the piece
+		piece_size = round(Square.SQUARE_SIZE * _PIECE_SCALE)
+		image = cls.get_atlas().get_image(image_position_rect, (piece_size, piece_size))
 
 		# Initialize graphics for the piece
 		piece.init_graphics(image, screen)
@@ -64,13 +86,6 @@ class PieceCreator:
 		return piece
 
 
-def remove_square_if_in_possible_moves(
-	square: Square, possible_moves: List[Square]
-	) -> None:
-	if square in possible_moves:
-		possible_moves.remove(square)
-
-
 ################################
 ######### BASE CLASSES #########
 ################################
@@ -127,17 +142,8 @@ class BasePiece(RenderablePiece):
 	# TODO: Instead of storing a reference for a piece's square,
 	# store a piece reference in every square.
 
-	# Constants
-	PIECE_DICT = {
-		'Pawn': 'p', 'Knight': 'n', 'Bishop': 'b',
-		'Rook': 'r', 'Queen': 'q', 'King': 'k'
-	}
-
-	# Directions for move generation
-	HORIZONTAL_DIRECTIONS = (Direction.LEFT, Direction.RIGHT)
-	VERTICAL_DIRECTIONS = (Direction.FORWARD, Direction.BACK)
-
 	# Class attributes
+	piece_type: int  # the piece type used by the bitboard position
 	points: int  # how much the piece is worth
 	notation: str  # how the piece is represented in chess notation
 
@@ -148,96 +154,28 @@ class BasePiece(RenderablePiece):
 
 		self.center_in_square(surface)
 
-	@abstractmethod
 	def get_possible_moves(self, board: 'Board') -> List[Square]:
-		"""Get the valid squares the piece can move to."""
-		raise NotImplemented
-
-	def get_attacked_squares(self, board: 'Board') -> List[Square]:
-		"""
-		Get the attacked squares of the piece.
-
-		By default this piece returns all the possible moves of the piece,
-		but this method exists for detecting pawn attacks, therefore every
-		piece has this method.
-		"""
-		return self.get_possible_moves(board)
-
-	def add_move(
-		self, board_squares: List[Square], possible_moves: List[Square], 
-		*directions: Direction
-		):
-		"""
-		Add a square to the possible squares list by adding up the directions. 
-		Keep in mind that this does not account for pieces on the way to said
-		square (like a knight). 
-		"""
-		kls = self.__class__
-
-		horizontal_increment = 0
-		vertical_increment = 0
-
-		# TODO: move these class variables to chess_constants.py
-		for direction in directions:
-			if direction in kls.HORIZONTAL_DIRECTIONS:
-				horizontal_increment += direction.value * self.color.value
-			elif direction in kls.VERTICAL_DIRECTIONS:
-				vertical_increment += direction.value * self.color.value
-
-		horizontal_validity = self._check_can_move_horizontal(horizontal_increment)
-		vertical_validity = self._check_can_move_vertical(vertical_increment)
-
-		can_move_there = horizontal_validity and vertical_validity
-
-		if can_move_there:
-			total_increment = horizontal_increment + vertical_increment
-			new_square_index = self.square.index + total_increment
-
-			possible_moves.append(board_squares[new_square_index])
-
-	def _check_can_move_horizontal(self, direction_increment: int) -> bool:
-		"""Check if the piece can move in a certain horizontal direction."""
+		"""Get the squares the piece can legally move to."""
 		index = self.square.index
+		targets = 0
 
-		row_current = index // 8
-		row_after = (index + direction_increment) // 8
-
-		if row_current != row_after:
-			# Piece cannot move in this direction any further
-			return False
-
-		return True
+		for move in board.legal_moves():
+			if move & 63 == index:
+				targets |= 1 << ((move >> 6) & 63)
 
-	def _check_can_move_vertical(self, direction_increment: int) -> bool:
-		"""Check if the piece can move in a certain vertical direction."""
-		new_square_index = self.square.index + direction_increment
+		return board.get_squares(targets)
 
-		if new_square_index < 0 or new_square_index >= 64:
-			return False
-
-		return True
-
-	@staticmethod
-	def get_directions() -> Tuple[Direction, Direction, Direction, Direction]:
-		"""Get the move directions in the order; Forward, back, right, left."""
-		return Direction.FORWARD, Direction.BACK, Direction.RIGHT, Direction.LEFT
-
-	def get_number_directions(self) -> Tuple[int, int, int, int]:
-		"""
-		Get the move directions as in square differences 
-		in the order; Forward, back, right, left.
+	def get_attacked_squares(self, board: 'Board') -> List[Square]:
 		"""
-		number_directions = (d.value*self.color.value for d in self.get_directions())
-
-		return number_directions
+		Get the attacked squares of the piece.
 
-	def irow(self, inc: int = 0) -> int:
-		"""Return the row of the piece as an integer between 0 and 7."""
-		return (self.square.index+inc) // 8
+		This differs from the possible moves for pawns, which do not attack 
+		the squares in front of them, and it includes squares that are 
+		occupied by pieces of the same color.
+		"""
+		attacks = board.position.piece_attacks(self.square.index)
 
-	def icol(self, inc: int = 0) -> int:
-		"""Return the column of the piece as an integer between 0 and 7."""
-		return (self.square.index+inc) % 8
+		return board.get_squares(attacks)
 
 
 ################################
@@ -245,436 +183,54 @@ class BasePiece(RenderablePiece):
 ################################
 
 
-class FirstMovePiece(BasePiece):
-	"""Pieces that have special first moves."""
-
-	def __init__(self, *args, **kwargs):
-		"""Initialize the piece with a boolean has_moved attribute."""
-		super().__init__(*args, **kwargs)
-		self.has_moved: bool = False
-
-
-class Pawn(FirstMovePiece):
+class Pawn(BasePiece):
 	"""Represents a pawn on the chessboard."""
 	PIECE_X_OFFSET = PIECE_SIZE_X*5
-	points = 1
+	piece_type = PAWN
+	points = PIECE_POINTS[PAWN]
 	notation = 'P'  # used for graphics
 	PROMOTION_CHOICES = ['Queen', 'Rook', 'Bishop', 'Knight']
 
-	def get_possible_moves(self, board):
-		"""Generate the possible moves for a pawn, including captures."""
-		# TODO: Promotions
-		# TODO: En-passant
-		possible_moves = []
-		i = self.square.index
-
-		# Get the forward direction value
-		forward: int = Direction.FORWARD.value*self.color.value
-
-		# First of all, check if the pawn can move forward.
-		if self._check_can_move_vertical(forward):
-			# One square forward
-			move_square = board.squares[i + forward]
-			piece_in_front_of_me = board.get_piece_occupying_square(move_square)
-
-			if piece_in_front_of_me is None:
-				if self._check_can_move_vertical(forward):
-					possible_moves.append(move_square)
-
-			# Two squares forward
-			if not self.has_moved and piece_in_front_of_me is None:
-				move_square = board.squares[i + 2*forward]
-
-				if board.get_piece_occupying_square(move_square) is None:
-					possible_moves.append(move_square)
-
-			# Get left and right direction values to be used for captures
-			left: int = Direction.LEFT.value * self.color.value
-			right: int = Direction.RIGHT.value * self.color.value
 
-			# Left diagonal capture
-			if self._check_can_move_horizontal(left):
-				capture_square = board.squares[i + forward + left]
-				occupying_piece = board.get_piece_occupying_square(capture_square)
-
-				if occupying_piece is not None and occupying_piece.color != self.color:
-					possible_moves.append(capture_square)
-
-			# Right diagonal capture
-			if self._check_can_move_horizontal(right):
-				capture_square = board.squares[i + forward + right]
-				occupying_piece = board.get_piece_occupying_square(capture_square)
-
-				if occupying_piece is not None and occupying_piece.color != self.color:
-					possible_moves.append(capture_square)
-
-		return possible_moves
-
-	def get_attacked_squares(self, board):
-		possible_moves = self.get_possible_moves(board)
-
-		# A pawn doesn't "attack" the squares in front
-		forward = Direction.FORWARD.value*self.color.value
-		one_square_up = self.square.index + forward
-		two_squares_up = one_square_up + forward
-
-		remove_square_if_in_possible_moves(one_square_up, possible_moves)
-		remove_square_if_in_possible_moves(two_squares_up, possible_moves)
-
-		return possible_moves
-
-
-class Rook(FirstMovePiece):
+class Rook(BasePiece):
 	"""Represents a rook on the chessboard."""
 	PIECE_X_OFFSET = PIECE_SIZE_X*2
-	points = 5
+	piece_type = ROOK
+	points = PIECE_POINTS[ROOK]
 	notation = 'R'
 
-	def get_possible_moves(self, board):
-		"""Generate moves for a rook, keeping the blocking pieces in mind."""
-		possible_moves = []
-		index = self.square.index
-
-		# Get the directions with square index differences.
-		f, b, r, l = self.get_number_directions()
-
-		# Create flags to check if we should keep generating moves in that direction.
-		generate_fwd, generate_bwd, generate_right, generate_left = True, True, True, True
-
-		for i in range(1, 8):  # loop between 1-7
-			# Forward
-			if generate_fwd:
-				fwd_increment = f*i
-
-				if self._check_can_move_vertical(fwd_increment):
-					move_square = board.squares[index + fwd_increment]
-
-					occupying_piece = board.get_piece_occupying_square(move_square)
 
-					if occupying_piece is None:
-						possible_moves.append(move_square)
-					else:
-						possible_moves.append(move_square)
-						generate_fwd = False
-
-			# Backward
-			if generate_bwd:
-				bwd_increment = b*i
-
-				if self._check_can_move_vertical(bwd_increment):
-					move_square = board.squares[index + bwd_increment]
-
-					occupying_piece = board.get_piece_occupying_square(move_square)
-
-					if occupying_piece is None:
-						possible_moves.append(move_square)
-					else:
-						possible_moves.append(move_square)
-						generate_bwd = False
-
-			# Right
-			if generate_right:
-				right_increment = r*i
-
-				if self._check_can_move_horizontal(right_increment):
-					move_square = board.squares[index + right_increment]
-
-					occupying_piece = board.get_piece_occupying_square(move_square)
-
-					if occupying_piece is None:
-						possible_moves.append(move_square)
-					else:
-						possible_moves.append(move_square)
-						generate_right = False
-
-			# Left
-			if generate_left:
-				left_increment = l*i
-
-				if self._check_can_move_horizontal(left_increment):
-					move_square = board.squares[index + left_increment]
-
-					occupying_piece = board.get_piece_occupying_square(move_square)
-
-					if occupying_piece is None:
-						possible_moves.append(move_square)
-					else:
-						possible_moves.append(move_square)
-						generate_left = False
-
-		return possible_moves
-
-
-class King(FirstMovePiece):
+class King(BasePiece):
 	"""Represents a king on the chessboard."""
 	PIECE_X_OFFSET = PIECE_SIZE_X*0
+	piece_type = KING
+	points = PIECE_POINTS[KING]
 	notation = 'K'
 
-	def __init__(self, *args, **kwargs):
-		super().__init__(*args, **kwargs)
-
-		# Declare the castling rights variables here
-		self.fen_kingside_right: bool
-		self.fen_queenside_right: bool
-
-	def init_fen_castling_rights(self, castling_rights: str) -> None:
-		"""Initializes the castling rights for the king from the entered FEN."""
-		if 'k' in castling_rights.lower():
-			self.fen_kingside_right = True
-		else:
-			self.fen_kingside_right = False
-
-		if 'q' in castling_rights.lower():
-			self.fen_queenside_right = True
-		else:
-			self.fen_queenside_right = False
-
-	def get_castling_rights(self, board: 'Board', for_fen=True) -> str:
-		if self.has_moved:
-			return ""
-
-		castling_rights = ""
-
-		if self.fen_kingside_right:
-			if self.can_castle_kingside(board, for_fen=for_fen):
-				castling_rights += 'K'
-
-		if self.fen_queenside_right:
-			if self.can_castle_queenside(board, for_fen=for_fen):
-				castling_rights += 'Q'
-
-		return castling_rights
-
-	def get_possible_moves(self, board):
-		possible_moves = []
-
-		# Get directions
-		f, b, r, l = self.get_directions()
-
-		# Forward moves
-		self.add_move(board.squares, possible_moves, f)
-		self.add_move(board.squares, possible_moves, f, r)
-		self.add_move(board.squares, possible_moves, f, l)
-
-		# Backward moves
-		self.add_move(board.squares, possible_moves, b)
-		self.add_move(board.squares, possible_moves, b, r)
-		self.add_move(board.squares, possible_moves, b, l)
-
-		# Horizontal moves
-		self.add_move(board.squares, possible_moves, r)
-		self.add_move(board.squares, possible_moves, l)
-
-		# Castling moves - The rook will be moved in the 'Move' class.
-		if not self.has_moved:
-			# Reverse directions if it's a black king
-			if self.color == ChessColor.DARK:
-				previous_l = l
-				l = r
-				r = previous_l
-
-			# Queenside castling
-			if self.can_castle_queenside(board):
-				self.add_move(board.squares, possible_moves, l, l)
-
-			# Kingside castling
-			if self.can_castle_kingside(board):
-				self.add_move(board.squares, possible_moves, r, r)
-
-		return possible_moves
-
-	def can_castle_queenside(self, board: 'Board', for_fen=False) -> bool:
-		"""Checks if the king can castle queenside."""
-		# Check if the entered FEN grants this castling right
-		if not self.fen_queenside_right:
-			return False
-
-		# If there are pieces in the way, cancel move generation.
-		l = Direction.LEFT.value
-		index = self.square.index
-
-		for i in range(1, 4):  # loops between 1-3
-			l_increment = l*i
-			next_square = board.squares[index + l_increment]
-			if board.get_piece_occupying_square(next_square) is not None:
-				# There are pieces in the way, cannot castle.
-				if not for_fen:
-					return False
-
-		# 4 squares left
-		return self._can_castle(board, 4*l)
-
-	def can_castle_kingside(self, board: 'Board', for_fen=False) -> bool:
-		"""Checks if the king can castle kingside."""
-		# Check if the entered FEN grants this castling right
-		if not self.fen_kingside_right:
-			return False
-
-		# If there are pieces in the way, cancel move generation.
-		r = Direction.RIGHT.value
-		index = self.square.index
-
-		for i in range(1, 3):  # loops between 1-2
-			r_increment = r*i
-			next_square = board.squares[index + r_increment]
-			if board.get_piece_occupying_square(next_square) is not None:
-				# There are pieces in the way, cannot castle.
-				if not for_fen:
-					return False
-
-		# 3 squares right
-		return self._can_castle(board, 3*r)
-
-	def _can_castle(self, board: 'Board', increment: int) -> bool:
-		"""Implements the castling right logic."""
-		# Get the rook to castle with.
-		rook_square = board.squares[self.square.index + increment]
-		rook = board.get_piece_occupying_square(rook_square)
-
-		if not rook.__class__ == Rook:
-			# The piece is not even a rook
-			return False
-
-		if rook is not None:
-			if not rook.has_moved:
-				# The rook hasn't moved, we can castle.
-				return True
-			else:
-				# The rook has moved, we cannot castle.
-				return False
-		else:
-			# The rook is not where it should be for us to castle!
-			return False
-
 
 class Knight(BasePiece):
 	"""Represents a knight on the chessboard."""
 	PIECE_X_OFFSET = PIECE_SIZE_X*4
-	points = 3
+	piece_type = KNIGHT
+	points = PIECE_POINTS[KNIGHT]
 	notation = 'N'
 
-	def get_possible_moves(self, board):
-		"""Generate the possible moves for the piece."""
-		possible_moves = []
-
-		# Get directions
-		f, b, r, l = self.get_directions()
-
-		# Forward moves
-		self.add_move(board.squares, possible_moves, f, f, r)
-		self.add_move(board.squares, possible_moves, f, f, l)
-
-		# Right moves
-		self.add_move(board.squares, possible_moves, r, r, f)
-		self.add_move(board.squares, possible_moves, r, r, b)
-
-		# Back moves
-		self.add_move(board.squares, possible_moves, b, b, r)
-		self.add_move(board.squares, possible_moves, b, b, l)
-
-		# Left moves
-		self.add_move(board.squares, possible_moves, l, l, f)
-		self.add_move(board.squares, possible_moves, l, l, b)
-
-		return possible_moves
-
 
 class Bishop(BasePiece):
 	"""Represents a bishop on the chessboard."""
 	PIECE_X_OFFSET = PIECE_SIZE_X*3
-	points = 3
+	piece_type = BISHOP
+	points = PIECE_POINTS[BISHOP]
 	notation = 'B'
 
-	def get_possible_moves(self, board):
-		possible_moves = []
-		index = self.square.index
-
-		# Get the directions with square index differences.
-		f, b, r, l = self.get_number_directions()
-
-		# Create flags to check if we should keep generating moves in that direction.
-		generate_rf, generate_rb, generate_lf, generate_lb = True, True, True, True
-
-		for i in range(1, 8):  # loop between 1-7
-			f_increment = f*i
-			b_increment = b*i
-			r_increment = r*i
-			l_increment = l*i
-
-			can_move_f = self._check_can_move_vertical(f_increment)
-			can_move_b = self._check_can_move_vertical(b_increment)
-			can_move_r = self._check_can_move_horizontal(r_increment)
-			can_move_l = self._check_can_move_horizontal(l_increment)
 
-			# Right forward
-			if generate_rf:
-				if can_move_r and can_move_f:
-					move_square = board.squares[index + r_increment + f_increment]
-
-					occupying_piece = board.get_piece_occupying_square(move_square)
-
-					if occupying_piece is None:
-						possible_moves.append(move_square)
-					else:
-						possible_moves.append(move_square)
-						generate_rf = False
-
-			# Right backward
-			if generate_rb:
-				if can_move_r and can_move_b:
-					move_square = board.squares[index + r_increment + b_increment]
-
-					occupying_piece = board.get_piece_occupying_square(move_square)
-
-					if occupying_piece is None:
-						possible_moves.append(move_square)
-					else:
-						possible_moves.append(move_square)
-						generate_rb = False
-
-			# Left forward
-			if generate_lf:
-				if can_move_l and can_move_f:
-					move_square = board.squares[index + l_increment + f_increment]
-
-					occupying_piece = board.get_piece_occupying_square(move_square)
-
-					if occupying_piece is None:
-						possible_moves.append(move_square)
-					else:
-						possible_moves.append(move_square)
-						generate_lf = False
-
-			# Left backward
-			if generate_lb:
-				if can_move_l and can_move_b:
-					move_square = board.squares[index + l_increment + b_increment]
-
-					occupying_piece = board.get_piece_occupying_square(move_square)
-
-					if occupying_piece is None:
-						possible_moves.append(move_square)
-					else:
-						possible_moves.append(move_square)
-						generate_lb = False
-
-		return possible_moves
-
-
-class Queen(Bishop, Rook):
+class Queen(BasePiece):
 	"""Represents a queen on the chessboard."""
 	PIECE_X_OFFSET = PIECE_SIZE_X*1
-	points = 9
+	piece_type = QUEEN
+	points = PIECE_POINTS[QUEEN]
 	notation = 'Q'
 
-	def get_possible_moves(self, board):
-		bishop_moves = Bishop.get_possible_moves(self, board)
-		rook_moves = Rook.get_possible_moves(self, board)
-
-		return bishop_moves + rook_moves
-
-	def get_attacked_squares(self, board):
-		bishop_attacks = Bishop.get_attacked_squares(self, board)
-		rook_attacks = Rook.get_attacked_squares(self, board)
 
-		return bishop_attacks + rook_attacks
+# Piece classes indexed by the bitboard piece types
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
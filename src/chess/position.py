@@ -0,0 +1,740 @@
+"""
+This module contains the bitboard representation of a chess position.
+
+The position knows nothing about graphics. It keeps one bitboard per
+piece type and color, occupancy bitboards and a mailbox (square -> piece)
+so that both set-wise and square-wise queries are cheap.
+"""
+
+# Type annotations
+from typing import Dict, Iterator, List, Tuple, Union
+
+from .chess_constants import (
+	DEFAULT_POSITION_FEN, WHITE, BLACK,
+	PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_SYMBOLS,
+	WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE,
+	SQUARE_NAMES
+)
+from .bitboard import (
+	FULL, RANK_4, RANK_5, iter_bits, lsb, between,
+	KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
+	ROOK_MASKS, ROOK_TABLES, BISHOP_MASKS, BISHOP_TABLES
+)
+from .zobrist import PIECE_KEYS, TURN_KEY, CASTLING_KEYS, compute_key, ep_key
+
+
+# Define what can be imported from this module
+__all__ = [
+	'Position', 'encode_move', 'move_from', 'move_to',
+	'move_promotion', 'move_to_uci'
+]
+
+
+#############################
+####### MOVE ENCODING #######
+#############################
+
+
+# A move is a single integer: from | to << 6 | promotion piece type << 12
+def encode_move(from_square: int, to_square: int, promotion: int = 0) -> int:
+	"""Pack a move into an integer."""
+	return from_square | (to_square << 6) | (promotion << 12)
+
+
+def move_from(move: int) -> int:
+	"""Get the square index the move starts from."""
+	return move & 63
+
+
+def move_to(move: int) -> int:
+	"""Get the square index the move goes to."""
+	return (move >> 6) & 63
+
+
+def move_promotion(move: int) -> int:
+	"""Get the piece type the pawn promotes to, 0 if the move is not a promotion."""
+	return move >> 12
+
+
+def move_to_uci(move: int) -> str:
+	"""Get the move in UCI notation, e.g. 'e2e4' or 'e7e8q'."""
+	uci = SQUARE_NAMES[move & 63] + SQUARE_NAMES[(move >> 6) & 63]
+
+	promotion = move >> 12
+	if promotion:
+		uci += PIECE_SYMBOLS[promotion + 6]
+
+	return uci
+
+
+#############################
+######### CASTLING ##########
+#############################
+
+
+# Castling rights that are kept when a move starts or ends on a square
+CASTLING_MASK = [WHITE_KINGSIDE | WHITE_QUEENSIDE | BLACK_KINGSIDE | BLACK_QUEENSIDE] * 64
+CASTLING_MASK[60] ^= WHITE_KINGSIDE | WHITE_QUEENSIDE  # e1
+CASTLING_MASK[63] ^= WHITE_KINGSIDE  # h1
+CASTLING_MASK[56] ^= WHITE_QUEENSIDE  # a1
+CASTLING_MASK[4] ^= BLACK_KINGSIDE | BLACK_QUEENSIDE  # e8
+CASTLING_MASK[7] ^= BLACK_KINGSIDE  # h8
+CASTLING_MASK[0] ^= BLACK_QUEENSIDE  # a8
+
+# (right, king from, king to, rook from, squares that must be empty, squares the king crosses)
+_CASTLING = (
+	(
+		(WHITE_KINGSIDE, 60, 62, 63, (1 << 61) | (1 << 62), (60, 61, 62)),
+		(WHITE_QUEENSIDE, 60, 58, 56, (1 << 57) | (1 << 58) | (1 << 59), (60, 59, 58)),
+	),
+	(
+		(BLACK_KINGSIDE, 4, 6, 7, (1 << 5) | (1 << 6), (4, 5, 6)),
+		(BLACK_QUEENSIDE, 4, 2, 0, (1 << 1) | (1 << 2) | (1 << 3), (4, 3, 2)),
+	),
+)
+
+# King destination -> (rook from, rook to)
+CASTLING_ROOK = {62: (63, 61), 58: (56, 59), 6: (7, 5), 2: (0, 3)}
+
+# The castling field of the FEN, indexed by the castling rights bit flags
+_CASTLING_STRINGS = tuple(
+	''.join(ch for i, ch in enumerate('KQkq') if rights & (1 << i)) or '-' for rights in range(16)
+)
+
+_PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+
+#############################
+####### THE POSITION ########
+#############################
+
+
+class Position:
+	"""Represents a chess position with bitboards."""
+
+	def __init__(self, fen: str = DEFAULT_POSITION_FEN):
+		"""Initialize the position from a FEN string."""
+		self.bitboards: List[int] = [0] * 12  # indexed by piece code
+		self.occupancy: List[int] = [0, 0]  # indexed by color
+		self.occupied: int = 0
+		self.mailbox: List[Union[int, None]] = [None] * 64
+
+		self.turn: int = WHITE
+		self.castling: int = 0
+		self.ep_square: Union[int, None] = None
+		self.halfmove_clock: int = 0
+		self.fullmove_number: int = 1
+
+		# The Zobrist key of the position, kept up to date on every change
+		self.key: int = 0
+
+		# FEN placement strings per row, None when the row changed since it was last emitted
+		self._rank_strings: List[Union[str, None]] = [None] * 8
+
+		# (move, captured piece, castling, en passant square, halfmove clock, key) per move
+		self._undo_stack: List[Tuple] = []
+
+		self.set_fen(fen)
+
+	# FEN I/O
+	def set_fen(self, fen: str) -> None:
+		"""Set up the position from a FEN string."""
+		fields = fen.split()
+		if len(fields) < 4:
+			raise ValueError(f'Invalid FEN, expected at least 4 fields: {fen!r}')
+
+		ranks = fields[0].split('/')
+		if len(ranks) != 8:
+			raise ValueError(f'Invalid FEN, expected 8 ranks: {fen!r}')
+
+		self._clear()
+
+		for row, rank in enumerate(ranks):
+			self._parse_rank(rank, row)
+
+		# Move turn
+		if fields[1] not in ('w', 'b'):
+			raise ValueError(f'Invalid FEN, unknown move turn: {fields[1]}')
+		self.turn = WHITE if fields[1] == 'w' else BLACK
+
+		# Castling rights
+		if fields[2] != '-':
+			for ch in fields[2]:
+				flag = 'KQkq'.find(ch)
+				if flag < 0:
+					raise ValueError(f'Invalid FEN, unknown castling right: {ch}')
+				self.castling |= 1 << flag
+
+		# En passant square
+		if fields[3] != '-':
+			if fields[3] not in SQUARE_NAMES:
+				raise ValueError(f'Invalid FEN, unknown en passant square: {fields[3]}')
+			ep_square = SQUARE_NAMES.index(fields[3])
+
+			# Only keep a square a double push passed, push() captures the pawn that made it
+			pawn_square = ep_square + (8 if self.turn == WHITE else -8)
+			if (
+				ep_square // 8 == (2 if self.turn == WHITE else 5)
+				and self.mailbox[ep_square] is None
+				and self.mailbox[pawn_square] == (self.turn ^ 1)*6 + PAWN
+			):
+				self.ep_square = ep_square
+
+		# Clocks are optional so that EPD-style lines can be loaded as well
+		self.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+		self.fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+
+		# The pieces are already in the key
+		if self.turn == BLACK:
+			self.key ^= TURN_KEY
+		self.key ^= CASTLING_KEYS[self.castling] ^ ep_key(self)
+
+	def _parse_rank(self, rank: str, row: int) -> None:
+		"""Parse a rank of the FEN placement field, row 0 being rank 8."""
+		bitboards = self.bitboards
+		mailbox = self.mailbox
+		occupied = 0
+		key = 0
+		index = row*8
+		end = index + 8
+
+		for ch in rank:
+			if ch in '12345678':
+				index += int(ch)
+			else:
+				code = PIECE_SYMBOLS.find(ch)
+				if code < 0:
+					if ch.isdigit():
+						raise ValueError(f'Invalid FEN, cannot skip {ch} squares')
+					raise ValueError(f'Invalid input: {ch}')
+				if index >= end:
+					raise ValueError(f'Invalid FEN, rank {8 - row} is too long')
+
+				b = 1 << index
+				bitboards[code] |= b
+				self.occupancy[code // 6] |= b
+				occupied |= b
+				mailbox[index] = code
+				key ^= PIECE_KEYS[code*64 + index]
+				index += 1
+
+		if index != end:
+			raise ValueError(f'Invalid FEN, rank {8 - row} does not have 8 squares')
+
+		self.occupied |= occupied
+		self.key ^= key
+
+	def fen(self) -> str:
+		"""Get the FEN string of the position."""
+		rank_strings = self._rank_strings
+		ranks = [
+			rank_str if rank_str is not None else self.rank_fen(row)
+			for row, rank_str in enumerate(rank_strings)
+		]
+
+		ep_square = SQUARE_NAMES[self.ep_square] if self.ep_square is not None else '-'
+
+		return (
+			f"{'/'.join(ranks)} {'w' if self.turn == WHITE else 'b'} "
+			f'{_CASTLING_STRINGS[self.castling]} {ep_square} '
+			f'{self.halfmove_clock} {self.fullmove_number}'
+		)
+
+	def rank_fen(self, row: int) -> str:
+		"""
+		Get the FEN placement string of a rank, row 0 being rank 8. The
+		string is cached until a piece on the rank is put or removed.
+		"""
+		rank_str = self._rank_strings[row]
+		if rank_str is not None:
+			return rank_str
+
+		rank_str = ""
+		skipped = 0
+
+		for code in self.mailbox[row*8: (row + 1)*8]:
+			if code is None:
+				skipped += 1
+				continue
+
+			if skipped:
+				rank_str += str(skipped)
+				skipped = 0
+			rank_str += PIECE_SYMBOLS[code]
+
+		if skipped:
+			rank_str += str(skipped)
+
+		self._rank_strings[row] = rank_str
+		return rank_str
+
+	# Piece placement
+	def _clear(self) -> None:
+		"""Remove every piece and reset the game state."""
+		self.bitboards = [0] * 12
+		self.occupancy = [0, 0]
+		self.occupied = 0
+		self.mailbox = [None] * 64
+
+		self.turn = WHITE
+		self.castling = 0
+		self.ep_square = None
+		self.halfmove_clock = 0
+		self.fullmove_number = 1
+
+		self.key = 0
+		self._rank_strings = [None] * 8
+		self._undo_stack = []
+
+	def put_piece(self, code: int, square: int) -> None:
+		"""Put a piece on an empty square."""
+		b = 1 << square
+		self.bitboards[code] |= b
+		self.occupancy[code // 6] |= b
+		self.occupied |= b
+		self.mailbox[square] = code
+		self.key ^= PIECE_KEYS[code*64 + square]
+		self._rank_strings[square >> 3] = None
+
+	def remove_piece(self, square: int) -> int:
+		"""Remove the piece on a square and return its code."""
+		code = self.mailbox[square]
+		b = 1 << square
+		self.bitboards[code] ^= b
+		self.occupancy[code // 6] ^= b
+		self.occupied ^= b
+		self.mailbox[square] = None
+		self.key ^= PIECE_KEYS[code*64 + square]
+		self._rank_strings[square >> 3] = None
+
+		return code
+
+	# Getters
+	def piece_at(self, square: int) -> Union[int, None]:
+		"""Get the code of the piece on a square, None if the square is empty."""
+		return self.mailbox[square]
+
+	def pieces(self, piece_type: int, color: int) -> int:
+		"""Get the bitboard of the pieces with the given type and color."""
+		return self.bitboards[color*6 + piece_type]
+
+	def king_square(self, color: int) -> int:
+		"""Get the square index of the king of the given color."""
+		return lsb(self.bitboards[color*6 + KING])
+
+	# Attacks
+	def piece_attacks(self, square: int) -> int:
+		"""Get the squares the piece on the given square attacks."""
+		code = self.mailbox[square]
+		piece_type = code % 6
+
+		if piece_type == PAWN:
+			return PAWN_ATTACKS[code // 6][square]
+		elif piece_type == KNIGHT:
+			return KNIGHT_ATTACKS[square]
+		elif piece_type == BISHOP:
+			return BISHOP_TABLES[square][self.occupied & BISHOP_MASKS[square]]
+		elif piece_type == ROOK:
+			return ROOK_TABLES[square][self.occupied & ROOK_MASKS[square]]
+		elif piece_type == QUEEN:
+			return (
+				ROOK_TABLES[square][self.occupied & ROOK_MASKS[square]]
+				| BISHOP_TABLES[square][self.occupied & BISHOP_MASKS[square]]
+			)
+
+		return KING_ATTACKS[square]
+
+	def attacks_by(self, color: int) -> int:
+		"""Get every square attacked by the pieces of the given color."""
+		attacks = 0
+		for square in iter_bits(self.occupancy[color]):
+			attacks |= self.piece_attacks(square)
+
+		return attacks
+
+	def is_square_attacked(self, square: int, by_color: int) -> bool:
+		"""
+		Check if a square is attacked by the given color. This works outward
+		from the square: a piece attacks the square if the same kind of piece
+		placed on the square would attack it back.
+		"""
+		bitboards = self.bitboards
+		offset = by_color*6
+
+		if KNIGHT_ATTACKS[square] & bitboards[offset + KNIGHT]:
+			return True
+		if PAWN_ATTACKS[by_color ^ 1][square] & bitboards[offset + PAWN]:
+			return True
+		if KING_ATTACKS[square] & bitboards[offset + KING]:
+			return True
+
+		queens = bitboards[offset + QUEEN]
+		diagonal = bitboards[offset + BISHOP] | queens
+		if diagonal and BISHOP_TABLES[square][self.occupied & BISHOP_MASKS[square]] & diagonal:
+			return True
+
+		straight = bitboards[offset + ROOK] | queens
+		if straight and ROOK_TABLES[square][self.occupied & ROOK_MASKS[square]] & straight:
+			return True
+
+		return False
+
+	def attackers(self, square: int, by_color: int, occupied: Union[int, None] = None) -> int:
+		"""
+		Get the pieces of the given color that attack a square. A different
+		occupancy can be given to look through pieces that are moving away.
+		"""
+		if occupied is None:
+			occupied = self.occupied
+
+		bitboards = self.bitboards
+		offset = by_color*6
+		queens = bitboards[offset + QUEEN]
+
+		return (
+			(KNIGHT_ATTACKS[square] & bitboards[offset + KNIGHT])
+			| (PAWN_ATTACKS[by_color ^ 1][square] & bitboards[offset + PAWN])
+			| (KING_ATTACKS[square] & bitboards[offset + KING])
+			| (BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]] & (bitboards[offset + BISHOP] | queens))
+			| (ROOK_TABLES[square][occupied & ROOK_MASKS[square]] & (bitboards[offset + ROOK] | queens))
+		)
+
+	def king_in_check(self, color: int) -> bool:
+		"""Check if the king of the given color is attacked."""
+		king = self.bitboards[color*6 + KING]
+		if not king:
+			return False
+
+		return self.is_square_attacked(lsb(king), color ^ 1)
+
+	def is_check(self) -> bool:
+		"""Check if the side to move is in check."""
+		return self.king_in_check(self.turn)
+
+	# Move generation
+	def piece_moves(self, square: int) -> int:
+		"""Get the pseudo-legal target squares of the piece on the given square."""
+		code = self.mailbox[square]
+		color = code // 6
+		piece_type = code % 6
+
+		if piece_type == PAWN:
+			return self._pawn_targets(square, color)
+
+		targets = self.piece_attacks(square) & ~self.occupancy[color]
+		if piece_type == KING:
+			targets |= self._castling_targets(color)
+
+		return targets
+
+	def _pawn_targets(self, square: int, color: int) -> int:
+		"""Get the pushes and captures of a pawn, including en passant."""
+		b = 1 << square
+		empty = FULL ^ self.occupied
+
+		if color == WHITE:
+			single = (b >> 8) & empty
+			double = (single >> 8) & empty & RANK_4
+		else:
+			single = (b << 8) & empty
+			double = (single << 8) & empty & RANK_5
+
+		attacks = PAWN_ATTACKS[color][square]
+		captures = attacks & self.occupancy[color ^ 1]
+		if self.ep_square is not None:
+			captures |= attacks & (1 << self.ep_square)
+
+		return single | double | captures
+
+	def _castling_targets(self, color: int) -> int:
+		"""Get the squares the king of the given color can castle to."""
+		targets = 0
+		king = color*6 + KING
+		rook = color*6 + ROOK
+		enemy = color ^ 1
+
+		for right, king_from, king_to, rook_from, empty_mask, path in _CASTLING[color]:
+			if not self.castling & right or self.occupied & empty_mask:
+				continue
+			if self.mailbox[king_from] != king or self.mailbox[rook_from] != rook:
+				continue
+
+			# The king cannot castle out of, through or into check
+			if any(self.is_square_attacked(square, enemy) for square in path):
+				continue
+
+			targets |= 1 << king_to
+
+		return targets
+
+	def generate_pseudo_legal_moves(self) -> Iterator[int]:
+		"""Generate the encoded pseudo-legal moves of the side to move."""
+		color = self.turn
+		mailbox = self.mailbox
+
+		for square in iter_bits(self.occupancy[color]):
+			if mailbox[square] % 6 == PAWN:
+				for to_square in iter_bits(self._pawn_targets(square, color)):
+					if to_square < 8 or to_square >= 56:
+						for promotion in _PROMOTIONS:
+							yield square | (to_square << 6) | (promotion << 12)
+					else:
+						yield square | (to_square << 6)
+			else:
+				for to_square in iter_bits(self.piece_moves(square)):
+					yield square | (to_square << 6)
+
+	def generate_legal_moves(self) -> Iterator[int]:
+		"""
+		Generate the encoded legal moves of the side to move. Checkers and
+		pinned pieces are computed once, so no move has to be tried out.
+		"""
+		color = self.turn
+		enemy = color ^ 1
+		own = self.occupancy[color]
+		mailbox = self.mailbox
+
+		king = self.bitboards[color*6 + KING]
+		if not king:
+			# Without a king there is nothing to protect
+			yield from self.generate_pseudo_legal_moves()
+			return
+		king_square = lsb(king)
+
+		# The king may not step onto an attacked square, it is taken off the
+		# board while testing so that it doesn't hide squares behind itself
+		without_king = self.occupied ^ king
+		for to_square in iter_bits(KING_ATTACKS[king_square] & ~own):
+			if not self.attackers(to_square, enemy, without_king):
+				yield king_square | (to_square << 6)
+
+		checkers = self.attackers(king_square, enemy)
+		if checkers & (checkers - 1):
+			# Double check, only the king can move
+			return
+
+		if checkers:
+			# Other pieces must capture the checker or block the check
+			check_mask = between(king_square, lsb(checkers)) | checkers
+		else:
+			check_mask = FULL
+			for to_square in iter_bits(self._castling_targets(color)):
+				yield king_square | (to_square << 6)
+
+		pins = self._pins(king_square, color)
+		ep_bit = 1 << self.ep_square if self.ep_square is not None else 0
+
+		for square in iter_bits(own ^ king):
+			mask = check_mask & pins[square] if square in pins else check_mask
+
+			if mailbox[square] % 6 != PAWN:
+				for to_square in iter_bits(self.piece_attacks(square) & ~own & mask):
+					yield square | (to_square << 6)
+				continue
+
+			targets = self._pawn_targets(square, color)
+			if targets & ep_bit:
+				# En passant removes two pieces from a line, test it directly
+				targets ^= ep_bit
+				if self._is_ep_legal(square, king_square):
+					yield square | (self.ep_square << 6)
+
+			for to_square in iter_bits(targets & mask):
+				if to_square < 8 or to_square >= 56:
+					for promotion in _PROMOTIONS:
+						yield square | (to_square << 6) | (promotion << 12)
+				else:
+					yield square | (to_square << 6)
+
+	def _pins(self, king_square: int, color: int) -> Dict[int, int]:
+		"""Get the pinned pieces of the given color, mapped to the squares they can move to."""
+		enemy = color ^ 1
+		offset = enemy*6
+		bitboards = self.bitboards
+		own = self.occupancy[color]
+		their = self.occupancy[enemy]
+		queens = bitboards[offset + QUEEN]
+
+		# Enemy sliders that would attack the king if our pieces weren't there
+		snipers = (
+			(ROOK_TABLES[king_square][their & ROOK_MASKS[king_square]] & (bitboards[offset + ROOK] | queens))
+			| (BISHOP_TABLES[king_square][their & BISHOP_MASKS[king_square]] & (bitboards[offset + BISHOP] | queens))
+		)
+
+		pins = {}
+		for sniper in iter_bits(snipers):
+			line = between(king_square, sniper)
+			blockers = line & self.occupied
+
+			if blockers and not blockers & (blockers - 1) and blockers & own:
+				# Exactly one of our pieces is in the way, it is pinned
+				pins[lsb(blockers)] = line | (1 << sniper)
+
+		return pins
+
+	def _is_ep_legal(self, from_square: int, king_square: int) -> bool:
+		"""Check if capturing en passant from the given square leaves the king safe."""
+		ep_square = self.ep_square
+		captured = ep_square + (8 if self.turn == WHITE else -8)
+
+		occupied = (self.occupied ^ (1 << from_square) ^ (1 << captured)) | (1 << ep_square)
+		attackers = self.attackers(king_square, self.turn ^ 1, occupied)
+
+		return not attackers & ~(1 << captured)
+
+	def has_legal_moves(self) -> bool:
+		"""Check if the side to move has at least one legal move."""
+		for _ in self.generate_legal_moves():
+			return True
+
+		return False
+
+	def is_checkmate(self) -> bool:
+		"""Check if the side to move is checkmated."""
+		return self.is_check() and not self.has_legal_moves()
+
+	def is_stalemate(self) -> bool:
+		"""Check if the side to move is stalemated."""
+		return not self.is_check() and not self.has_legal_moves()
+
+	# Making moves
+	def push(self, move: int) -> None:
+		"""
+		Make a pseudo-legal move on the position. Only the squares the move
+		touches are updated, and what the move destroys is saved so that
+		pop() can take it back.
+		"""
+		from_square = move & 63
+		to_square = (move >> 6) & 63
+		promotion = move >> 12
+
+		color = self.turn
+		code = self.mailbox[from_square]
+		piece_type = code % 6
+
+		captured = self.mailbox[to_square]
+		self._undo_stack.append(
+			(move, captured, self.castling, self.ep_square, self.halfmove_clock, self.key)
+		)
+
+		# Take the state that is about to change out of the key
+		self.key ^= CASTLING_KEYS[self.castling] ^ ep_key(self)
+
+		if captured is not None:
+			self.remove_piece(to_square)
+
+		self.remove_piece(from_square)
+		self.put_piece(color*6 + promotion if promotion else code, to_square)
+
+		ep_square = None
+		if piece_type == PAWN:
+			if to_square == self.ep_square:
+				# En passant, the captured pawn is behind the TO square
+				captured = self.remove_piece(to_square + (8 if color == WHITE else -8))
+			elif abs(to_square - from_square) == 16:
+				ep_square = (from_square + to_square) // 2
+		elif piece_type == KING and abs(to_square - from_square) == 2:
+			# Castling, move the rook as well
+			rook_from, rook_to = CASTLING_ROOK[to_square]
+			self.put_piece(self.remove_piece(rook_from), rook_to)
+
+		self.castling &= CASTLING_MASK[from_square] & CASTLING_MASK[to_square]
+		self.ep_square = ep_square
+
+		if piece_type == PAWN or captured is not None:
+			self.halfmove_clock = 0
+		else:
+			self.halfmove_clock += 1
+
+		if color == BLACK:
+			self.fullmove_number += 1
+		self.turn = color ^ 1
+
+		self.key ^= TURN_KEY ^ CASTLING_KEYS[self.castling] ^ ep_key(self)
+
+	def pop(self) -> int:
+		"""Take back the last move and return it."""
+		move, captured, castling, ep_square, halfmove_clock, _ = self._undo_stack.pop()
+		from_square = move & 63
+		to_square = (move >> 6) & 63
+
+		self.key ^= TURN_KEY ^ CASTLING_KEYS[self.castling] ^ ep_key(self)
+
+		color = self.turn ^ 1
+		code = self.remove_piece(to_square)
+		if move >> 12:
+			# Promotion, the piece was a pawn before
+			code = color*6 + PAWN
+		self.put_piece(code, from_square)
+
+		piece_type = code % 6
+		if captured is not None:
+			self.put_piece(captured, to_square)
+		elif piece_type == PAWN and to_square == ep_square:
+			# En passant, put the captured pawn back behind the TO square
+			self.put_piece((color ^ 1)*6 + PAWN, to_square + (8 if color == WHITE else -8))
+		elif piece_type == KING and abs(to_square - from_square) == 2:
+			rook_from, rook_to = CASTLING_ROOK[to_square]
+			self.put_piece(self.remove_piece(rook_to), rook_from)
+
+		self.castling = castling
+		self.ep_square = ep_square
+		self.halfmove_clock = halfmove_clock
+
+		if color == BLACK:
+			self.fullmove_number -= 1
+		self.turn = color
+
+		self.key ^= CASTLING_KEYS[castling] ^ ep_key(self)
+
+		return move
+
+	def compute_key(self) -> int:
+		"""Compute the Zobrist key from scratch, to verify the incremental key."""
+		return compute_key(self)
+
+	def is_repetition(self, count: int = 3) -> bool:
+		"""Check if the position has occurred the given number of times."""
+		key = self.key
+		seen = 1
+
+		# Only positions since the last capture or pawn move can repeat
+		undo_stack = self._undo_stack
+		for i in range(len(undo_stack) - 2, max(len(undo_stack) - self.halfmove_clock, 0) - 1, -2):
+			if undo_stack[i][5] == key:
+				seen += 1
+				if seen >= count:
+					return True
+
+		return False
+
+	@property
+	def move_stack(self) -> List[int]:
+		"""The moves that were pushed onto the position, oldest first."""
+		return [undo[0] for undo in self._undo_stack]
+
+	def copy(self) -> 'Position':
+		"""Get an independent copy of the position."""
+		position = Position.__new__(Position)
+		position.bitboards = self.bitboards[:]
+		position.occupancy = self.occupancy[:]
+		position.occupied = self.occupied
+		position.mailbox = self.mailbox[:]
+
+		position.turn = self.turn
+		position.castling = self.castling
+		position.ep_square = self.ep_square
+		position.halfmove_clock = self.halfmove_clock
+		position.fullmove_number = self.fullmove_number
+
+		position.key = self.key
+		position._rank_strings = self._rank_strings[:]
+		position._undo_stack = self._undo_stack[:]
+
+		return position
+
+	def __str__(self):
+		return f'<Position: {self.fen()}>'
+
+	def __repr__(self):
+		return str(self)
@@ -0,0 +1,165 @@
+"""
+Standard algebraic notation (SAN) of moves, e.g. 'Nbd7', 'exd5', 'e8=Q+'
+or 'O-O'. Moves are matched against the legal moves of the position, so
+a SAN string that is ambiguous or illegal raises a ValueError.
+
+SAN is generated from the legal move list: the moves are grouped by piece
+and target square once, so disambiguating every move is linear in the
+number of moves. Only the check and mate suffixes need the move to be made.
+"""
+
+# Type annotations
+from typing import Dict, List, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from .position import Position
+
+import re
+
+from .chess_constants import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, SQUARE_NAMES
+
+
+# Define what can be imported from this module
+__all__ = ['parse_san', 'move_to_san', 'san_moves']
+
+
+_SAN_REGEX = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+
+# Piece letters and their piece types
+_PIECE_TYPES = {'N': KNIGHT, 'B': BISHOP, 'R': ROOK, 'Q': QUEEN, 'K': KING}
+
+# Piece letters indexed by piece type, pawns don't have one
+_PIECE_LETTERS = ('', 'N', 'B', 'R', 'Q', 'K')
+
+# (king from, kingside king to, queenside king to) by color
+_CASTLING_MOVES = ((60, 62, 58), (4, 6, 2))
+
+
+def parse_san(position: 'Position', san: str) -> int:
+	"""Get the encoded legal move of the position that the SAN string stands for."""
+	text = san.rstrip('+#!?')
+
+	if text in ('O-O', 'O-O-O', '0-0', '0-0-0'):
+		king_from, kingside_to, queenside_to = _CASTLING_MOVES[position.turn]
+		move = king_from | ((kingside_to if len(text) == 3 else queenside_to) << 6)
+
+		if position.mailbox[king_from] == position.turn*6 + KING:
+			for legal_move in position.generate_legal_moves():
+				if legal_move == move:
+					return move
+
+		raise ValueError(f'Illegal move: {san}')
+
+	match = _SAN_REGEX.match(text)
+	if match is None:
+		raise ValueError(f'Invalid SAN: {san}')
+
+	piece, from_file, from_rank, to_name, promotion = match.groups()
+	code = position.turn*6 + (_PIECE_TYPES[piece] if piece else PAWN)
+	to_square = SQUARE_NAMES.index(to_name)
+	promotion_type = _PIECE_TYPES[promotion] if promotion else 0
+
+	found = None
+	mailbox = position.mailbox
+	for move in position.generate_legal_moves():
+		from_square = move & 63
+		if (
+			(move >> 6) & 63 != to_square
+			or mailbox[from_square] != code
+			or move >> 12 != promotion_type
+		):
+			continue
+
+		from_name = SQUARE_NAMES[from_square]
+		if (from_file and from_name[0] != from_file) or (from_rank and from_name[1] != from_rank):
+			continue
+
+		if found is not None:
+			raise ValueError(f'Ambiguous move: {san}')
+		found = move
+
+	if found is None:
+		raise ValueError(f'Illegal move: {san}')
+
+	return found
+
+
+def _check_suffix(position: 'Position', move: int) -> str:
+	"""Get '+' if the move gives check, '#' if it mates and '' otherwise."""
+	position.push(move)
+	suffix = ''
+	if position.is_check():
+		suffix = '+' if position.has_legal_moves() else '#'
+	position.pop()
+
+	return suffix
+
+
+def _group_moves(position: 'Position', moves: List[int]) -> Dict[Tuple[int, int], List[int]]:
+	"""Group the from squares of the piece moves by (piece code, target square)."""
+	groups = {}
+	mailbox = position.mailbox
+
+	for move in moves:
+		from_square = move & 63
+		code = mailbox[from_square]
+		if code % 6 != PAWN:
+			# Pawn moves are never disambiguated by anything but the capturing file
+			groups.setdefault((code, (move >> 6) & 63), []).append(from_square)
+
+	return groups
+
+
+def _san(position: 'Position', move: int, groups: Dict[Tuple[int, int], List[int]]) -> str:
+	"""Get the SAN of a legal move without the check suffix."""
+	from_square = move & 63
+	to_square = (move >> 6) & 63
+	promotion = move >> 12
+	code = position.mailbox[from_square]
+	piece_type = code % 6
+
+	if piece_type == KING and abs(to_square - from_square) == 2:
+		return 'O-O' if to_square > from_square else 'O-O-O'
+
+	from_name = SQUARE_NAMES[from_square]
+	is_capture = position.mailbox[to_square] is not None
+
+	if piece_type == PAWN:
+		is_capture = is_capture or to_square == position.ep_square and from_square % 8 != to_square % 8
+		san = f'{from_name[0]}x' if is_capture else ''
+		san += SQUARE_NAMES[to_square]
+		if promotion:
+			san += '=' + _PIECE_LETTERS[promotion]
+
+		return san
+
+	# Disambiguate by file, then by rank, then by both
+	prefix = ''
+	others = [square for square in groups[(code, to_square)] if square != from_square]
+	if others:
+		if all(from_square % 8 != square % 8 for square in others):
+			prefix = from_name[0]
+		elif all(from_square // 8 != square // 8 for square in others):
+			prefix = from_name[1]
+		else:
+			prefix = from_name
+
+	return _PIECE_LETTERS[piece_type] + prefix + ('x' if is_capture else '') + SQUARE_NAMES[to_square]
+
+
+def move_to_san(position: 'Position', move: int, legal_moves: Union[List[int], None] = None) -> str:
+	"""
+	Get the SAN of a legal move of the position. The legal moves of the
+	position can be given if they are already known.
+	"""
+	if legal_moves is None:
+		legal_moves = list(position.generate_legal_moves())
+
+	return _san(position, move, _group_moves(position, legal_moves)) + _check_suffix(position, move)
+
+
+def san_moves(position: 'Position') -> Dict[int, str]:
+	"""Get the SAN of every legal move of the position."""
+	legal_moves = list(position.generate_legal_moves())
+	groups = _group_moves(position, legal_moves)
+
+	return {move: _san(position, move, groups) + _check_suffix(position, move) for move in legal_moves}
@@ -1,16 +1,12 @@
 # Type annotations
-from typing import Tuple, Union, NoReturn
+from typing import Dict, Tuple, Union, NoReturn
 
 import pygame as pg
 
 from graphics import Renderable
-from utils import blend_colors
 from .chess_constants import ChessColor
 
 
-pg.font.init()
-
-
 __all__ = ['Square']
 
 
@@ -43,6 +39,10 @@ class Square(Renderable):
 	DARK_SQUARE_COLOR = (140, 94, 67)
 	LIGHT_SQUARE_COLOR = (247, 237, 205)
 	CURRENT_SQUARE_HIGHLIGHT = (255, 222, 33, 0.5)
+	POSSIBLE_SQUARE_HIGHLIGHT = (106, 135, 77, 0.5)
+
+	# Highlight overlays by (RGBA color, square size), made once and blitted over squares
+	_overlays: Dict[Tuple, pg.Surface] = {}
 
 	def __init__(
 		self, color: ChessColor, pos: Tuple[int, int], 
@@ -51,7 +51,7 @@ class Square(Renderable):
 		"""Initialize the color and the position of the square."""
 		self.color = color
 		self._draw_color = self._init_draw_color()
-		self._highlight_color = self._init_highlight_color()
+		self._highlight_color: Union[Tuple[int, int, int, float], None] = None
 		self._colorname = 'LIGHT' if color == ChessColor.DARK else 'DARK'
 
 		self.center_x, self.center_y = pos
@@ -74,10 +74,6 @@ class Square(Renderable):
 		else:
 			return Square.DARK_SQUARE_COLOR
 
-	def _init_highlight_color(self) -> Tuple[int, int, int, float]:
-		"""Get the highlight color with the alpha channel."""
-		return self._draw_color[0], self._draw_color[1], self._draw_color[2], 1.0
-
 	def _init_rect(self, surface: pg.Surface) -> pg.Rect:
 		"""Get the rect of the square, ready to be rendered to the screen."""
 		coordinates = self.get_pos(surface)
@@ -93,20 +89,45 @@ class Square(Renderable):
 		return x, y
 
 	# Color-related methods
+	@property
+	def draw_color(self) -> Tuple[int, int, int]:
+		"""The RGB color of the square when it is not highlighted."""
+		return self._draw_color
+
+	@property
+	def highlight_color(self) -> Union[Tuple[int, int, int, float], None]:
+		"""The RGBA color the square is highlighted with, None if it isn't highlighted."""
+		return self._highlight_color
+
 	def highlight(self, highlight_color: Tuple[int, int, int, float]):
 		"""Highlight the square with a RGBA color."""
 		self._highlight_color = highlight_color
 
 	def unhighlight(self):
 		"""Unhighlight the square."""
-		self._highlight_color = self._init_highlight_color()  # re-init
-
-	def get_render_color(self):
-		"""Get the square's color for graphics."""
-		return blend_colors(self._highlight_color, self._draw_color)
+		self._highlight_color = None
+
+	@classmethod
+	def get_overlay(cls, highlight_color: Tuple[int, int, int, float]) -> pg.Surface:
+		"""Get the square-sized surface that highlights a square when blitted over it."""
+		key = (highlight_color, cls.SQUARE_SIZE)
+		overlay = cls._overlays.get(key)
+		if overlay is None:
+			overlay = pg.Surface((cls.SQUARE_SIZE, cls.SQUARE_SIZE)).convert()
+			overlay.fill(highlight_color[:3])
+			overlay.set_alpha(round(highlight_color[3] * 255))
+			cls._overlays[key] = overlay
+
+		return overlay
+
+	def render_highlight(self, surface: pg.Surface) -> None:
+		"""Render the highlight over the square if it is highlighted."""
+		if self._highlight_color is not None:
+			surface.blit(Square.get_overlay(self._highlight_color), self.rect)
 
 	def render(self, surface: pg.Surface):
-		pg.draw.rect(surface, self.get_render_color(), self.rect)
+		pg.draw.rect(surface, self._draw_color, self.rect)
+		self.render_highlight(surface)
 
 	def __str__(self):
 		"""String representation of a square."""
@@ -0,0 +1,26 @@
+"""
+This is the 'tablebase' package. It generates endgame
+tablebases with win/draw/loss and distance to mate by
+retrograde analysis, and probes them.
+"""
+
+import importlib
+
+from .probe import Tablebase, ProbeResult, WIN, DRAW, LOSS
+
+
+# Modules that can be run with python -m, importing them here would make runpy warn
+_CLI_MODULES = {
+	'generate_tablebases': '.generator',
+	'generate_table': '.generator',
+	'TableStats': '.generator',
+}
+
+
+def __getattr__(name: str):
+	"""Import the command line modules only when they are used."""
+	if name in _CLI_MODULES:
+		module = importlib.import_module(_CLI_MODULES[name], __name__)
+		return getattr(module, name)
+
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
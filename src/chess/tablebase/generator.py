@@ -0,0 +1,443 @@
+"""
+Generating tablebases by retrograde analysis.
+
+A table is made in two passes over its positions:
+	- Every legal placement is set up on a Position and its legal moves are
+	  generated, so the tables follow the move rules of the rest of the
+	  code. Captures and promotions lead to smaller tables, which are
+	  generated first and probed. The other moves are counted by the
+	  distinct positions they lead to. Mates are the first losses.
+	- Going back from the positions resolved at each ply, with unmoves:
+	  a position that can move into a loss is a win one ply later, and a
+	  position whose moves all lead to wins is a loss once the last one
+	  is resolved.
+Whatever is left unresolved is a draw.
+
+The tables that a signature needs are generated in waves, every table of
+a wave in its own worker process. Tables of 3 and 4 pieces take seconds
+to minutes, 5 pieces take hours in pure Python.
+
+Usage (from the src directory):
+	python -m chess.tablebase.generator KQvKR KPvK --directory tables --workers 4
+"""
+
+# Type annotations
+from typing import Callable, Dict, List, Set, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+
+import argparse
+import lzma
+import os
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from ..chess_constants import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from ..bitboard import KNIGHT_ATTACKS, KING_ATTACKS, FULL, iter_bits, rook_attacks, bishop_attacks
+from ..position import Position
+from .indexing import (
+	TableIndex, parse_signature, format_signature, normalize_signature,
+	DRAW_ENTRY, LOSS_ENTRY, INVALID_ENTRY, MAX_MOVES
+)
+from .probe import Tablebase, table_path, WIN, LOSS, DRAW
+
+
+# Define what can be imported from this module
+__all__ = ['generate_table', 'generate_tablebases', 'table_dependencies', 'TableStats']
+
+
+# The result of generating a table
+TableStats = namedtuple('TableStats', 'signature, positions, wins, draws, losses, longest_mate, seconds')
+
+MAX_PIECES = 5
+_MAX_PLIES = 2*MAX_MOVES
+
+_EMPTY_FEN = '8/8/8/8/8/8/8/8 w - - 0 1'
+
+
+#############################
+######## DEPENDENCIES #######
+#############################
+
+
+def table_dependencies(signature: str) -> List[str]:
+	"""Get the normalized signatures that captures and promotions lead to from a signature."""
+	sides = parse_signature(signature)
+	children = []
+
+	for color in (WHITE, BLACK):
+		own, other = sides[color], sides[color ^ 1]
+
+		# Captures of the other side's pieces
+		for i, piece_type in enumerate(other):
+			if piece_type != KING:
+				children.append((color, own, other[:i] + other[i + 1:]))
+
+		# Promotions, with or without a capture
+		if PAWN in own:
+			i = own.index(PAWN)
+			for promotion in (KNIGHT, BISHOP, ROOK, QUEEN):
+				promoted = own[:i] + own[i + 1:] + [promotion]
+				children.append((color, promoted, other))
+
+				for j, piece_type in enumerate(other):
+					if piece_type not in (PAWN, KING):
+						children.append((color, promoted, other[:j] + other[j + 1:]))
+
+	dependencies = set()
+	for color, own, other in children:
+		white, black = (own, other) if color == WHITE else (other, own)
+		dependency, _ = normalize_signature(format_signature(white, black))
+		if dependency != 'KvK':
+			dependencies.add(dependency)
+
+	return sorted(dependencies)
+
+
+#############################
+######### GENERATION ########
+#############################
+
+
+def _setup(position: Position, codes: List[int], squares: List[int], turn: int) -> None:
+	"""Put the pieces of the slots on their squares."""
+	for square in list(iter_bits(position.occupied)):
+		position.remove_piece(square)
+
+	for code, square in zip(codes, squares):
+		position.put_piece(code, square)
+	position.turn = turn
+
+
+def _origins(code: int, square: int, occupied: int) -> int:
+	"""Get the empty squares the piece on the square could have come from without capturing."""
+	empty = FULL ^ occupied
+	piece_type = code % 6
+
+	if piece_type == PAWN:
+		origins = 0
+		step = 8 if code // 6 == WHITE else -8
+		back = square + step
+		if not (occupied >> back) & 1 and 8 <= back < 56:
+			origins |= 1 << back
+
+			# Double pushes end on the 4th rank for white and the 5th for black
+			if (square >> 3) == (4 if step == 8 else 3) and not (occupied >> (back + step)) & 1:
+				origins |= 1 << (back + step)
+
+		return origins
+
+	if piece_type == KNIGHT:
+		return KNIGHT_ATTACKS[square] & empty
+	if piece_type == BISHOP:
+		return bishop_attacks(square, occupied) & empty
+	if piece_type == ROOK:
+		return rook_attacks(square, occupied) & empty
+	if piece_type == QUEEN:
+		return (rook_attacks(square, occupied) | bishop_attacks(square, occupied)) & empty
+
+	return KING_ATTACKS[square] & empty
+
+
+def _predecessors(table: TableIndex, squares: List[int], turn: int) -> Set[int]:
+	"""Get the indexes of the positions of the table that have a move to the given position."""
+	mover = turn ^ 1
+	occupied = 0
+	for square in squares:
+		occupied |= 1 << square
+
+	predecessors = set()
+	for slot, code in enumerate(table.codes):
+		if code // 6 != mover:
+			continue
+
+		square = squares[slot]
+		for origin in iter_bits(_origins(code, square, occupied)):
+			squares[slot] = origin
+			predecessors.add(table.encode(squares, mover))
+		squares[slot] = square
+
+	return predecessors
+
+
+def _en_passant_child(
+		position: Position, tablebase: Tablebase
+	) -> Union[Tuple[bool, Tuple[int, int]], None]:
+	"""
+	Check the position after a double push for en passant captures. Returns
+	None if there are none, else whether they are the only legal moves and
+	the (wdl, plies) of the best one for the side to move.
+	"""
+	ep_square = position.ep_square
+	pawn = position.turn*6 + PAWN
+	moves = list(position.generate_legal_moves())
+	ep_moves = [
+		move for move in moves
+		if (move >> 6) & 63 == ep_square and position.mailbox[move & 63] == pawn
+	]
+	if not ep_moves:
+		return None
+
+	best = tablebase._best_move(position, ep_moves)
+	if best is None:
+		raise ValueError(f'A table for the en passant captures of {position.fen()} is missing')
+
+	return len(ep_moves) == len(moves), best[1]
+
+
+def generate_table(signature: str, directory: Union[str, 'Path']) -> TableStats:
+	"""
+	Generate the table of a signature and write it to the directory. The
+	tables of its dependencies must already be there.
+	"""
+	start = perf_counter()
+	signature, _ = normalize_signature(signature)
+	table = TableIndex(signature)
+	tablebase = Tablebase(directory)
+	position = Position(_EMPTY_FEN)
+	codes = table.codes
+
+	results = bytearray(table.size)
+	remaining = bytearray(table.size)
+	out_losses: Dict[int, int] = {}
+	layers: List[List[Tuple[int, bool]]] = [[] for _ in range(_MAX_PLIES + 1)]
+
+	# Positions after a double push that allows en passant, scheduled as -1 - number.
+	# Every one has the index of its parent, the index of the table position with
+	# the same pieces (None if only en passant captures are legal) and the result
+	# of its best en passant capture.
+	ep_children: List[Tuple[int, Union[int, None], Tuple[int, int]]] = []
+	ep_resolved = bytearray()
+	ep_links: Dict[int, List[int]] = {}  # table index -> en passant children with its pieces
+	ep_parents: Dict[int, Set[int]] = {}  # table index -> parents that reach it by such a double push
+
+	def schedule(ply: int, index: int, win: bool) -> None:
+		if ply > _MAX_PLIES:
+			raise ValueError(f'{signature} has a mate longer than {MAX_MOVES} moves')
+		layers[ply].append((index, win))
+
+	# Set up every position and count its moves
+	for index in range(table.size):
+		decoded = table.decode(index)
+		if decoded is None:
+			results[index] = INVALID_ENTRY
+			continue
+
+		squares, turn = decoded
+		_setup(position, codes, squares, turn)
+		if position.king_in_check(turn ^ 1):
+			results[index] = INVALID_ENTRY
+			continue
+
+		moves = list(position.generate_legal_moves())
+		if not moves:
+			if position.is_check():
+				schedule(0, index, False)
+			continue
+
+		slots = {square: slot for slot, square in enumerate(squares)}
+		children = set()
+		best_win = worst_loss = 0
+		drawn = False
+
+		for move in moves:
+			from_square = move & 63
+			to_square = (move >> 6) & 63
+
+			if position.mailbox[to_square] is None and not move >> 12:
+				slot = slots[from_square]
+				squares[slot] = to_square
+				child = table.encode(squares, turn ^ 1)
+				squares[slot] = from_square
+
+				if codes[slot] % 6 == PAWN and abs(to_square - from_square) == 16:
+					position.push(move)
+					en_passant = _en_passant_child(position, tablebase)
+					position.pop()
+
+					if en_passant is not None:
+						only_en_passant, (wdl, plies) = en_passant
+						number = len(ep_children)
+						ep_children.append((index, None if only_en_passant else child, (wdl, plies)))
+						ep_resolved.append(0)
+						ep_parents.setdefault(child, set()).add(index)
+						children.add(-1 - number)
+
+						# The child is at least as good as its best en passant capture
+						if wdl == WIN or (only_en_passant and wdl == LOSS):
+							schedule(plies, -1 - number, wdl == WIN)
+						if not only_en_passant:
+							ep_links.setdefault(child, []).append(number)
+						continue
+
+				children.add(child)
+				continue
+
+			# Captures and promotions leave the table
+			position.push(move)
+			wdl, plies = tablebase.probe_plies(position)
+			position.pop()
+
+			if wdl == LOSS:
+				best_win = min(best_win, plies + 1) if best_win else plies + 1
+			elif wdl == DRAW:
+				drawn = True
+			else:
+				worst_loss = max(worst_loss, plies + 1)
+
+		if best_win:
+			schedule(best_win, index, True)
+
+		# A winning or drawing way out of the table means the position is never lost
+		count = len(children) + (best_win > 0 or drawn)
+		if count:
+			remaining[index] = count
+			if worst_loss:
+				out_losses[index] = worst_loss
+		else:
+			schedule(worst_loss, index, False)
+
+	# Resolve the positions ply by ply, going back with unmoves
+	for ply in range(_MAX_PLIES + 1):
+		# En passant children can be added to the layer while it is gone through
+		layer = layers[ply]
+		for index, win in layer:
+			if index < 0:
+				# An en passant child, only its parent depends on it
+				number = -1 - index
+				if ep_resolved[number]:
+					continue
+				ep_resolved[number] = 1
+				predecessors = (ep_children[number][0],)
+			else:
+				if results[index]:
+					continue
+
+				results[index] = (ply + 1) // 2 if win else LOSS_ENTRY + ply // 2
+				squares, turn = table.decode(index)
+
+				# The en passant children with these pieces are as good, unless a capture is better
+				for number in ep_links.get(index, ()):
+					if ep_resolved[number]:
+						continue
+					wdl, plies = ep_children[number][2]
+					if win:
+						schedule(ply, -1 - number, True)
+					elif wdl == LOSS:
+						schedule(max(ply, plies), -1 - number, False)
+
+				# Parents that reach these pieces by a double push reach the en passant child instead
+				ep_only = ep_parents.get(index, ())
+				predecessors = [
+					predecessor for predecessor in _predecessors(table, squares, turn)
+					if predecessor not in ep_only
+				]
+
+			for predecessor in predecessors:
+				if results[predecessor]:
+					continue
+
+				if win:
+					remaining[predecessor] -= 1
+					if not remaining[predecessor]:
+						schedule(max(ply + 1, out_losses.pop(predecessor, 0)), predecessor, False)
+				else:
+					schedule(ply + 1, predecessor, True)
+
+		layers[ply] = []
+
+	# Write to a temporary file first, so that a table file is always complete
+	path = table_path(directory, signature)
+	with open(path + '.tmp', 'wb') as f:
+		f.write(lzma.compress(bytes(results)))
+	os.replace(path + '.tmp', path)
+
+	counts = Counter(results)
+	wins = sum(count for entry, count in counts.items() if DRAW_ENTRY < entry < LOSS_ENTRY)
+	losses = sum(count for entry, count in counts.items() if LOSS_ENTRY <= entry < INVALID_ENTRY)
+	draws = counts[DRAW_ENTRY]
+	longest_mate = max((entry for entry in counts if DRAW_ENTRY < entry < LOSS_ENTRY), default=0)
+
+	return TableStats(
+		signature, wins + draws + losses, wins, draws, losses, longest_mate, perf_counter() - start
+	)
+
+
+def generate_tablebases(
+		signatures: List[str], directory: Union[str, 'Path'], workers: int = 1,
+		on_table: Union[Callable[[TableStats], None], None] = None
+	) -> List[TableStats]:
+	"""
+	Generate the tables of the signatures and of every smaller table they
+	need, skipping tables that are already in the directory. Tables whose
+	dependencies are done are generated together across worker processes.
+	on_table is called with the stats of every finished table.
+	"""
+	os.makedirs(directory, exist_ok=True)
+
+	# Find every table that is needed and not there yet
+	dependencies: Dict[str, List[str]] = {}
+	stack = []
+	for signature in signatures:
+		signature, _ = normalize_signature(signature)
+		pieces = len(signature) - 1
+		if not 3 <= pieces <= MAX_PIECES:
+			raise ValueError(f'Tables have 3 to {MAX_PIECES} pieces: {signature}')
+		stack.append(signature)
+
+	while stack:
+		signature = stack.pop()
+		if signature in dependencies or os.path.exists(table_path(directory, signature)):
+			continue
+
+		dependencies[signature] = table_dependencies(signature)
+		stack.extend(dependencies[signature])
+
+	stats = []
+	executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+	try:
+		while dependencies:
+			wave = sorted(
+				signature for signature, needed in dependencies.items()
+				if not any(dependency in dependencies for dependency in needed)
+			)
+			tasks = [(signature, directory) for signature in wave]
+
+			if executor is not None:
+				results = executor.map(generate_table, *zip(*tasks))
+			else:
+				results = (generate_table(*task) for task in tasks)
+
+			for table_stats in results:
+				stats.append(table_stats)
+				del dependencies[table_stats.signature]
+				if on_table is not None:
+					on_table(table_stats)
+	finally:
+		if executor is not None:
+			executor.shutdown()
+
+	return stats
+
+
+def main():
+	"""Generate tables from the command line."""
+	arg_parser = argparse.ArgumentParser(description='Generate endgame tablebases by retrograde analysis.')
+	arg_parser.add_argument('signatures', nargs='+', help='material signatures, e.g. KQvKR')
+	arg_parser.add_argument('--directory', default='tables', help='directory of the table files')
+	arg_parser.add_argument('--workers', type=int, default=1, help='number of worker processes')
+	args = arg_parser.parse_args()
+
+	def print_stats(stats: TableStats) -> None:
+		print(
+			f'{stats.signature}: {stats.positions} positions, {stats.wins} wins, '
+			f'{stats.draws} draws, {stats.losses} losses, longest mate {stats.longest_mate} moves '
+			f'({stats.seconds:.1f} s)'
+		)
+
+	generate_tablebases(args.signatures, args.directory, args.workers, print_stats)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,250 @@
+"""
+Material signatures and the indexing of tablebase positions.
+
+A material signature names the pieces of both sides, e.g. 'KQvKR'. Tables
+are only made for the signature with the stronger side as white, other
+positions are looked up with the colors swapped and the board flipped.
+
+A position of a signature is indexed by the side to move, the white king,
+the black king and the other pieces in signature order, each square a
+base 64 digit. The board is first turned so that the white king is on
+the a1-d1-d4 triangle (10 squares), or on files a-d when there are pawns,
+which can only be mirrored. Identical pieces are sorted by square, so
+every position has one index, and the indexes that don't stand for a
+canonical legal placement are marked invalid in the table.
+
+Every table entry is one byte: DRAW_ENTRY, a win in 1 to MAX_MOVES moves,
+a loss in 0 to MAX_MOVES moves (LOSS_ENTRY + moves) or INVALID_ENTRY.
+"""
+
+# Type annotations
+from typing import List, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from ..position import Position
+
+from ..chess_constants import WHITE, BLACK, PAWN, KING, PIECE_POINTS
+from ..bitboard import iter_bits
+
+
+# Define what can be imported from this module
+__all__ = [
+	'TableIndex', 'parse_signature', 'format_signature', 'normalize_signature', 'position_signature',
+	'DRAW_ENTRY', 'LOSS_ENTRY', 'INVALID_ENTRY', 'MAX_MOVES'
+]
+
+
+# Table entries
+DRAW_ENTRY = 0
+LOSS_ENTRY = 128
+INVALID_ENTRY = 255
+MAX_MOVES = 126
+
+# Piece letters indexed by piece type
+_LETTERS = 'PNBRQK'
+
+
+def _square_map(mirror_file: bool, mirror_rank: bool, transpose: bool) -> Tuple[int, ...]:
+	"""Get where every square goes under a symmetry of the board."""
+	squares = []
+	for square in range(64):
+		file, rank = square & 7, 7 - (square >> 3)
+		if mirror_file:
+			file = 7 - file
+		if mirror_rank:
+			rank = 7 - rank
+		if transpose:
+			file, rank = rank, file
+		squares.append((7 - rank)*8 + file)
+
+	return tuple(squares)
+
+
+# The 8 symmetries of the board, the identity first
+_TRANSFORMS = tuple(
+	_square_map(mirror_file, mirror_rank, transpose)
+	for transpose in (False, True) for mirror_rank in (False, True) for mirror_file in (False, True)
+)
+
+# The white king squares of pawnless tables (the a1-d1-d4 triangle) and of pawn tables (files a-d)
+_TRIANGLE = tuple(square for square in range(64) if (7 - (square >> 3)) <= (square & 7) <= 3)
+_HALF = tuple(square for square in range(64) if square & 7 <= 3)
+
+
+def _king_transforms(king_squares: Tuple[int, ...], transforms: Tuple[Tuple[int, ...], ...]) -> List[list]:
+	"""Get the symmetries that bring a white king on each square to one of the king squares."""
+	return [
+		[transform for transform in transforms if transform[square] in king_squares]
+		for square in range(64)
+	]
+
+
+_PAWNLESS_TRANSFORMS = _king_transforms(_TRIANGLE, _TRANSFORMS)
+_PAWN_TRANSFORMS = _king_transforms(_HALF, _TRANSFORMS[:2])
+
+
+def parse_signature(signature: str) -> Tuple[List[int], List[int]]:
+	"""Get the piece types of white and black in a signature like 'KQvKR', strongest first."""
+	sides = signature.upper().split('V')
+	if len(sides) != 2:
+		raise ValueError(f'Invalid material signature: {signature}')
+
+	types = []
+	for side in sides:
+		if side.count('K') != 1 or any(letter not in _LETTERS for letter in side):
+			raise ValueError(f'Invalid material signature: {signature}')
+		types.append(sorted((_LETTERS.index(letter) for letter in side), reverse=True))
+
+	return types[0], types[1]
+
+
+def format_signature(white: List[int], black: List[int]) -> str:
+	"""Write the piece types of both sides as a signature."""
+	def side(types: List[int]) -> str:
+		return ''.join(_LETTERS[piece_type] for piece_type in sorted(types, reverse=True))
+
+	return f'{side(white)}v{side(black)}'
+
+
+def _strength(types: List[int]) -> Tuple[int, List[int]]:
+	"""Order the sides of a signature, by material and then by their pieces."""
+	return sum(PIECE_POINTS[piece_type] for piece_type in types), sorted(types, reverse=True)
+
+
+def normalize_signature(signature: str) -> Tuple[str, bool]:
+	"""Get the signature a table is made for, and whether the colors had to be swapped."""
+	white, black = parse_signature(signature)
+	flipped = _strength(white) < _strength(black)
+	if flipped:
+		white, black = black, white
+
+	return format_signature(white, black), flipped
+
+
+def position_signature(position: 'Position') -> str:
+	"""Get the material signature of a position."""
+	sides = []
+	for color in (WHITE, BLACK):
+		types = []
+		for piece_type in range(6):
+			types += [piece_type]*bin(position.bitboards[color*6 + piece_type]).count('1')
+		sides.append(types)
+
+	return format_signature(*sides)
+
+
+class TableIndex:
+	"""The indexing of the positions of one material signature."""
+
+	def __init__(self, signature: str):
+		"""Set up the index for a normalized signature."""
+		white, black = parse_signature(signature)
+		self.signature = format_signature(white, black)
+
+		# The piece code of every slot, the kings first
+		self.codes = [WHITE*6 + KING, BLACK*6 + KING]
+		self.codes += [WHITE*6 + piece_type for piece_type in white if piece_type != KING]
+		self.codes += [BLACK*6 + piece_type for piece_type in black if piece_type != KING]
+		self.piece_count = len(self.codes)
+
+		# The (start, end) slots of runs of identical pieces
+		self.groups = []
+		start = 0
+		for slot in range(1, self.piece_count + 1):
+			if slot == self.piece_count or self.codes[slot] != self.codes[start]:
+				if slot - start > 1:
+					self.groups.append((start, slot))
+				start = slot
+
+		self.pawn_slots = [slot for slot, code in enumerate(self.codes) if code % 6 == PAWN]
+		if self.pawn_slots:
+			self.king_squares = _HALF
+			self._transforms = _PAWN_TRANSFORMS
+		else:
+			self.king_squares = _TRIANGLE
+			self._transforms = _PAWNLESS_TRANSFORMS
+		self._king_slots = {square: slot for slot, square in enumerate(self.king_squares)}
+
+		# The slot of a white king on each square, once the board is turned
+		self._king_indexes = [
+			self._king_slots[transforms[0][square]] for square, transforms in enumerate(self._transforms)
+		]
+
+		self.turn_size = len(self.king_squares) * 64**(self.piece_count - 1)
+		self.size = 2*self.turn_size
+
+	def encode(self, squares: List[int], turn: int) -> int:
+		"""Get the index of the position with the pieces of the slots on the given squares."""
+		transforms = self._transforms[squares[0]]
+		if not self.groups and len(transforms) == 1:
+			# Only one way to turn the board and nothing to sort
+			transform = transforms[0]
+			index = self._king_indexes[squares[0]]
+			for square in squares[1:]:
+				index = (index << 6) | transform[square]
+
+			return turn*self.turn_size + index
+
+		best = None
+		for transform in transforms:
+			mapped = [transform[square] for square in squares]
+			for start, end in self.groups:
+				mapped[start:end] = sorted(mapped[start:end])
+
+			if best is None or mapped < best:
+				best = mapped
+
+		index = self._king_slots[best[0]]
+		for square in best[1:]:
+			index = index*64 + square
+
+		return turn*self.turn_size + index
+
+	def decode(self, index: int) -> Union[Tuple[List[int], int], None]:
+		"""Get the squares of the slots and the side to move, None if the index is not canonical."""
+		turn, rest = divmod(index, self.turn_size)
+
+		squares = [0]*self.piece_count
+		for slot in range(self.piece_count - 1, 0, -1):
+			rest, squares[slot] = divmod(rest, 64)
+		squares[0] = self.king_squares[rest]
+
+		if len(set(squares)) != self.piece_count:
+			return None
+
+		for slot in self.pawn_slots:
+			if not 8 <= squares[slot] < 56:
+				return None
+
+		for start, end in self.groups:
+			if squares[start:end] != sorted(squares[start:end]):
+				return None
+
+		# A king on a symmetry axis leaves two ways to turn the board
+		if len(self._transforms[squares[0]]) > 1 and self.encode(squares, turn) != index:
+			return None
+
+		return squares, turn
+
+	def index_of(self, position: 'Position', flipped: bool = False) -> int:
+		"""Get the index of a position of the signature, with the colors swapped if flipped."""
+		squares = []
+		bitboards = position.bitboards
+		previous = None
+
+		for code in self.codes:
+			if code == previous:
+				continue
+			previous = code
+
+			if flipped:
+				squares.extend(square ^ 56 for square in iter_bits(bitboards[(code + 6) % 12]))
+			else:
+				squares.extend(iter_bits(bitboards[code]))
+
+		return self.encode(squares, position.turn ^ flipped)
+
+	def __str__(self):
+		return f'<TableIndex: {self.signature}, {self.size} positions>'
+
+	def __repr__(self):
+		return str(self)
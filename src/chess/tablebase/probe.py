@@ -0,0 +1,178 @@
+"""
+Probing generated tablebases.
+
+Tables are files named after their signature ('KQvKR.tb') that hold the
+lzma-compressed table entries. A table is decompressed into memory the
+first time a position of its signature is probed.
+"""
+
+# Type annotations
+from typing import Dict, Iterable, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+	from ..board import Board
+
+import lzma
+import os
+from collections import namedtuple
+
+from ..chess_constants import PAWN
+from ..position import Position
+from .indexing import (
+	TableIndex, normalize_signature, position_signature, DRAW_ENTRY, LOSS_ENTRY, INVALID_ENTRY
+)
+
+
+# Define what can be imported from this module
+__all__ = ['Tablebase', 'ProbeResult', 'WIN', 'DRAW', 'LOSS', 'table_path']
+
+
+# Results for the side to move
+WIN, DRAW, LOSS = 1, 0, -1
+
+# The result of a probe, dtm is the number of moves to mate (0 for draws)
+ProbeResult = namedtuple('ProbeResult', 'wdl, dtm')
+
+TABLE_SUFFIX = '.tb'
+
+# Two bare kings are drawn without a table
+_BARE_KINGS = 'KvK'
+
+
+def table_path(directory: Union[str, 'Path'], signature: str) -> str:
+	"""Get the path of the table file of a normalized signature."""
+	return os.path.join(directory, signature + TABLE_SUFFIX)
+
+
+def entry_to_plies(entry: int) -> Tuple[int, int]:
+	"""Turn a table entry into (wdl, plies to mate)."""
+	if entry == DRAW_ENTRY:
+		return DRAW, 0
+	if entry < LOSS_ENTRY:
+		return WIN, 2*entry - 1
+
+	return LOSS, 2*(entry - LOSS_ENTRY)
+
+
+def _move_order(wdl: int, plies: int) -> Tuple[int, int]:
+	"""Order the results of moves: quick wins, then draws, then slow losses."""
+	if wdl == WIN:
+		return wdl, -plies
+	if wdl == LOSS:
+		return wdl, plies
+
+	return wdl, 0
+
+
+class Tablebase:
+	"""The tables of a directory, probed by position."""
+
+	def __init__(self, directory: Union[str, 'Path']):
+		"""Use the tables in the given directory."""
+		self.directory = directory
+		self._tables: Dict[str, Union[Tuple[TableIndex, bytes], None]] = {}
+
+	def _table(self, signature: str) -> Union[Tuple[TableIndex, bytes], None]:
+		"""Get the index and entries of a normalized signature, None if there is no table."""
+		if signature not in self._tables:
+			path = table_path(self.directory, signature)
+			table = None
+
+			if os.path.exists(path):
+				index = TableIndex(signature)
+				with open(path, 'rb') as f:
+					entries = lzma.decompress(f.read())
+
+				if len(entries) != index.size:
+					raise ValueError(f'The table {path} has {len(entries)} entries instead of {index.size}')
+				table = (index, entries)
+
+			self._tables[signature] = table
+
+		return self._tables[signature]
+
+	def has_table(self, board: Union['Board', Position]) -> bool:
+		"""Check if there is a table for the material of the position."""
+		position = board if isinstance(board, Position) else board.position
+		signature, _ = normalize_signature(position_signature(position))
+
+		return signature == _BARE_KINGS or self._table(signature) is not None
+
+	def _best_move(self, position: Position, moves: Iterable[int]) -> Union[Tuple[int, Tuple[int, int]], None]:
+		"""Get the best of the moves and its (wdl, plies), None if there are no moves or a table is missing."""
+		best = None
+		best_order = None
+
+		for move in moves:
+			position.push(move)
+			child = self.probe_plies(position)
+			position.pop()
+
+			if child is None:
+				return None
+
+			result = (-child[0], child[1] + 1 if child[0] != DRAW else 0)
+			order = _move_order(*result)
+			if best_order is None or order > best_order:
+				best, best_order = (move, result), order
+
+		return best
+
+	def probe_plies(self, position: Position) -> Union[Tuple[int, int], None]:
+		"""
+		Get (wdl, plies to mate) for the side to move, None if the position
+		has no table or castling rights. En passant captures are searched
+		one ply deep, as the tables don't have them.
+		"""
+		if position.castling:
+			return None
+
+		ep_square = position.ep_square
+		if ep_square is not None:
+			pawn = position.turn*6 + PAWN
+			moves = list(position.generate_legal_moves())
+			if any((move >> 6) & 63 == ep_square and position.mailbox[move & 63] == pawn for move in moves):
+				best = self._best_move(position, moves)
+				return best[1] if best is not None else None
+
+		signature, flipped = normalize_signature(position_signature(position))
+		if signature == _BARE_KINGS:
+			return DRAW, 0
+
+		table = self._table(signature)
+		if table is None:
+			return None
+
+		index, entries = table
+		entry = entries[index.index_of(position, flipped)]
+		if entry == INVALID_ENTRY:
+			raise ValueError(f'The position is not legal: {position.fen()}')
+
+		return entry_to_plies(entry)
+
+	def probe(self, board: Union['Board', Position]) -> Union[ProbeResult, None]:
+		"""Get the result and the moves to mate for the side to move, None if there is no table."""
+		position = board if isinstance(board, Position) else board.position
+
+		result = self.probe_plies(position)
+		if result is None:
+			return None
+
+		wdl, plies = result
+		return ProbeResult(wdl, (plies + 1) // 2)
+
+	def best_move(self, board: Union['Board', Position]) -> Union[int, None]:
+		"""
+		Get the move that mates fastest, or draws, or loses slowest. None if
+		there are no legal moves or a table is missing.
+		"""
+		position = board if isinstance(board, Position) else board.position
+		best = self._best_move(position, list(position.generate_legal_moves()))
+
+		return best[0] if best is not None else None
+
+	def __str__(self):
+		return f'<Tablebase: {self.directory}, {len(self._tables)} tables loaded>'
+
+	def __repr__(self):
+		return str(self)
@@ -0,0 +1,177 @@
+"""
+A bounded transposition table.
+
+The table is one preallocated array of unsigned 64-bit integers, so its
+memory use never grows. It is split into buckets of two entries: the
+first entry keeps the deepest result (depth-preferred), the second one
+is always replaced. Every entry takes two words:
+
+	key ^ data, data
+
+where data packs the best move, score, depth, bound and search
+generation. Storing the key XORed with the data lets a probe detect
+entries that were torn by concurrent writers, so the same layout works
+on a buffer that is shared between processes.
+"""
+
+# Type annotations
+from typing import Tuple, Union
+
+from array import array
+
+
+# Define what can be imported from this module
+__all__ = ['TranspositionTable', 'BOUND_EXACT', 'BOUND_LOWER', 'BOUND_UPPER']
+
+
+# Bound types, 0 marks an empty entry
+BOUND_EXACT = 1
+BOUND_LOWER = 2  # the score is at least this much (fail high)
+BOUND_UPPER = 3  # the score is at most this much (fail low)
+
+# Data layout
+_MOVE_BITS = 0xFFFF
+_SCORE_SHIFT = 16
+_SCORE_OFFSET = 1 << 15
+_DEPTH_SHIFT = 32
+_BOUND_SHIFT = 40
+_GENERATION_SHIFT = 42
+
+_WORDS_PER_ENTRY = 2
+_WORDS_PER_BUCKET = 2*_WORDS_PER_ENTRY
+_BUCKET_BYTES = _WORDS_PER_BUCKET*8
+
+_KEY_MASK = (1 << 64) - 1
+
+
+def _pack(depth: int, bound: int, score: int, move: int, generation: int) -> int:
+	"""Pack an entry into a 64-bit integer."""
+	return (
+		move
+		| ((score + _SCORE_OFFSET) << _SCORE_SHIFT)
+		| (depth << _DEPTH_SHIFT)
+		| (bound << _BOUND_SHIFT)
+		| (generation << _GENERATION_SHIFT)
+	)
+
+
+class TranspositionTable:
+	"""A fixed-size hash table of search results keyed by Zobrist keys."""
+
+	def __init__(self, size_mb: float = 16, buffer=None):
+		"""
+		Allocate a table of the given size in megabytes. A buffer of
+		unsigned 64-bit integers (e.g. a shared memory view) can be
+		given to use instead of allocating a new array.
+		"""
+		if buffer is None:
+			buckets = self.bucket_count(size_mb)
+			buffer = array('Q', bytes(buckets*_BUCKET_BYTES))
+
+		self.table = buffer
+		self.mask = len(buffer) // _WORDS_PER_BUCKET - 1
+		self.generation = 0
+
+		# Statistics
+		self.hits = 0
+		self.misses = 0
+		self.collisions = 0
+
+	@staticmethod
+	def bucket_count(size_mb: float) -> int:
+		"""Get the number of buckets that fit in the given size, a power of two."""
+		buckets = max(int(size_mb*1024*1024) // _BUCKET_BYTES, 1)
+
+		return 1 << (buckets.bit_length() - 1)
+
+	def probe(self, key: int) -> Union[Tuple[int, int, int, int], None]:
+		"""Look a position up, returns (depth, bound, score, move) or None."""
+		table = self.table
+		index = (key & self.mask)*_WORDS_PER_BUCKET
+		found_entry = False
+
+		for slot in (index, index + _WORDS_PER_ENTRY):
+			data = table[slot + 1]
+			if not data:
+				continue
+
+			if table[slot] ^ data == key:
+				self.hits += 1
+				return (
+					(data >> _DEPTH_SHIFT) & 0xFF,
+					(data >> _BOUND_SHIFT) & 3,
+					((data >> _SCORE_SHIFT) & 0xFFFF) - _SCORE_OFFSET,
+					data & _MOVE_BITS
+				)
+			found_entry = True
+
+		if found_entry:
+			# The bucket holds other positions
+			self.collisions += 1
+		else:
+			self.misses += 1
+
+		return None
+
+	def store(self, key: int, depth: int, bound: int, score: int, move: int = 0) -> None:
+		"""Store a search result, replacing older or shallower results."""
+		table = self.table
+		index = (key & self.mask)*_WORDS_PER_BUCKET
+
+		depth = min(max(depth, 0), 0xFF)
+		score = min(max(score, -_SCORE_OFFSET), _SCORE_OFFSET - 1)
+		data = _pack(depth, bound, score, move & _MOVE_BITS, self.generation)
+
+		old_data = table[index + 1]
+		if (
+			not old_data
+			or table[index] ^ old_data == key
+			or (old_data >> _DEPTH_SHIFT) & 0xFF <= depth
+			or (old_data >> _GENERATION_SHIFT) & 0xFF != self.generation
+		):
+			# Replace the depth-preferred entry
+			slot = index
+		else:
+			slot = index + _WORDS_PER_ENTRY
+			old_data = table[slot + 1]
+
+		if not move and old_data and table[slot] ^ old_data == key:
+			# Keep the best move of the same position if there is no new one
+			data |= old_data & _MOVE_BITS
+
+		table[slot] = (key ^ data) & _KEY_MASK
+		table[slot + 1] = data
+
+	def new_search(self) -> None:
+		"""Start a new search, so that results of older searches are replaced first."""
+		self.generation = (self.generation + 1) & 0xFF
+
+	def clear(self) -> None:
+		"""Remove every entry and reset the statistics."""
+		self.table[:] = array('Q', bytes(len(self.table)*8))
+
+		self.generation = 0
+		self.hits = self.misses = self.collisions = 0
+
+	def hashfull(self) -> int:
+		"""Get how full the table is in permille, estimated from the first buckets."""
+		sample = min(self.mask + 1, 1000)
+		used = 0
+		for i in range(sample*_WORDS_PER_BUCKET // _WORDS_PER_ENTRY):
+			if self.table[i*_WORDS_PER_ENTRY + 1]:
+				used += 1
+
+		return used*1000 // (sample*2)
+
+	def __len__(self):
+		"""The number of entries the table can hold."""
+		return (self.mask + 1)*2
+
+	def __str__(self):
+		return (
+			f'<TranspositionTable: {len(self)} entries, {self.hits} hits, '
+			f'{self.misses} misses, {self.collisions} collisions>'
+		)
+
+	def __repr__(self):
+		return str(self)
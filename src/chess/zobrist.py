@@ -0,0 +1,68 @@
+"""
+Zobrist hashing of positions.
+
+Every piece on every square, the side to move, every combination of
+castling rights and every en passant file gets a random 64-bit key. The
+key of a position is the XOR of the keys of its features, so a move only
+has to XOR in and out the features it changes. The keys come from a
+fixed seed, so they are the same in every process and every run.
+"""
+
+# Type annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+	from .position import Position
+
+from random import Random
+
+from .chess_constants import BLACK, PAWN
+from .bitboard import PAWN_ATTACKS, iter_bits
+
+
+# Define what can be imported from this module
+__all__ = ['PIECE_KEYS', 'TURN_KEY', 'CASTLING_KEYS', 'EP_KEYS', 'compute_key', 'ep_key']
+
+
+_random = Random(0x5EED)
+
+# Indexed by piece code*64 + square
+PIECE_KEYS = tuple(_random.getrandbits(64) for _ in range(12*64))
+
+# XORed in when black is to move
+TURN_KEY = _random.getrandbits(64)
+
+# Indexed by the castling rights bit flags
+CASTLING_KEYS = tuple(_random.getrandbits(64) for _ in range(16))
+
+# Indexed by the file of the en passant square
+EP_KEYS = tuple(_random.getrandbits(64) for _ in range(8))
+
+
+def ep_key(position: 'Position') -> int:
+	"""
+	Get the key of the en passant square. It only counts if a pawn
+	can capture there, so that identical positions get identical keys.
+	"""
+	ep_square = position.ep_square
+	if ep_square is None:
+		return 0
+
+	color = position.turn
+	if PAWN_ATTACKS[color ^ 1][ep_square] & position.bitboards[color*6 + PAWN]:
+		return EP_KEYS[ep_square % 8]
+
+	return 0
+
+
+def compute_key(position: 'Position') -> int:
+	"""Compute the key of a position from scratch."""
+	key = 0
+
+	for code, bitboard in enumerate(position.bitboards):
+		for square in iter_bits(bitboard):
+			key ^= PIECE_KEYS[code*64 + square]
+
+	if position.turn == BLACK:
+		key ^= TURN_KEY
+
+	return key ^ CASTLING_KEYS[position.castling] ^ ep_key(position)
@@ -1 +1,22 @@
-from .fen_validator import validate_fen
+import importlib
+
+from .fen_loader import load_positions, parse_epd, LoadedPosition, FENLoadError
+from .fen_writer import write_fens
+
+
+# Modules that can be run with python -m, importing them here would make runpy warn
+_CLI_MODULES = {
+	'validate_fen': '.fen_validator',
+	'check_fen': '.fen_validator',
+	'validate_file': '.fen_validator',
+	'FENError': '.fen_validator',
+}
+
+
+def __getattr__(name: str):
+	"""Import the command line modules only when they are used."""
+	if name in _CLI_MODULES:
+		module = importlib.import_module(_CLI_MODULES[name], __name__)
+		return getattr(module, name)
+
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -14,7 +14,3 @@ class BaseParser(ABC):
 	@abstractmethod
 	def parse(self, *args, **kwargs):
 		raise NotImplemented
-
-	@abstractmethod
-	def _parse_rank(self, rank, *args, **kwargs):
-		raise NotImplemented
@@ -0,0 +1,124 @@
+"""
+Streams positions from FEN/EPD files.
+
+The positions are plain bitboard positions, no pieces or sprites are
+created, so this can be used without a display. Lines are read one at a
+time, so files of any size are loaded with constant memory.
+"""
+
+# Type annotations
+from typing import Callable, Dict, Iterable, Iterator, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+
+from collections import namedtuple
+
+from chess.position import Position
+
+
+# Define what can be imported from this module
+__all__ = ['load_positions', 'parse_epd', 'LoadedPosition', 'FENLoadError']
+
+
+# A position read from a file, operations are the EPD opcodes mapped to their operands
+LoadedPosition = namedtuple('LoadedPosition', 'line_number, position, operations')
+
+
+class FENLoadError(ValueError):
+	"""An exception that is raised when a line of a FEN/EPD file can't be parsed."""
+
+	def __init__(self, line_number: int, line: str, reason: str):
+		super().__init__(f'Line {line_number}: {reason}: {line!r}')
+		self.line_number = line_number
+		self.line = line
+		self.reason = reason
+
+
+def _parse_operations(text: str) -> Dict[str, str]:
+	"""Parse the EPD operations, e.g. 'bm e4; id "start";'."""
+	operations = {}
+
+	for operation in text.split(';'):
+		operation = operation.strip()
+		if not operation:
+			continue
+
+		opcode, _, operand = operation.partition(' ')
+		operations[opcode] = operand.strip().strip('"')
+
+	return operations
+
+
+def parse_epd(line: str) -> Tuple[Position, Dict[str, str]]:
+	"""
+	Parse a FEN or EPD line into a position and its EPD operations. The
+	clocks are taken from the FEN fields or from the hmvc/fmvn operations.
+	A line that breaks a rule of the FEN validator raises a ValueError, so
+	that only legal positions are loaded.
+	"""
+	# fen_validator can be run with python -m, importing it at the top would make runpy warn
+	from .fen_validator import check_fen
+
+	fields = line.split(None, 4)
+	if len(fields) < 4:
+		raise ValueError('expected at least 4 fields')
+
+	rest = fields[4] if len(fields) > 4 else ''
+	clocks = rest.split(None, 2)
+
+	if len(clocks) >= 2 and clocks[0].isdigit() and clocks[1].isdigit():
+		# A FEN line, anything after the clocks is treated as operations
+		halfmove_clock, fullmove_number = clocks[0], clocks[1]
+		operations = _parse_operations(clocks[2] if len(clocks) > 2 else '')
+	else:
+		operations = _parse_operations(rest)
+		halfmove_clock = operations.get('hmvc', '0')
+		fullmove_number = operations.get('fmvn', '1')
+
+	fen = ' '.join((*fields[:4], halfmove_clock, fullmove_number))
+	errors = check_fen(fen)
+	if errors:
+		raise ValueError(', '.join(error.value for error in errors))
+
+	position = Position(fen)
+
+	return position, operations
+
+
+def _read_lines(source: Union[str, 'Path', Iterable[str]]) -> Iterator[str]:
+	"""Yield the lines of a file name or of an iterable of lines."""
+	if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+		with open(source, 'r', encoding='utf-8', errors='replace') as f:
+			yield from f
+	else:
+		yield from source
+
+
+def load_positions(
+		source: Union[str, 'Path', Iterable[str]], skip_errors: bool = False,
+		on_error: Union[Callable[[FENLoadError], None], None] = None
+	) -> Iterator[LoadedPosition]:
+	"""
+	Stream the positions of a FEN/EPD file, given by its name or as an
+	iterable of lines (e.g. an open file). Empty lines and lines starting
+	with '#' are ignored. A bad line raises a FENLoadError, unless
+	skip_errors is set, in which case the error is passed to on_error
+	and the line is skipped.
+	"""
+	for line_number, line in enumerate(_read_lines(source), 1):
+		line = line.strip()
+		if not line or line.startswith('#'):
+			continue
+
+		try:
+			position, operations = parse_epd(line)
+		except ValueError as e:
+			error = FENLoadError(line_number, line, str(e))
+			if not skip_errors:
+				raise error from e
+
+			if on_error is not None:
+				on_error(error)
+			continue
+
+		yield LoadedPosition(line_number, position, operations)
@@ -1,17 +1,324 @@
+"""
+Validation of FEN strings.
+
+check_fen goes over a FEN string once and returns every rule it breaks as
+a FENError code: the syntax of the fields, the length of the ranks, the
+number of kings and pawns, pawns on the back ranks, castling rights that
+don't match the kings and rooks, impossible en passant squares, the
+clocks, and the side that is not to move being in check.
+
+Files of FENs are validated in chunks across worker processes:
+	python -m fen_parser.fen_validator positions.fen --workers 8
+"""
+
+# Type annotations
+from typing import Callable, Iterable, Iterator, List, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+
+import argparse
 import re
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from itertools import islice
+from time import perf_counter
+
+from chess.chess_constants import PIECE_SYMBOLS, SQUARE_NAMES, WHITE, BLACK, PAWN, ROOK, KING
+from chess.position import Position
+
+
+# Define what can be imported from this module
+__all__ = ['validate_fen', 'check_fen', 'validate_lines', 'validate_file', 'FENError', 'BatchReport']
+
+
+class FENError(Enum):
+	"""The rules a FEN string can break, the values describe them."""
+	FIELD_COUNT = 'the FEN does not have 6 fields'
+	RANK_COUNT = 'the placement does not have 8 ranks'
+	INVALID_PIECE = 'unknown piece symbol'
+	RANK_LENGTH = 'a rank does not have 8 squares'
+	KING_COUNT = 'a side does not have exactly one king'
+	PIECE_COUNT = 'a side has more pawns and promoted pieces than 8 pawns allow'
+	PAWN_ON_BACK_RANK = 'a pawn is on the first or last rank'
+	TURN = 'the move turn is not w or b'
+	CASTLING_FORMAT = 'the castling field is not a subset of KQkq'
+	CASTLING_RIGHTS = 'a castling right does not match the king and rook squares'
+	EN_PASSANT_FORMAT = 'the en passant field is not a square on rank 3 or 6'
+	EN_PASSANT_SQUARE = 'the en passant square does not follow a double pawn push'
+	HALFMOVE_CLOCK = 'the halfmove clock is not a non-negative number'
+	FULLMOVE_NUMBER = 'the fullmove number is not a positive number'
+	OPPONENT_IN_CHECK = 'the side that is not to move is in check'
+	UNPARSABLE = 'the FEN could not be parsed'
 
 
-VALIDATOR_REGEX = re.compile(
-	r'\s*([rnbqkpRNBQKP1-8]+\/){7}([rnbqkpRNBQKP1-8]+)' +
-	r'\s[bw-]\s(([a-hkqA-HKQ]{1,4})|(-))\s(([a-h][36])|(-))\s\d+\s\d+\s*'
+# The result of a batch validation
+BatchReport = namedtuple('BatchReport', 'lines, invalid, seconds, lines_per_second')
+
+# (symbol, king square, rook square, king code, rook code)
+_CASTLING_RULES = (
+	('K', 60, 63, WHITE*6 + KING, WHITE*6 + ROOK),
+	('Q', 60, 56, WHITE*6 + KING, WHITE*6 + ROOK),
+	('k', 4, 7, BLACK*6 + KING, BLACK*6 + ROOK),
+	('q', 4, 0, BLACK*6 + KING, BLACK*6 + ROOK),
 )
 
+# The number of lines sent to a worker process at a time
+CHUNK_SIZE = 10000
+
+# Clocks are ASCII digits only, str.isdigit() also accepts digits like '²' that int() rejects
+_NUMBER = re.compile(r'[0-9]+')
+
+
+#############################
+######## SINGLE FENS ########
+#############################
+
+
+def _check_placement(placement: str, board: List[Union[int, None]], errors: List[FENError]) -> None:
+	"""Check the placement field and fill the board with piece codes."""
+	ranks = placement.split('/')
+	if len(ranks) != 8:
+		errors.append(FENError.RANK_COUNT)
+		return
+
+	counts = [0]*12
+	for row, rank in enumerate(ranks):
+		index = row*8
+		end = index + 8
+
+		for ch in rank:
+			if ch in '12345678':
+				index += int(ch)
+				continue
+
+			code = PIECE_SYMBOLS.find(ch)
+			if code < 0:
+				if FENError.INVALID_PIECE not in errors:
+					errors.append(FENError.INVALID_PIECE)
+				index += 1
+				continue
+
+			if index < end:
+				board[index] = code
+			counts[code] += 1
+			index += 1
+
+			if code % 6 == PAWN and (row == 0 or row == 7):
+				if FENError.PAWN_ON_BACK_RANK not in errors:
+					errors.append(FENError.PAWN_ON_BACK_RANK)
+
+		if index != end and FENError.RANK_LENGTH not in errors:
+			errors.append(FENError.RANK_LENGTH)
+
+	if counts[WHITE*6 + KING] != 1 or counts[BLACK*6 + KING] != 1:
+		errors.append(FENError.KING_COUNT)
+
+	for color in (WHITE, BLACK):
+		pawns, knights, bishops, rooks, queens, _ = counts[color*6: color*6 + 6]
+
+		# Pieces beyond the starting ones must have been pawns
+		promoted = max(knights - 2, 0) + max(bishops - 2, 0) + max(rooks - 2, 0) + max(queens - 1, 0)
+		if pawns + promoted > 8:
+			errors.append(FENError.PIECE_COUNT)
+			break
+
+
+def _check_castling(castling: str, board: List[Union[int, None]], errors: List[FENError]) -> None:
+	"""Check that the castling field is well formed and that the kings and rooks are home."""
+	if castling == '-':
+		return
+
+	if not castling or any(ch not in 'KQkq' for ch in castling) or len(set(castling)) != len(castling):
+		errors.append(FENError.CASTLING_FORMAT)
+		return
+
+	for symbol, king_square, rook_square, king_code, rook_code in _CASTLING_RULES:
+		if symbol in castling and (board[king_square] != king_code or board[rook_square] != rook_code):
+			errors.append(FENError.CASTLING_RIGHTS)
+			return
+
+
+def _check_en_passant(
+		ep_field: str, turn: str, board: List[Union[int, None]], errors: List[FENError]
+	) -> None:
+	"""Check that the en passant square could have been passed by a double pawn push."""
+	if ep_field == '-':
+		return
+
+	expected_rank = '6' if turn == 'w' else '3'
+	if ep_field not in SQUARE_NAMES or ep_field[1] != expected_rank:
+		errors.append(FENError.EN_PASSANT_FORMAT)
+		return
+
+	# The pawn that moved is in front of the square, and it came from behind it
+	ep_square = SQUARE_NAMES.index(ep_field)
+	direction = 8 if turn == 'w' else -8
+	moved_pawn = (BLACK if turn == 'w' else WHITE)*6 + PAWN
+
+	if (
+		board[ep_square] is not None
+		or board[ep_square - direction] is not None
+		or board[ep_square + direction] != moved_pawn
+	):
+		errors.append(FENError.EN_PASSANT_SQUARE)
+
+
+def check_fen(fen: str) -> List[FENError]:
+	"""Get every rule the FEN string breaks, an empty list if it is valid."""
+	fields = fen.split()
+	if len(fields) != 6:
+		return [FENError.FIELD_COUNT]
+
+	placement, turn, castling, ep_field, halfmove_clock, fullmove_number = fields
+	errors = []
+	board = [None]*64
+
+	_check_placement(placement, board, errors)
+
+	if turn not in ('w', 'b'):
+		errors.append(FENError.TURN)
+
+	_check_castling(castling, board, errors)
+	_check_en_passant(ep_field, turn, board, errors)
+
+	if not _NUMBER.fullmatch(halfmove_clock):
+		errors.append(FENError.HALFMOVE_CLOCK)
+	if not _NUMBER.fullmatch(fullmove_number) or int(fullmove_number) < 1:
+		errors.append(FENError.FULLMOVE_NUMBER)
+
+	if not errors:
+		# The position is well formed, the side that just moved may not be in check
+		position = Position(fen)
+		if position.king_in_check(position.turn ^ 1):
+			errors.append(FENError.OPPONENT_IN_CHECK)
+
+	return errors
+
 
 def validate_fen(fen: str) -> bool:
 	"""Check the validity of a given FEN string."""
-	match_obj = re.match(VALIDATOR_REGEX, fen)
+	return not check_fen(fen)
+
+
+#############################
+########## BATCHES ##########
+#############################
+
+
+def _check_chunk(chunk: List[Tuple[int, str]]) -> List[Tuple[int, List[FENError]]]:
+	"""Validate numbered lines, returns the line numbers and errors of the invalid ones."""
+	invalid = []
+
+	for line_number, line in chunk:
+		try:
+			errors = check_fen(line)
+		except Exception:
+			# A line must never stop the batch
+			errors = [FENError.UNPARSABLE]
+
+		if errors:
+			invalid.append((line_number, errors))
+
+	return invalid
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+	"""Split lines into chunks of (line number, line), leaving out empty lines."""
+	numbered = enumerate(lines, 1)
+
+	while True:
+		chunk = [(line_number, line.strip()) for line_number, line in islice(numbered, chunk_size)]
+		if not chunk:
+			return
+
+		yield [(line_number, line) for line_number, line in chunk if line]
+
+
+def validate_lines(
+		lines: Iterable[str], workers: int = 1, chunk_size: int = CHUNK_SIZE
+	) -> Iterator[Tuple[int, List[FENError]]]:
+	"""
+	Validate FEN lines and yield (line number, errors) for every invalid one,
+	in line order. Chunks of lines are checked across worker processes, with
+	a bounded number of chunks in flight so that memory stays constant.
+	"""
+	chunks = _chunks(lines, chunk_size)
+
+	if workers <= 1:
+		for chunk in chunks:
+			yield from _check_chunk(chunk)
+		return
+
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		pending = deque()
+		for chunk in chunks:
+			pending.append(executor.submit(_check_chunk, chunk))
+
+			if len(pending) >= 2*workers:
+				yield from pending.popleft().result()
+
+		while pending:
+			yield from pending.popleft().result()
+
+
+def validate_file(
+		source: Union[str, 'Path', Iterable[str]], workers: int = 1, chunk_size: int = CHUNK_SIZE,
+		on_invalid: Union[Callable[[int, List[FENError]], None], None] = None
+	) -> BatchReport:
+	"""
+	Validate a file of FENs, one per line, given by its name or as an
+	iterable of lines. on_invalid is called with the line number and the
+	errors of every invalid line.
+	"""
+	start = perf_counter()
+	line_count = 0
+	invalid_count = 0
+
+	def count_lines(lines: Iterable[str]) -> Iterator[str]:
+		nonlocal line_count
+		for line in lines:
+			line_count += 1
+			yield line
+
+	def run(lines: Iterable[str]) -> None:
+		nonlocal invalid_count
+		for line_number, errors in validate_lines(count_lines(lines), workers, chunk_size):
+			invalid_count += 1
+			if on_invalid is not None:
+				on_invalid(line_number, errors)
+
+	if isinstance(source, str) or hasattr(source, '__fspath__'):
+		with open(source, 'r', encoding='utf-8', errors='replace') as f:
+			run(f)
+	else:
+		run(source)
+
+	seconds = perf_counter() - start
+	lines_per_second = int(line_count / seconds) if seconds > 0 else 0
+
+	return BatchReport(line_count, invalid_count, seconds, lines_per_second)
+
+
+def main():
+	"""Validate a file of FENs from the command line."""
+	arg_parser = argparse.ArgumentParser(description='Validate a file of FEN strings, one per line.')
+	arg_parser.add_argument('file', help='file of FEN strings')
+	arg_parser.add_argument('--workers', type=int, default=1, help='number of worker processes')
+	arg_parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='lines per worker task')
+	arg_parser.add_argument('--quiet', action='store_true', help='only print the summary')
+	args = arg_parser.parse_args()
+
+	def print_invalid(line_number: int, errors: List[FENError]) -> None:
+		print(f"Line {line_number}: {', '.join(error.name for error in errors)}")
+
+	report = validate_file(
+		args.file, args.workers, args.chunk_size, None if args.quiet else print_invalid
+	)
+
+	print(f'Lines: {report.lines}, invalid: {report.invalid}')
+	print(f'Time: {report.seconds:.3f} s ({report.lines_per_second} lines/s)')
 
-	if match_obj is None:
-		return False
 
-	return True
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,53 @@
+"""
+Writes positions to FEN files.
+
+The positions are serialized in chunks and every chunk is written with a
+single call, so that writing many positions doesn't cost a write per line.
+"""
+
+# Type annotations
+from typing import IO, Iterable, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+	from chess.position import Position
+
+
+# Define what can be imported from this module
+__all__ = ['write_fens']
+
+
+# The number of FEN lines joined before they are written
+CHUNK_SIZE = 4096
+
+
+def _write_chunks(positions: Iterable['Position'], f: IO[str]) -> int:
+	"""Write the FEN of every position to an open file, returns the number of lines."""
+	chunk = []
+	count = 0
+
+	for position in positions:
+		# The FEN is taken right away, so the same position can be yielded after every move
+		chunk.append(position.fen())
+
+		if len(chunk) == CHUNK_SIZE:
+			f.write('\n'.join(chunk) + '\n')
+			count += len(chunk)
+			chunk.clear()
+
+	if chunk:
+		f.write('\n'.join(chunk) + '\n')
+		count += len(chunk)
+
+	return count
+
+
+def write_fens(positions: Iterable['Position'], target: Union[str, 'Path', IO[str]]) -> int:
+	"""
+	Write the FEN of every position, one per line, to a file name or to an
+	open file. Returns the number of positions written.
+	"""
+	if isinstance(target, str) or hasattr(target, '__fspath__'):
+		with open(target, 'w', encoding='utf-8') as f:
+			return _write_chunks(positions, f)
+
+	return _write_chunks(positions, target)
@@ -68,10 +68,18 @@ class ChessGame(Display):
 
 	# Define abstract methods from Display below
 	def poll_events(self):
-		for event in pg.event.get():
+		for event in self.get_events():
 			if event.type == pg.QUIT:
 				# Exit the application.
 				sysexit(1)
+			elif event.type in (pg.VIDEORESIZE, pg.VIDEOEXPOSE):
+				# The window contents are lost, draw everything again.
+				self.request_full_redraw()
+			elif event.type == pg.KEYDOWN:
+				if event.key == pg.K_BACKSPACE and self.dragged_piece is None:
+					# Take back the last move.
+					if self.board.position.move_stack:
+						self.board.pop()
 			elif event.type == pg.MOUSEBUTTONDOWN:
 				mouse_x, mouse_y = pg.mouse.get_pos()
 				if point_in_rect(mouse_x, mouse_y, self.board.border_rect):  # Chessboard
@@ -81,8 +89,10 @@ class ChessGame(Display):
 						# Highlight the dragged piece's current square.
 						self.dragged_piece.square.highlight(Square.CURRENT_SQUARE_HIGHLIGHT)
 
-						# Get possible squares the piece can move to.
+						# Get the legal squares the piece can move to and highlight them.
 						self.possible_squares = self.dragged_piece.get_possible_moves(self.board)
+						for square in self.possible_squares:
+							square.highlight(Square.POSSIBLE_SQUARE_HIGHLIGHT)
 				else:  # Chess menu
 					# Highlight and handle pressed widget if a widget was clicked on.
 					self.pressed_widget = self.chess_menu.get_pressed_widget(mouse_x, mouse_y)
@@ -105,11 +115,32 @@ class ChessGame(Display):
 					# Reset pressed widget reference
 					self.pressed_widget = None
 
+	def is_animating(self):
+		# The dragged piece follows the mouse
+		return self.dragged_piece is not None
+
 	def render(self):
 		super().render()
 		self.board.render(self.dragged_piece)
 		self.chess_menu.render(self.screen)
 
+		# Everything was drawn, so nothing is left to update
+		self.board.get_dirty_rects()
+		self.chess_menu.get_dirty_rects()
+
+	def render_dirty(self):
+		dirty_rects = self.board.get_dirty_rects() + self.chess_menu.get_dirty_rects()
+
+		for rect in dirty_rects:
+			# Draw everything that overlaps the rect, clipped to it
+			self.screen.set_clip(rect)
+			self.screen.fill(self.BACKGROUND_COLOR)
+			self.board.render(self.dragged_piece, rect)
+			self.chess_menu.render(self.screen, rect)
+		self.screen.set_clip(None)
+
+		return dirty_rects
+
 	def update(self):
 		if self.dragged_piece is not None:
 			x, y = pg.mouse.get_pos()
@@ -11,7 +11,7 @@ from .fen_gui import FENFrame
 
 # Imports for starting position FEN
 from chess import Board
-from fen_parser import validate_fen
+from fen_parser import check_fen
 
 from sys import exit as sysexit
 
@@ -70,7 +70,9 @@ class LauncherWindow(tk.Tk, WidgetMixin):
 	def cmd_start_app(self):
 		user_fen = self.fen_frame.get_fen()
 
-		if validate_fen(user_fen):
+		errors = check_fen(user_fen)
+
+		if not errors:
 			# Valid FEN, the game can start.
 			self.launcher_dict[LAUNCHER_FEN_KEY] = user_fen
 			self.destroy()
@@ -78,7 +80,8 @@ class LauncherWindow(tk.Tk, WidgetMixin):
 			# Invalid FEN, show an error to the user.
 			messagebox.showerror(
 					'Invalid FEN', 
-					'You have entered an invalid FEN. Please enter a valid FEN and try again.'
+					f'You have entered an invalid FEN ({errors[0].value}). '
+					'Please enter a valid FEN and try again.'
 				)
 
 
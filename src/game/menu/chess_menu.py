@@ -1,5 +1,5 @@
 # Typing
-from typing import List, Union, TYPE_CHECKING
+from typing import Dict, List, Tuple, Union, TYPE_CHECKING
 if TYPE_CHECKING:
 	from chess import Board
 
@@ -17,7 +17,8 @@ import tkinter as tk
 
 class ChessMenu(Renderable):
 	"""The menu that is visible when along with the chessboard."""
-	
+	GRID_CELL_SIZE = 64  # size of the cells of the grid that widgets are looked up in
+
 	def __init__(self):
 		"""Initialize the widgets on the menu."""
 		self.board_fen_widget = MenuWidget(
@@ -26,10 +27,15 @@ class ChessMenu(Renderable):
 			)
 
 		self.widgets = self._init_widget_list()
+		self._widget_grid = self._init_widget_grid()
+
+		# The background color of every widget in the last frame
+		self._rendered_colors = {}
 
 	def get_pressed_widget(self, mouse_x: int, mouse_y: int) -> Union[MenuWidget, None]:
-		"""Return the pressed widget on the chess menu."""
-		for widget in self.widgets:
+		"""Return the pressed widget on the chess menu, only checking the widgets in the grid cell of the mouse."""
+		cell = (mouse_x // ChessMenu.GRID_CELL_SIZE, mouse_y // ChessMenu.GRID_CELL_SIZE)
+		for widget in self._widget_grid.get(cell, ()):
 			if point_in_rect(mouse_x, mouse_y, widget.rect):
 				return widget
 
@@ -45,9 +51,32 @@ class ChessMenu(Renderable):
 
 		return widgets
 
-	def render(self, surface):
+	def _init_widget_grid(self) -> Dict[Tuple[int, int], List[MenuWidget]]:
+		"""Initialize the grid cells that every widget covers, edges included."""
+		grid = {}
+		cell_size = ChessMenu.GRID_CELL_SIZE
+		for widget in self.widgets:
+			rect = widget.rect
+			for cell_x in range(rect.left // cell_size, rect.right // cell_size + 1):
+				for cell_y in range(rect.top // cell_size, rect.bottom // cell_size + 1):
+					grid.setdefault((cell_x, cell_y), []).append(widget)
+
+		return grid
+
+	def get_dirty_rects(self) -> List[pg.Rect]:
+		"""Get the rects of the widgets that were highlighted or unhighlighted since the last call."""
+		dirty_rects = []
+		for widget in self.widgets:
+			if self._rendered_colors.get(widget) != widget.bg_color:
+				self._rendered_colors[widget] = widget.bg_color
+				dirty_rects.append(widget.border_rect)
+
+		return dirty_rects
+
+	def render(self, surface, area: Union[pg.Rect, None] = None):
 		for widget in self.widgets:
-			widget.render(surface)
+			if area is None or area.colliderect(widget.border_rect):
+				widget.render(surface)
 
 
 class ChessMenuHandler:
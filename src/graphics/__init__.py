@@ -1,7 +1,9 @@
 from .renderable import Renderable
-from .display import Display
-from .spritesheet import Spritesheet 
+from .display import Display, WAKE_EVENT
+from .spritesheet import Spritesheet
+from .sprite_atlas import SpriteAtlas
 from .graphics_constants import (
 	SCREEN_PROPERTIES, WINDOW_TITLE, BACKGROUND_COLOR,
+	FPS_CAP, FPS_REPORT_INTERVAL,
 	PIECE_SIZE_X, PIECE_SIZE_Y
 )
@@ -1,13 +1,17 @@
 # Type annotations
-from typing import Tuple
+from typing import List, Tuple
 
 from abc import ABC, abstractmethod
 
 import pygame as pg
 import ctypes  # for dpi awareness
 
-import time
 from utils import time_ms
+from .graphics_constants import FPS_CAP, FPS_REPORT_INTERVAL
+
+
+# Posted by wake() to end an idle wait for events
+WAKE_EVENT = pg.USEREVENT
 
 
 class Display(ABC):
@@ -15,7 +19,7 @@ class Display(ABC):
 
 	def __init__(
 			self, screen_properties: Tuple, title: str,
-			background_color: Tuple[int, int, int]
+			background_color: Tuple[int, int, int], fps_cap: int = FPS_CAP
 	):
 		"""Initialize pygame and the display settings."""
 		# Improve resolution
@@ -32,8 +36,61 @@ class Display(ABC):
 		self.WINDOW_TITLE = title
 		self.BACKGROUND_COLOR = background_color
 
+		# The whole screen is drawn on the first frame
+		self._full_redraw = True
+
+		# Frame pacing
+		self.fps_cap = fps_cap
+		self.clock = pg.time.Clock()
+		self.fps = 0.0
+		self._frame_count = 0
+		self._fps_start = time_ms()
+
+	def request_full_redraw(self) -> None:
+		"""Draw the whole screen on the next frame, e.g. after the window was resized."""
+		self._full_redraw = True
+
+	@staticmethod
+	def wake() -> None:
+		"""Wake up the main loop when it is idle, e.g. when an engine result is ready. Safe to call from any thread."""
+		pg.event.post(pg.event.Event(WAKE_EVENT))
+
+	def is_animating(self) -> bool:
+		"""Check if something moves on the screen without input, so frames have to keep coming."""
+		return False
+
+	def get_events(self) -> List[pg.event.Event]:
+		"""
+		Get the pending events. When nothing is animating the loop sleeps
+		until an event arrives: input, a timer set with pg.time.set_timer or
+		a wake() call.
+		"""
+		if self._full_redraw or self.is_animating():
+			return pg.event.get()
+
+		return [pg.event.wait()] + pg.event.get()
+
+	def _count_frame(self) -> None:
+		"""Count a frame and measure the achieved FPS every FPS_REPORT_INTERVAL ms."""
+		self._frame_count += 1
+
+		elapsed = time_ms() - self._fps_start
+		if elapsed >= FPS_REPORT_INTERVAL:
+			self.fps = self._frame_count * 1000 / elapsed
+			self._frame_count = 0
+			self._fps_start += elapsed
+			self.report_fps(self.fps)
+
+	def report_fps(self, fps: float) -> None:
+		"""Report the achieved FPS, in the window title by default."""
+		pg.display.set_caption(f'{self.WINDOW_TITLE} ({fps:.0f} FPS)')
+
 	def start(self) -> None:
-		"""Start the main loop of the game."""
+		"""
+		Start the main loop of the game. After the first frame only the areas
+		that changed are drawn and updated on the display. Frames are capped
+		at fps_cap, and the loop sleeps while nothing happens.
+		"""
 		while True:
 			# Event handling
 			self.poll_events()
@@ -42,12 +99,22 @@ class Display(ABC):
 			self.update()
 
 			# Rendering
-			self.render()
-			pg.display.flip()
+			if self._full_redraw:
+				self._full_redraw = False
+				self.render()
+				pg.display.flip()
+			else:
+				dirty_rects = self.render_dirty()
+				if dirty_rects:
+					pg.display.update(dirty_rects)
+
+			# Frame pacing
+			self.clock.tick(self.fps_cap)
+			self._count_frame()
 
 	@abstractmethod
 	def poll_events(self) -> None:
-		"""Check events regarding the window."""
+		"""Check events regarding the window, see get_events."""
 		raise NotImplemented
 
 	@abstractmethod
@@ -55,6 +122,15 @@ class Display(ABC):
 		"""Draw/render objects to the screen."""
 		self.screen.fill(self.BACKGROUND_COLOR)
 
+	def render_dirty(self) -> List[pg.Rect]:
+		"""
+		Draw what changed since the last frame and return the rects that
+		were drawn. By default the whole screen is drawn.
+		"""
+		self.render()
+
+		return [self.screen.get_rect()]
+
 	@abstractmethod
 	def update(self) -> None:
 		"""Update the game state."""
@@ -7,6 +7,10 @@ SCREEN_PROPERTIES = (1280, 720)
 WINDOW_TITLE = 'Chess'
 BACKGROUND_COLOR = (192, 192, 192)
 
+# Frame pacing constants
+FPS_CAP = 60
+FPS_REPORT_INTERVAL = 1000  # ms
+
 # Piece spritesheet constants
 PIECE_SIZE_X = 64
 PIECE_SIZE_Y = 64
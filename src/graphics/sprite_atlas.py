@@ -0,0 +1,49 @@
+# Type annotations
+from typing import Dict, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from .spritesheet import Spritesheet
+
+import pygame as pg
+
+
+class SpriteAtlas:
+	"""
+	Shares the images of a spritesheet. Every image is cut from the sheet
+	once, and its scaled variants are made once for every size.
+	"""
+
+	def __init__(self, spritesheet: 'Spritesheet'):
+		"""Initialize the atlas of a spritesheet."""
+		self.spritesheet = spritesheet
+
+		# Images by the rect they cover on the sheet, and scaled images by (rect, size)
+		self._images: Dict[Tuple[int, int, int, int], pg.Surface] = {}
+		self._scaled_images: Dict[Tuple[Tuple[int, int, int, int], Tuple[int, int]], pg.Surface] = {}
+
+	def get_image(self, rect: pg.Rect, size: Union[Tuple[int, int], None] = None) -> pg.Surface:
+		"""
+		Get the image covered by the rect, scaled to the size if one is given.
+		The same surface is returned every time, so it must not be drawn on.
+		"""
+		key = tuple(rect)
+		image = self._images.get(key)
+		if image is None:
+			image = self.spritesheet.get_image_at(rect)
+			self._images[key] = image
+
+		if size is None or tuple(size) == image.get_size():
+			return image
+
+		scaled_key = (key, tuple(size))
+		scaled_image = self._scaled_images.get(scaled_key)
+		if scaled_image is None:
+			scaled_image = pg.transform.smoothscale(image, size)
+			self._scaled_images[scaled_key] = scaled_image
+
+		return scaled_image
+
+	def __str__(self):
+		return f'<SpriteAtlas: {len(self._images)} images, {len(self._scaled_images)} scaled images>'
+
+	def __repr__(self):
+		return str(self)
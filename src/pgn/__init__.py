@@ -0,0 +1,27 @@
+"""
+This is the 'pgn' package. It reads games from PGN
+files without needing the GUI.
+"""
+
+import importlib
+
+from .game import Game, Line
+from .reader import PGNReader, tokenize
+from .writer import PGNWriter, game_to_pgn
+
+
+# Modules that can be run with python -m, importing them here would make runpy warn
+_CLI_MODULES = {
+	'PositionIndex': '.position_index',
+	'build_position_index': '.position_index',
+	'build_book': '.book_builder',
+}
+
+
+def __getattr__(name: str):
+	"""Import the command line modules only when they are used."""
+	if name in _CLI_MODULES:
+		module = importlib.import_module(_CLI_MODULES[name], __name__)
+		return getattr(module, name)
+
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
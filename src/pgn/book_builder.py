@@ -0,0 +1,124 @@
+"""
+Building Polyglot opening books from PGN files.
+
+The first plies of every game are replayed, and every (position, move)
+pair gets a weight from the results of the games it was played in: 2 for
+a win of the side that moved, 1 for a draw and 0 for a loss. Weights are
+scaled down per position to fit the 16 bits of a book entry.
+
+Usage (from the src directory):
+	python -m pgn.book_builder games.pgn book.bin --max-ply 30 --min-games 3
+"""
+
+# Type annotations
+from typing import Dict, List, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+
+import argparse
+from collections import namedtuple
+from time import perf_counter
+
+from chess.chess_constants import WHITE
+from chess.position import Position
+from chess.san import parse_san
+from chess.polyglot import polyglot_key, encode_book_move, write_book
+
+from .reader import PGNReader
+
+
+# Define what can be imported from this module
+__all__ = ['build_book', 'BookStats']
+
+
+# The result of building a book
+BookStats = namedtuple('BookStats', 'games, entries, seconds')
+
+# The score of a result for the side that moved, by result and color
+_RESULT_SCORES = {'1-0': (2, 0), '0-1': (0, 2), '1/2-1/2': (1, 1)}
+
+MAX_WEIGHT = 0xFFFF
+
+
+def _add_game(game, max_ply: int, counts: Dict[Tuple[int, int], List[int]]) -> None:
+	"""Count the moves of the first plies of a game, stopping at an illegal move or an invalid FEN tag."""
+	scores = _RESULT_SCORES.get(game.result)
+	if scores is None:
+		# Unfinished games don't say anything about their moves
+		return
+
+	try:
+		position = Position(game.starting_fen)
+	except ValueError:
+		return
+
+	for san in game.moves[:max_ply]:
+		try:
+			move = parse_san(position, san)
+		except ValueError:
+			return
+
+		count = counts.setdefault((polyglot_key(position), encode_book_move(position, move)), [0, 0])
+		count[0] += 1
+		count[1] += scores[position.turn != WHITE]
+
+		position.push(move)
+
+
+def _entries(counts: Dict[Tuple[int, int], List[int]], min_games: int) -> List[Tuple[int, int, int, int]]:
+	"""Turn the counts into (key, move, weight, learn) entries, scaling weights per position."""
+	positions = {}
+	for (key, book_move), (games, weight) in counts.items():
+		if games >= min_games and weight > 0:
+			positions.setdefault(key, []).append((book_move, weight))
+
+	entries = []
+	for key, moves in positions.items():
+		largest = max(weight for _, weight in moves)
+		for book_move, weight in moves:
+			if largest > MAX_WEIGHT:
+				weight = max(weight*MAX_WEIGHT // largest, 1)
+			entries.append((key, book_move, weight, 0))
+
+	return entries
+
+
+def build_book(
+		pgn_path: Union[str, 'Path'], book_path: Union[str, 'Path'],
+		max_ply: int = 30, min_games: int = 1
+	) -> BookStats:
+	"""
+	Build a Polyglot book from the first max_ply plies of the games of a PGN
+	file. Moves played in fewer than min_games games, or that never scored,
+	are left out.
+	"""
+	start = perf_counter()
+	counts = {}
+	games = 0
+
+	with PGNReader(pgn_path) as reader:
+		for game in reader.games():
+			_add_game(game, max_ply, counts)
+			games += 1
+
+	entry_count = write_book(_entries(counts, min_games), book_path)
+
+	return BookStats(games, entry_count, perf_counter() - start)
+
+
+def main():
+	"""Build a book from the command line."""
+	arg_parser = argparse.ArgumentParser(description='Build a Polyglot opening book from a PGN file.')
+	arg_parser.add_argument('pgn', help='PGN file to read')
+	arg_parser.add_argument('book', help='book file to write')
+	arg_parser.add_argument('--max-ply', type=int, default=30, help='number of plies of every game to use')
+	arg_parser.add_argument('--min-games', type=int, default=1, help='games a move must be played in')
+	args = arg_parser.parse_args()
+
+	stats = build_book(args.pgn, args.book, args.max_ply, args.min_games)
+	print(f'Games: {stats.games}, entries: {stats.entries}')
+	print(f'Time: {stats.seconds:.3f} s')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,112 @@
+"""
+The games read from PGN files.
+
+A line of moves keeps its SAN moves, and the comments, NAGs and
+variations are keyed by the index of the move they belong to. A
+variation replaces the move with the same index, and comments and NAGs
+at index i follow the move with index i - 1 (index 0 is before the
+first move).
+"""
+
+# Type annotations
+from typing import Dict, Iterable, List, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from chess import Board
+
+from chess.chess_constants import DEFAULT_POSITION_FEN
+from chess.position import Position
+from chess.san import parse_san, move_to_san
+
+
+# Define what can be imported from this module
+__all__ = ['Line', 'Game']
+
+
+class Line:
+	"""A line of moves with its comments, NAGs and variations."""
+
+	def __init__(self):
+		self.moves: List[str] = []
+		self.comments: Dict[int, List[str]] = {}
+		self.nags: Dict[int, List[int]] = {}
+		self.variations: Dict[int, List['Line']] = {}
+
+	def add_comment(self, comment: str) -> None:
+		"""Add a comment after the last move."""
+		self.comments.setdefault(len(self.moves), []).append(comment)
+
+	def add_nag(self, nag: int) -> None:
+		"""Add a numeric annotation glyph to the last move."""
+		self.nags.setdefault(len(self.moves), []).append(nag)
+
+	def add_variation(self) -> 'Line':
+		"""Start a variation of the last move and return it."""
+		variation = Line()
+		self.variations.setdefault(len(self.moves) - 1, []).append(variation)
+
+		return variation
+
+	def __str__(self):
+		return f'<Line: {len(self.moves)} moves, {len(self.variations)} variations>'
+
+	def __repr__(self):
+		return str(self)
+
+
+class Game(Line):
+	"""A game read from a PGN file: its tags, result and main line."""
+
+	def __init__(self, offset: int = 0):
+		"""Initialize an empty game that starts at the given byte offset of its file."""
+		super().__init__()
+		self.offset = offset
+		self.headers: Dict[str, str] = {}
+		self.result = '*'
+
+	@classmethod
+	def from_moves(
+			cls, moves: Iterable[int], fen: str = DEFAULT_POSITION_FEN,
+			headers: Union[Dict[str, str], None] = None, result: str = '*'
+		) -> 'Game':
+		"""Create a game from encoded legal moves played from the given position."""
+		game = cls()
+		game.headers = dict(headers) if headers is not None else {}
+		game.result = result
+
+		if fen != DEFAULT_POSITION_FEN:
+			game.headers['SetUp'] = '1'
+			game.headers['FEN'] = fen
+
+		position = Position(fen)
+		for move in moves:
+			game.moves.append(move_to_san(position, move))
+			position.push(move)
+
+		return game
+
+	@property
+	def starting_fen(self) -> str:
+		"""The FEN of the position the game starts from."""
+		return self.headers.get('FEN', DEFAULT_POSITION_FEN)
+
+	def replay(self, board: Union['Board', Position, None] = None) -> Union['Board', Position]:
+		"""
+		Play the main line onto a Board or Position and return it. Without
+		one, a new position is set up from the game's starting FEN. An
+		illegal move raises a ValueError.
+		"""
+		if board is None:
+			board = Position(self.starting_fen)
+
+		position = board if isinstance(board, Position) else board.position
+
+		for san in self.moves:
+			board.push(parse_san(position, san))
+
+		return board
+
+	def __str__(self):
+		white = self.headers.get('White', '?')
+		black = self.headers.get('Black', '?')
+
+		return f'<Game: {white} - {black} {self.result}, {len(self.moves)} moves>'
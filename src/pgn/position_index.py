@@ -0,0 +1,339 @@
+"""
+An on-disk index from positions to the games that reached them.
+
+Every game of a PGN file is replayed, and a (position key, game number,
+ply) record is made for every position of its main line. The records
+are sorted by an external merge sort (sorted runs on disk, merged in one
+pass), so building doesn't need memory for the whole corpus, and are
+written as one array of 64-bit words in native byte order:
+
+	header: magic, record count
+	record: Zobrist key, game number << 32 | ply
+
+Lookups memory-map the file and binary search the keys, so they only
+touch the few pages on the search path.
+
+Usage (from the src directory):
+	python -m pgn.position_index build games.pgn games.idx --workers 8
+	python -m pgn.position_index lookup games.idx --fen "<FEN>"
+"""
+
+# Type annotations
+from typing import Iterator, List, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+
+import argparse
+import heapq
+import mmap
+import os
+import shutil
+import tempfile
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from time import perf_counter
+
+from chess.chess_constants import DEFAULT_POSITION_FEN
+from chess.position import Position
+from chess.san import parse_san
+
+from .reader import PGNReader
+
+
+# Define what can be imported from this module
+__all__ = ['PositionIndex', 'build_position_index', 'IndexStats']
+
+
+MAGIC = 0x31584449534F5043  # b'CPOSIDX1' read as a little-endian word
+_HEADER_WORDS = 2
+_WORDS_PER_RECORD = 2
+
+# The number of records sorted in memory at a time
+RUN_SIZE = 1 << 22
+
+# The number of records read from or written to a file at a time
+_BLOCK_SIZE = 1 << 16
+
+_LOW_MASK = (1 << 64) - 1
+
+
+# The result of building an index
+IndexStats = namedtuple('IndexStats', 'games, positions, errors, seconds')
+
+
+#############################
+########## BUILDING #########
+#############################
+
+
+def _game_records(game, game_number: int) -> Tuple[List[int], bool]:
+	"""
+	Replay the main line of a game and get a record for every position,
+	packed as key << 64 | game number << 32 | ply. The second value tells
+	if the replay stopped at an illegal move or the game has an invalid
+	FEN tag, which gives no records.
+	"""
+	try:
+		position = Position(game.starting_fen)
+	except ValueError:
+		return [], True
+
+	number = game_number << 32
+	records = [(position.key << 64) | number]
+
+	for ply, san in enumerate(game.moves, 1):
+		try:
+			position.push(parse_san(position, san))
+		except ValueError:
+			return records, True
+
+		records.append((position.key << 64) | number | ply)
+
+	return records, False
+
+
+def _write_run(records: List[int], run_dir: str) -> str:
+	"""Sort records and write them to a new run file, returns its path."""
+	records.sort()
+
+	fd, path = tempfile.mkstemp(suffix='.run', dir=run_dir)
+	with os.fdopen(fd, 'wb') as f:
+		for i in range(0, len(records), _BLOCK_SIZE):
+			words = array('Q')
+			for record in records[i:i + _BLOCK_SIZE]:
+				words.append(record >> 64)
+				words.append(record & _LOW_MASK)
+			words.tofile(f)
+
+	return path
+
+
+def _build_runs(args: Tuple[str, int, int, int, str, int]) -> Tuple[List[str], int, int, int]:
+	"""
+	Replay the games with numbers in [first, last) into sorted run files,
+	run inside a worker process. The first game starts at the given byte
+	offset, so workers don't scan the file for the game offsets. Returns
+	the run paths and the number of games, records and games with errors.
+	"""
+	pgn_path, offset, first, last, run_dir, run_size = args
+
+	runs = []
+	records = []
+	games = positions = errors = 0
+
+	with PGNReader(pgn_path) as reader:
+		for game_number, game in enumerate(islice(reader.games_at(offset), last - first), first):
+			game_records, had_error = _game_records(game, game_number)
+			records.extend(game_records)
+			games += 1
+			positions += len(game_records)
+			errors += had_error
+
+			if len(records) >= run_size:
+				runs.append(_write_run(records, run_dir))
+				records = []
+
+	if records:
+		runs.append(_write_run(records, run_dir))
+
+	return runs, games, positions, errors
+
+
+def _read_run(path: str) -> Iterator[int]:
+	"""Yield the packed records of a run file in order."""
+	with open(path, 'rb') as f:
+		while True:
+			words = array('Q')
+			try:
+				words.fromfile(f, _BLOCK_SIZE*_WORDS_PER_RECORD)
+			except EOFError:
+				# The last block is shorter, whatever was read is in the array
+				pass
+
+			if not words:
+				return
+
+			for i in range(0, len(words), 2):
+				yield (words[i] << 64) | words[i + 1]
+
+
+def _merge_runs(runs: List[str], index_path: Union[str, 'Path'], count: int) -> None:
+	"""Merge the sorted runs into the index file."""
+	with open(index_path, 'wb') as f:
+		array('Q', (MAGIC, count)).tofile(f)
+
+		words = array('Q')
+		for record in heapq.merge(*(_read_run(run) for run in runs)):
+			words.append(record >> 64)
+			words.append(record & _LOW_MASK)
+
+			if len(words) >= _BLOCK_SIZE*_WORDS_PER_RECORD:
+				words.tofile(f)
+				words = array('Q')
+
+		words.tofile(f)
+
+
+def build_position_index(
+		pgn_path: Union[str, 'Path'], index_path: Union[str, 'Path'],
+		workers: int = 1, run_size: int = RUN_SIZE
+	) -> IndexStats:
+	"""
+	Replay every game of a PGN file and write the sorted position index.
+	Ranges of games are replayed across worker processes. A game with an
+	illegal move is indexed up to that move and counted as an error, and a
+	game with an invalid FEN tag is skipped and counted as an error.
+	"""
+	start = perf_counter()
+
+	# The game offsets are found once here, every worker starts at its first game's offset
+	with PGNReader(pgn_path) as reader:
+		offsets = reader.build_index()
+	game_count = len(offsets)
+
+	index_dir = os.path.dirname(os.path.abspath(index_path))
+	run_dir = tempfile.mkdtemp(prefix='position_index_', dir=index_dir)
+
+	try:
+		workers = max(min(workers, game_count), 1)
+		bounds = [game_count*i // workers for i in range(workers + 1)]
+		tasks = [
+			(str(pgn_path), offsets[first] if first < game_count else 0, first, last, run_dir, run_size)
+			for first, last in zip(bounds, bounds[1:])
+		]
+
+		if workers > 1:
+			with ProcessPoolExecutor(max_workers=workers) as executor:
+				results = list(executor.map(_build_runs, tasks))
+		else:
+			results = [_build_runs(task) for task in tasks]
+
+		runs = [run for result in results for run in result[0]]
+		positions = sum(result[2] for result in results)
+		errors = sum(result[3] for result in results)
+
+		_merge_runs(runs, index_path, positions)
+	finally:
+		shutil.rmtree(run_dir, ignore_errors=True)
+
+	return IndexStats(game_count, positions, errors, perf_counter() - start)
+
+
+#############################
+########## LOOKUPS ##########
+#############################
+
+
+class PositionIndex:
+	"""A memory-mapped position index, searched by Zobrist key."""
+
+	def __init__(self, index_path: Union[str, 'Path']):
+		"""Open and map the index file."""
+		self.index_path = index_path
+
+		self._file = open(index_path, 'rb')
+		self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		self.words = memoryview(self._mmap).cast('Q')
+
+		if len(self.words) < _HEADER_WORDS or self.words[0] != MAGIC:
+			self.close()
+			raise ValueError(f'Not a position index: {index_path}')
+
+		self.count = self.words[1]
+
+	def _lower_bound(self, key: int) -> int:
+		"""Get the number of the first record with a key that is not less than the given key."""
+		words = self.words
+		low = 0
+		high = self.count
+
+		while low < high:
+			middle = (low + high) // 2
+			if words[_HEADER_WORDS + middle*_WORDS_PER_RECORD] < key:
+				low = middle + 1
+			else:
+				high = middle
+
+		return low
+
+	def lookup(self, key: int) -> List[Tuple[int, int]]:
+		"""Get the (game number, ply) of every time the position with the given key was reached."""
+		words = self.words
+		results = []
+
+		i = self._lower_bound(key)
+		word = _HEADER_WORDS + i*_WORDS_PER_RECORD
+		while i < self.count and words[word] == key:
+			location = words[word + 1]
+			results.append((location >> 32, location & 0xFFFFFFFF))
+			i += 1
+			word += _WORDS_PER_RECORD
+
+		return results
+
+	def lookup_position(self, position: Position) -> List[Tuple[int, int]]:
+		"""Get the (game number, ply) of every time the position was reached."""
+		return self.lookup(position.key)
+
+	def lookup_fen(self, fen: str) -> List[Tuple[int, int]]:
+		"""Get the (game number, ply) of every time the position of the FEN was reached."""
+		return self.lookup(Position(fen).key)
+
+	def __len__(self):
+		"""The number of records in the index."""
+		return self.count
+
+	def close(self) -> None:
+		"""Unmap and close the index file."""
+		self.words.release()
+		self._mmap.close()
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def __str__(self):
+		return f'<PositionIndex: {self.index_path}, {self.count} positions>'
+
+	def __repr__(self):
+		return str(self)
+
+
+def main():
+	"""Build or search a position index from the command line."""
+	arg_parser = argparse.ArgumentParser(description='Index the positions of a PGN file.')
+	subparsers = arg_parser.add_subparsers(dest='command', required=True)
+
+	build_parser = subparsers.add_parser('build', help='build an index from a PGN file')
+	build_parser.add_argument('pgn', help='PGN file to index')
+	build_parser.add_argument('index', help='index file to write')
+	build_parser.add_argument('--workers', type=int, default=1, help='number of worker processes')
+
+	lookup_parser = subparsers.add_parser('lookup', help='find the games that reached a position')
+	lookup_parser.add_argument('index', help='index file to search')
+	lookup_parser.add_argument('--fen', default=DEFAULT_POSITION_FEN, help='position to look up')
+
+	args = arg_parser.parse_args()
+
+	if args.command == 'build':
+		stats = build_position_index(args.pgn, args.index, args.workers)
+		print(f'Games: {stats.games}, positions: {stats.positions}, games with errors: {stats.errors}')
+		print(f'Time: {stats.seconds:.3f} s')
+	else:
+		start = perf_counter()
+		with PositionIndex(args.index) as index:
+			results = index.lookup_fen(args.fen)
+		seconds = perf_counter() - start
+
+		for game_number, ply in results:
+			print(f'Game {game_number}, ply {ply}')
+		print(f'{len(results)} results in {seconds*1000:.3f} ms')
+
+
+if __name__ == '__main__':
+	main()
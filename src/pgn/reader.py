@@ -0,0 +1,278 @@
+"""
+A streaming PGN reader.
+
+The file is memory-mapped and tokenized with regular expressions that run
+over the mapped bytes, so only the tokens that are used become Python
+strings and memory doesn't grow with the size of the file. Games are
+found by their first tag line after movetext, which lets the reader skip
+over the movetext of games it doesn't need and build an index of game
+offsets to jump to game N.
+"""
+
+# Type annotations
+from typing import Iterator, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+
+import mmap
+import os
+import re
+from array import array
+
+from .game import Line, Game
+
+
+# Define what can be imported from this module
+__all__ = [
+	'PGNReader', 'tokenize', 'TAG', 'COMMENT', 'NAG',
+	'VARIATION_START', 'VARIATION_END', 'RESULT', 'SAN'
+]
+
+
+# Token kinds, the number of the last group of the token's pattern
+TAG = 2
+COMMENT = 3
+LINE_COMMENT = 4
+NAG = 5
+VARIATION_START = 6
+VARIATION_END = 7
+RESULT = 8
+SAN = 9
+_MOVE_NUMBER = 10
+
+_TOKEN_REGEX = re.compile(rb'''
+	\[[ \t]*([A-Za-z0-9_]+)[ \t]*"((?:[^"\\\r\n]|\\.)*)"[ \t]*\]
+	| \{([^}]*)\}
+	| ;([^\r\n]*)
+	| \$([0-9]+)
+	| (\()
+	| (\))
+	| (1-0|0-1|1/2-1/2|\*)
+	| ((?:[A-Za-z][A-Za-z0-9=+\#-]*|0-0(?:-0)?[+\#]?)[!?]*)
+	| ([0-9]+\.*)
+	| (?m:^(%)[^\r\n]*)
+''', re.X)
+
+_TAG_REGEX = re.compile(rb'\[[ \t]*([A-Za-z0-9_]+)[ \t]*"((?:[^"\\\r\n]|\\.)*)"[ \t]*\]')
+
+# The first line of a game, and the first line of movetext
+_TAG_LINE_REGEX = re.compile(rb'^[ \t]*\[', re.M)
+_MOVETEXT_LINE_REGEX = re.compile(rb'^[ \t]*[^\[\s]', re.M)
+
+# Comments are skipped over, a tag line outside of them starts the next game
+_NEXT_GAME_REGEX = re.compile(rb'\{[^}]*\}|;[^\r\n]*|^[ \t]*(\[)', re.M)
+
+# Move suffix annotations and the NAGs they stand for
+_SUFFIX_NAGS = {'!': 1, '?': 2, '!!': 3, '??': 4, '!?': 5, '?!': 6}
+
+
+def _decode(data: bytes) -> str:
+	"""Turn bytes from the file into a string."""
+	return data.decode('utf-8', 'replace')
+
+
+def _unescape(value: bytes) -> str:
+	"""Remove the escapes from a tag value."""
+	return _decode(value.replace(b'\\"', b'"').replace(b'\\\\', b'\\'))
+
+
+def tokenize(
+		buffer, start: int = 0, end: Union[int, None] = None
+	) -> Iterator[Tuple[int, int, Union[str, Tuple[str, str]]]]:
+	"""
+	Yield the tokens of PGN text in a bytes-like buffer as (kind, offset,
+	value) tuples. Tags have a (name, value) tuple as their value. Move
+	numbers and escaped lines are left out.
+	"""
+	if end is None:
+		end = len(buffer)
+
+	for match in _TOKEN_REGEX.finditer(buffer, start, end):
+		kind = match.lastindex
+
+		if kind == TAG:
+			yield TAG, match.start(), (_decode(match.group(1)), _unescape(match.group(2)))
+		elif kind == LINE_COMMENT:
+			yield COMMENT, match.start(), _decode(match.group(kind))
+		elif kind < _MOVE_NUMBER:
+			yield kind, match.start(), _decode(match.group(kind))
+
+
+class PGNReader:
+	"""Reads games from a memory-mapped PGN file."""
+
+	def __init__(self, filename: Union[str, 'Path'], index_path: Union[str, 'Path', None] = None):
+		"""
+		Open and map the file. If an index path is given, the game offset
+		index is loaded from it when it exists and saved to it when it is built.
+		"""
+		self.filename = filename
+		self.index_path = index_path
+
+		self._file = open(filename, 'rb')
+		if os.fstat(self._file.fileno()).st_size:
+			self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		else:
+			# Empty files can't be mapped
+			self.buffer = b''
+
+		self._offsets: Union[array, None] = None
+
+	# Finding games
+	def _next_game(self, pos: int) -> int:
+		"""Get the offset of the first game that starts at or after the position."""
+		match = _TAG_LINE_REGEX.search(self.buffer, pos)
+
+		return match.start() if match is not None else len(self.buffer)
+
+	def _game_end(self, start: int) -> int:
+		"""Get the offset where the game starting at the given offset ends."""
+		buffer = self.buffer
+
+		movetext = _MOVETEXT_LINE_REGEX.search(buffer, start)
+		if movetext is None:
+			return len(buffer)
+
+		pos = movetext.start()
+		while True:
+			match = _NEXT_GAME_REGEX.search(buffer, pos)
+			if match is None:
+				return len(buffer)
+
+			if match.lastindex == 1:
+				return match.start()
+
+			pos = match.end()
+
+	def _iter_bounds(self, start: int = 0) -> Iterator[Tuple[int, int]]:
+		"""Yield the (start, end) offsets of the games from the given offset on."""
+		size = len(self.buffer)
+		pos = self._next_game(start)
+
+		while pos < size:
+			end = self._game_end(pos)
+			yield pos, end
+			pos = end
+
+	def build_index(self) -> array:
+		"""Get the offsets of every game, building them with one pass over the file the first time."""
+		if self._offsets is not None:
+			return self._offsets
+
+		if self.index_path is not None and os.path.exists(self.index_path):
+			offsets = array('Q')
+			with open(self.index_path, 'rb') as f:
+				offsets.frombytes(f.read())
+		else:
+			offsets = array('Q', (start for start, _ in self._iter_bounds()))
+
+			if self.index_path is not None:
+				with open(self.index_path, 'wb') as f:
+					offsets.tofile(f)
+
+		self._offsets = offsets
+		return offsets
+
+	# Reading games
+	def _parse_headers(self, game: Game, start: int, end: int) -> None:
+		"""Read the tag pairs of a game."""
+		movetext = _MOVETEXT_LINE_REGEX.search(self.buffer, start, end)
+		tags_end = movetext.start() if movetext is not None else end
+
+		for match in _TAG_REGEX.finditer(self.buffer, start, tags_end):
+			game.headers[_decode(match.group(1))] = _unescape(match.group(2))
+
+	def _parse_game(self, start: int, end: int, headers_only: bool = False) -> Game:
+		"""Read the game between the given offsets."""
+		game = Game(start)
+
+		if headers_only:
+			self._parse_headers(game, start, end)
+			return game
+
+		lines = [game]
+		for kind, _, value in tokenize(self.buffer, start, end):
+			line = lines[-1]
+
+			if kind == SAN:
+				san = value.rstrip('!?')
+				if len(san) != len(value):
+					nag = _SUFFIX_NAGS.get(value[len(san):])
+					line.moves.append(san)
+					if nag is not None:
+						line.add_nag(nag)
+				else:
+					line.moves.append(value)
+			elif kind == TAG:
+				game.headers[value[0]] = value[1]
+			elif kind == COMMENT:
+				line.add_comment(value.strip())
+			elif kind == NAG:
+				line.add_nag(int(value))
+			elif kind == VARIATION_START:
+				if line.moves:
+					lines.append(line.add_variation())
+				else:
+					# A variation without a move to replace, read it into a throwaway line
+					lines.append(Line())
+			elif kind == VARIATION_END:
+				if len(lines) > 1:
+					lines.pop()
+			elif kind == RESULT and len(lines) == 1:
+				game.result = value
+
+		return game
+
+	def games(self, start: int = 0, headers_only: bool = False) -> Iterator[Game]:
+		"""
+		Yield the games of the file in order, starting with game number start
+		(counting from 0, which uses the offset index). With headers_only the
+		movetext is skipped over and only the tags are read.
+		"""
+		offset = 0
+		if start:
+			offsets = self.build_index()
+			if start >= len(offsets):
+				return
+			offset = offsets[start]
+
+		yield from self.games_at(offset, headers_only)
+
+	def games_at(self, offset: int, headers_only: bool = False) -> Iterator[Game]:
+		"""Yield the games of the file from the given byte offset on, without the offset index."""
+		for game_start, game_end in self._iter_bounds(offset):
+			yield self._parse_game(game_start, game_end, headers_only)
+
+	def game(self, number: int, headers_only: bool = False) -> Game:
+		"""Get the game with the given number, counting from 0."""
+		offsets = self.build_index()
+		if not 0 <= number < len(offsets):
+			raise IndexError(f'There is no game {number}, the file has {len(offsets)} games')
+
+		start = offsets[number]
+		return self._parse_game(start, self._game_end(start), headers_only)
+
+	def __iter__(self) -> Iterator[Game]:
+		return self.games()
+
+	def __len__(self):
+		"""The number of games in the file."""
+		return len(self.build_index())
+
+	def close(self) -> None:
+		"""Unmap and close the file."""
+		if isinstance(self.buffer, mmap.mmap):
+			self.buffer.close()
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def __str__(self):
+		return f'<PGNReader: {self.filename}>'
+
+	def __repr__(self):
+		return str(self)
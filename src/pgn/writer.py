@@ -0,0 +1,166 @@
+"""
+A streaming PGN writer.
+
+Games are turned into PGN text one by one and written to the file in
+batches, so exporting many games costs one write per batch instead of
+one per game, and memory only holds one batch.
+"""
+
+# Type annotations
+from typing import IO, List, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+	from pathlib import Path
+
+from chess.position import Position
+
+from .game import Line, Game
+
+
+# Define what can be imported from this module
+__all__ = ['PGNWriter', 'game_to_pgn']
+
+
+# The Seven Tag Roster, written first and in this order, with their defaults
+SEVEN_TAG_ROSTER = (
+	('Event', '?'), ('Site', '?'), ('Date', '????.??.??'), ('Round', '?'),
+	('White', '?'), ('Black', '?'), ('Result', '*')
+)
+
+# Movetext lines are wrapped at this length
+LINE_LENGTH = 79
+
+
+def _escape(value: str) -> str:
+	"""Escape a tag value."""
+	return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _line_tokens(line: Line, first_ply: int) -> List[str]:
+	"""
+	Get the movetext tokens of a line of moves, the first move being made
+	at the given ply (0 is white's first move).
+	"""
+	tokens = [f'{{{comment}}}' for comment in line.comments.get(0, ())]
+	needs_number = True
+
+	for i, san in enumerate(line.moves):
+		ply = first_ply + i
+		if ply % 2 == 0:
+			tokens.append(f'{ply // 2 + 1}.')
+		elif needs_number:
+			# Black's move after a comment or variation repeats the move number
+			tokens.append(f'{ply // 2 + 1}...')
+		tokens.append(san)
+		needs_number = False
+
+		for nag in line.nags.get(i + 1, ()):
+			tokens.append(f'${nag}')
+
+		for comment in line.comments.get(i + 1, ()):
+			tokens.append(f'{{{comment}}}')
+			needs_number = True
+
+		for variation in line.variations.get(i, ()):
+			variation_tokens = _line_tokens(variation, ply)
+			if variation_tokens:
+				variation_tokens[0] = '(' + variation_tokens[0]
+				variation_tokens[-1] += ')'
+				tokens.extend(variation_tokens)
+				needs_number = True
+
+	return tokens
+
+
+def _wrap(tokens: List[str]) -> str:
+	"""Join tokens into lines of at most LINE_LENGTH characters where possible."""
+	lines = []
+	current = []
+	length = 0
+
+	for token in tokens:
+		if current and length + 1 + len(token) > LINE_LENGTH:
+			lines.append(' '.join(current))
+			current = []
+			length = 0
+
+		length += len(token) + (1 if current else 0)
+		current.append(token)
+
+	if current:
+		lines.append(' '.join(current))
+
+	return '\n'.join(lines)
+
+
+def game_to_pgn(game: Game) -> str:
+	"""Get the PGN text of a game, ending with an empty line."""
+	headers = dict(game.headers)
+	headers['Result'] = game.result
+
+	tag_lines = [f'[{name} "{_escape(headers.pop(name, default))}"]' for name, default in SEVEN_TAG_ROSTER]
+	tag_lines.extend(f'[{name} "{_escape(value)}"]' for name, value in headers.items())
+
+	if 'FEN' in game.headers:
+		position = Position(game.headers['FEN'])
+		first_ply = (position.fullmove_number - 1)*2 + position.turn
+	else:
+		first_ply = 0
+
+	tokens = _line_tokens(game, first_ply)
+	tokens.append(game.result)
+
+	return '\n'.join(tag_lines) + '\n\n' + _wrap(tokens) + '\n\n'
+
+
+class PGNWriter:
+	"""Writes games to a PGN file in batches."""
+
+	def __init__(self, target: Union[str, 'Path', IO[str]], batch_size: int = 1000):
+		"""
+		Open the file with the given name for writing, or write to an open
+		file. Games are written once batch_size of them have been added.
+		"""
+		if isinstance(target, str) or hasattr(target, '__fspath__'):
+			self.file = open(target, 'w', encoding='utf-8')
+			self._owns_file = True
+		else:
+			self.file = target
+			self._owns_file = False
+
+		self.batch_size = batch_size
+		self.games_written = 0
+		self._batch: List[str] = []
+
+	def write_game(self, game: Game) -> None:
+		"""Add a game to the batch, writing the batch if it is full."""
+		self._batch.append(game_to_pgn(game))
+
+		if len(self._batch) >= self.batch_size:
+			self.flush()
+
+	def flush(self) -> None:
+		"""Write the games of the batch to the file."""
+		if self._batch:
+			self.file.write(''.join(self._batch))
+			self.games_written += len(self._batch)
+			self._batch.clear()
+
+		self.file.flush()
+
+	def close(self) -> None:
+		"""Write the remaining games and close the file if it was opened by the writer."""
+		self.flush()
+		if self._owns_file:
+			self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def __str__(self):
+		return f'<PGNWriter: {self.games_written} games written>'
+
+	def __repr__(self):
+		return str(self)
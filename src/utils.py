@@ -1,5 +1,5 @@
 # Type annotations
-from typing import TYPE_CHECKING, Tuple
+from typing import TYPE_CHECKING
 if TYPE_CHECKING:
 	from chess import Board, Square
 	from chess.piece import BasePiece
@@ -8,30 +8,6 @@ import pygame as pg
 from time import time as time_now
 
 
-def sort_word_by_case(word: str) -> Tuple[str, str]:
-	uppercase_letters = ""
-	lowercase_letters = ""
-
-	for ch in word:
-		if ch.isupper():
-			uppercase_letters += ch
-		else:
-			lowercase_letters += ch
-
-	return uppercase_letters, lowercase_letters
-
-
-def blend_colors(
-		rgba: Tuple[int, int, int, float], rgb: Tuple[int, int, int]
-	) -> Tuple[int, int, int]:
-	"""Get the resulting RGB color of an RGBA color rendered over an RGB color."""
-	red = (rgba[0] * rgba[3]) + (rgb[0] * (1 - rgba[3]))
-	blue = (rgba[1] * rgba[3]) + (rgb[1] * (1 - rgba[3]))
-	green = (rgba[2] * rgba[3]) + (rgb[2] * (1 - rgba[3]))
-	result_color = int(red), int(blue), int(green)
-	return result_color
-
-
 # Used for calculating the FPS
 def time_ms():
 	"""Return the current time in milliseconds."""
@@ -0,0 +1,5 @@
+# The packages are imported from the src directory, like when the game is run from it
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
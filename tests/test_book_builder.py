@@ -0,0 +1,90 @@
+from chess.position import Position, move_to_uci
+from chess.polyglot import PolyglotBook
+from pgn.book_builder import build_book
+
+
+PGN = '''[Result "1-0"]
+
+1. e4 e5 2. Nf3 1-0
+
+[Result "0-1"]
+
+1. e4 c5 0-1
+
+[Result "1/2-1/2"]
+
+1. d4 d5 1/2-1/2
+
+[Result "*"]
+
+1. c4 *
+
+[Result "1-0"]
+[SetUp "1"]
+[FEN "not a fen"]
+
+1. g4 1-0
+
+[Result "1-0"]
+[SetUp "1"]
+[FEN "4k3/8/8/8/8/8/4K3 w - - 0 1"]
+
+1. Kd2 1-0
+
+[Result "1-0"]
+[SetUp "1"]
+[FEN "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBN1 w Qkq - 0 1"]
+
+1. Nf3 1-0
+
+[Result "1-0"]
+
+1. b3 e5 2. Ke8 3. Bb2 1-0
+'''
+
+
+def _book_moves(book, position):
+	return {move_to_uci(entry.move): entry.weight for entry in book.entries(position)}
+
+
+def _push(position, uci):
+	position.push(next(move for move in position.generate_legal_moves() if move_to_uci(move) == uci))
+	return position
+
+
+def test_build_book(tmp_path):
+	pgn_path = tmp_path / 'games.pgn'
+	pgn_path.write_text(PGN, encoding='utf-8')
+	book_path = tmp_path / 'book.bin'
+
+	stats = build_book(pgn_path, book_path)
+	assert stats.games == 8
+
+	with PolyglotBook(book_path) as book:
+		# A win scores 2, a draw 1 and a loss 0, unfinished games and bad FEN tags are left out
+		assert _book_moves(book, Position()) == {'e2e4': 2, 'd2d4': 1, 'b2b3': 2}
+		assert _book_moves(book, _push(Position(), 'e2e4')) == {'c7c5': 2}
+		assert _book_moves(book, _push(Position(), 'd2d4')) == {'d7d5': 1}
+		assert _book_moves(book, _push(_push(Position(), 'e2e4'), 'e7e5')) == {'g1f3': 2}
+
+		# A game with a FEN tag starts from it
+		fen_position = Position('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBN1 w Qkq - 0 1')
+		assert _book_moves(book, fen_position) == {'g1f3': 2}
+
+		# An illegal move stops the game
+		after_e5 = _push(_push(Position(), 'b2b3'), 'e7e5')
+		assert _book_moves(book, after_e5) == {}
+
+		assert len(book) == 7
+
+
+def test_max_ply_and_min_games(tmp_path):
+	pgn_path = tmp_path / 'games.pgn'
+	pgn_path.write_text(PGN, encoding='utf-8')
+	book_path = tmp_path / 'book.bin'
+
+	stats = build_book(pgn_path, book_path, max_ply=1, min_games=2)
+	assert stats.entries == 1
+
+	with PolyglotBook(book_path) as book:
+		assert _book_moves(book, Position()) == {'e2e4': 2}
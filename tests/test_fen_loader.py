@@ -0,0 +1,58 @@
+import pytest
+
+from fen_parser.fen_loader import load_positions, parse_epd, FENLoadError
+
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+
+def test_fen_and_epd_lines():
+	loaded = list(load_positions([
+		START,
+		'',
+		'# a comment',
+		'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2 bm Nf3;',
+		'4k3/8/8/8/8/8/8/4K3 b - - hmvc 12; fmvn 40; id "kings";',
+	]))
+
+	assert [position.line_number for position in loaded] == [1, 4, 5]
+	assert loaded[0].position.fen() == START
+	assert loaded[1].operations == {'bm': 'Nf3'}
+	assert loaded[2].position.fen() == '4k3/8/8/8/8/8/8/4K3 b - - 12 40'
+	assert loaded[2].operations == {'hmvc': '12', 'fmvn': '40', 'id': 'kings'}
+
+
+@pytest.mark.parametrize('line', [
+	# The en passant square is on the wrong rank
+	'4k3/8/8/8/3pP3/8/8/4K3 w - d4 0 1',
+	'4k3/8/8/3pP3/8/8/8/4K3 w - d3 0 1',
+	# No pawn stands in front of the en passant square
+	'4k3/8/8/4P3/8/8/8/4K3 w - d6 0 1',
+	# A missing king, two kings of one color
+	'8/8/8/8/8/8/8/4K3 w - - 0 1',
+	'4k3/8/8/8/8/8/8/2K1K3 w - - 0 1',
+	# Pawns on the back ranks
+	'3Pk3/8/8/8/8/8/8/4K3 w - - 0 1',
+	'4k3/8/8/8/8/8/8/p3K3 w - - 0 1',
+	# The side that is not to move is in check
+	'4k2Q/8/8/8/8/8/8/4K3 w - - 0 1',
+	# Not a FEN at all
+	'not a fen',
+])
+def test_illegal_positions_are_rejected(line):
+	with pytest.raises(ValueError):
+		parse_epd(line)
+
+	with pytest.raises(FENLoadError) as error:
+		list(load_positions([START, line]))
+	assert error.value.line_number == 2
+
+
+def test_skip_errors():
+	errors = []
+	lines = [START, '4k3/8/8/4P3/8/8/8/4K3 w - d6 0 1', '8/8/8/8/8/8/8/4K3 w - - 0 1', START]
+
+	loaded = list(load_positions(lines, skip_errors=True, on_error=errors.append))
+
+	assert [position.line_number for position in loaded] == [1, 4]
+	assert [error.line_number for error in errors] == [2, 3]
@@ -0,0 +1,84 @@
+import pytest
+
+import fen_parser.fen_validator as fen_validator
+from fen_parser.fen_validator import check_fen, validate_fen, validate_lines, validate_file, FENError
+
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+
+@pytest.mark.parametrize('fen', [
+	START,
+	'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2',
+	'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1',
+	'4k3/8/8/8/8/8/8/4K3 w - - 99 120',
+	'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+])
+def test_valid(fen):
+	assert check_fen(fen) == []
+	assert validate_fen(fen)
+
+
+@pytest.mark.parametrize('fen, error', [
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0', FENError.FIELD_COUNT),
+	('rnbqkbnr/pppppppp/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1', FENError.RANK_COUNT),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w Qkq - 0 1', FENError.INVALID_PIECE),
+	('rnbqkbnr/pppppppp/8/8/8/7/PPPPPPPP/RNBQKBNR w KQkq - 0 1', FENError.RANK_LENGTH),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQQBNR w kq - 0 1', FENError.KING_COUNT),
+	('4k3/8/8/8/8/8/PPPPPPPP/QQQ1K3 w - - 0 1', FENError.PIECE_COUNT),
+	('P3k3/8/8/8/8/8/8/4K3 w - - 0 1', FENError.PAWN_ON_BACK_RANK),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1', FENError.TURN),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkx - 0 1', FENError.CASTLING_FORMAT),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KKkq - 0 1', FENError.CASTLING_FORMAT),
+	('rnbqkbn1/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1', FENError.CASTLING_RIGHTS),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e3 0 1', FENError.EN_PASSANT_FORMAT),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq z6 0 1', FENError.EN_PASSANT_FORMAT),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e6 0 1', FENError.EN_PASSANT_SQUARE),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - -1 1', FENError.HALFMOVE_CLOCK),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - ² 1', FENError.HALFMOVE_CLOCK),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 0', FENError.FULLMOVE_NUMBER),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 ²', FENError.FULLMOVE_NUMBER),
+	('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 x', FENError.FULLMOVE_NUMBER),
+	('4k2R/8/8/8/8/8/8/4K3 w - - 0 1', FENError.OPPONENT_IN_CHECK),
+])
+def test_errors(fen, error):
+	errors = check_fen(fen)
+
+	assert error in errors
+	assert not validate_fen(fen)
+
+
+def test_every_error_is_reported_once():
+	errors = check_fen('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkx z9 a b')
+
+	assert errors == [FENError.TURN, FENError.CASTLING_FORMAT, FENError.EN_PASSANT_FORMAT,
+		FENError.HALFMOVE_CLOCK, FENError.FULLMOVE_NUMBER]
+
+
+def test_unparsable(monkeypatch):
+	def broken_check_fen(fen):
+		raise RuntimeError(fen)
+
+	monkeypatch.setattr(fen_validator, 'check_fen', broken_check_fen)
+
+	assert list(validate_lines([START])) == [(1, [FENError.UNPARSABLE])]
+
+
+def test_validate_lines_reports_invalid_lines_in_order():
+	lines = [START, '', 'not a fen', START, 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 ²']
+
+	invalid = list(validate_lines(lines, chunk_size=2))
+
+	assert [line_number for line_number, _ in invalid] == [3, 5]
+	assert invalid[0][1] == [FENError.FIELD_COUNT]
+
+
+def test_validate_file(tmp_path):
+	path = tmp_path / 'positions.fen'
+	path.write_text(f'{START}\nnot a fen\n{START}\n', encoding='utf-8')
+
+	reported = []
+	report = validate_file(str(path), on_invalid=lambda line_number, errors: reported.append(line_number))
+
+	assert (report.lines, report.invalid) == (3, 1)
+	assert reported == [2]
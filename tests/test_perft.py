@@ -0,0 +1,40 @@
+import pytest
+
+from chess.perft import perft, divide, PERFT_SUITE
+from chess.position import Position
+
+
+# The deepest published count of every position that stays under this many nodes
+MAX_NODES = 100000
+
+
+def _depth(counts):
+	return max(depth for depth, count in enumerate(counts, 1) if count <= MAX_NODES)
+
+
+@pytest.mark.parametrize('case', PERFT_SUITE, ids=[case.name for case in PERFT_SUITE])
+def test_suite_counts(case):
+	depth = _depth(case.counts)
+	assert perft(Position(case.fen), depth) == case.counts[depth - 1]
+
+
+@pytest.mark.parametrize('case', PERFT_SUITE, ids=[case.name for case in PERFT_SUITE])
+def test_cached_counts(case):
+	depth = _depth(case.counts)
+	assert perft(Position(case.fen), depth, {}) == case.counts[depth - 1]
+
+
+def test_divide_adds_up():
+	case = PERFT_SUITE[1]
+	result = divide(Position(case.fen), 2)
+
+	assert len(result.divide) == case.counts[0]
+	assert result.nodes == sum(result.divide.values()) == case.counts[1]
+
+
+def test_perft_leaves_position_unchanged():
+	case = PERFT_SUITE[1]
+	position = Position(case.fen)
+	perft(position, 3)
+
+	assert position.fen() == case.fen
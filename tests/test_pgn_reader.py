@@ -0,0 +1,122 @@
+import pytest
+
+from chess.position import Position
+from pgn.reader import PGNReader, tokenize, TAG, COMMENT, NAG, VARIATION_START, VARIATION_END, RESULT, SAN
+
+
+PGN = r'''[Event "Casual \"blitz\" game"]
+[Site "?"]
+[White "Anderssen"]
+[Black "Kieseritzky"]
+[Result "1-0"]
+
+1. e4 e5 2. f4 exf4 {King's Gambit} 3. Bc4!? Qh4+ (3... Nf6 4. Nc3 (4. e5) 4... c6)
+4. Kf1 $2 b5 ; a line comment
+5. Bxb5 1-0
+
+% an escaped line
+[Event "Second"]
+[White "A"]
+[Black "B"]
+[Result "1/2-1/2"]
+[SetUp "1"]
+[FEN "4k3/8/8/8/8/8/4P3/4K3 b - - 0 40"]
+
+40... Kd7 41. e4 Ke6 1/2-1/2
+
+[Event "Third"]
+[Result "*"]
+
+*
+'''
+
+
+@pytest.fixture
+def pgn_path(tmp_path):
+	path = tmp_path / 'games.pgn'
+	path.write_text(PGN, encoding='utf-8')
+	return path
+
+
+def test_games(pgn_path):
+	with PGNReader(pgn_path) as reader:
+		games = list(reader)
+
+	assert len(games) == 3
+	first, second, third = games
+
+	assert first.headers['Event'] == 'Casual "blitz" game'
+	assert first.headers['White'] == 'Anderssen'
+	assert first.result == '1-0'
+	assert first.moves == ['e4', 'e5', 'f4', 'exf4', 'Bc4', 'Qh4+', 'Kf1', 'b5', 'Bxb5']
+	assert first.comments == {4: ["King's Gambit"], 8: ['a line comment']}
+	assert first.nags == {5: [5], 7: [2]}
+
+	# 3... Nf6 replaces 3... Qh4+, and 4. e5 replaces 4. Nc3 inside it
+	[variation] = first.variations[5]
+	assert variation.moves == ['Nf6', 'Nc3', 'c6']
+	assert [line.moves for line in variation.variations[1]] == [['e5']]
+
+	assert second.starting_fen == '4k3/8/8/8/8/8/4P3/4K3 b - - 0 40'
+	assert second.moves == ['Kd7', 'e4', 'Ke6']
+	assert second.result == '1/2-1/2'
+
+	assert third.headers == {'Event': 'Third', 'Result': '*'}
+	assert third.moves == []
+
+
+def test_random_access(pgn_path, tmp_path):
+	index_path = tmp_path / 'games.idx'
+
+	with PGNReader(pgn_path, index_path) as reader:
+		assert len(reader) == 3
+		assert reader.game(1).headers['Event'] == 'Second'
+		assert [game.headers['Event'] for game in reader.games(start=2)] == ['Third']
+		assert list(reader.games(start=3)) == []
+
+		with pytest.raises(IndexError):
+			reader.game(3)
+
+		offsets = list(reader.build_index())
+
+	# The saved index is loaded instead of scanning the file again
+	assert index_path.exists()
+	with PGNReader(pgn_path, index_path) as reader:
+		assert list(reader.build_index()) == offsets
+		assert reader.game(2).offset == offsets[2]
+
+
+def test_headers_only(pgn_path):
+	with PGNReader(pgn_path) as reader:
+		games = list(reader.games(headers_only=True))
+
+	assert [game.headers['Event'] for game in games] == ['Casual "blitz" game', 'Second', 'Third']
+	assert all(not game.moves for game in games)
+
+
+def test_replay(pgn_path):
+	with PGNReader(pgn_path) as reader:
+		first, second, _ = reader
+
+	position = first.replay()
+	assert position.fen() == 'rnb1kbnr/p1pp1ppp/8/1B6/4Pp1q/8/PPPP2PP/RNBQ1KNR b kq - 0 5'
+
+	assert second.replay(Position(second.starting_fen)).fen() == '8/8/4k3/8/4P3/8/8/4K3 w - - 1 42'
+
+
+def test_tokenize():
+	text = b'[White "A"] 1. e4 {hi} $1 (1. d4) 1-0'
+
+	assert [(kind, value) for kind, _, value in tokenize(text)] == [
+		(TAG, ('White', 'A')), (SAN, 'e4'), (COMMENT, 'hi'), (NAG, '1'),
+		(VARIATION_START, '('), (SAN, 'd4'), (VARIATION_END, ')'), (RESULT, '1-0'),
+	]
+
+
+def test_empty_file(tmp_path):
+	path = tmp_path / 'empty.pgn'
+	path.write_bytes(b'')
+
+	with PGNReader(path) as reader:
+		assert list(reader) == []
+		assert len(reader) == 0
@@ -0,0 +1,121 @@
+import io
+
+from chess.position import Position, move_to_uci
+from pgn.game import Game, Line
+from pgn.reader import PGNReader
+from pgn.writer import PGNWriter, game_to_pgn, LINE_LENGTH
+
+
+ENDGAME_FEN = '4k3/8/8/8/8/8/4P3/4K3 b - - 0 40'
+
+
+def _moves(fen, ucis):
+	position = Position(fen)
+	moves = []
+
+	for uci in ucis:
+		move = next(move for move in position.generate_legal_moves() if move_to_uci(move) == uci)
+		moves.append(move)
+		position.push(move)
+
+	return moves
+
+
+def _annotated_game():
+	game = Game.from_moves(
+		_moves(Position().fen(), ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1b5']),
+		headers={'White': 'A "quoted" name', 'Black': 'B', 'ECO': 'C60'}, result='1-0'
+	)
+	game.comments[0] = ['Before the first move']
+	game.comments[3] = ['After Nf3']
+	game.nags[5] = [1]
+
+	# 2. Bc4 Bc5 instead of 2. Nf3
+	variation = Line()
+	variation.moves = ['Bc4', 'Bc5']
+	game.variations[2] = [variation]
+
+	return game
+
+
+def test_game_to_pgn():
+	game = Game.from_moves(_moves(Position().fen(), ['e2e4', 'e7e5', 'g1f3']), result='*')
+
+	assert game_to_pgn(game) == (
+		'[Event "?"]\n[Site "?"]\n[Date "????.??.??"]\n[Round "?"]\n'
+		'[White "?"]\n[Black "?"]\n[Result "*"]\n\n'
+		'1. e4 e5 2. Nf3 *\n\n'
+	)
+
+
+def test_annotations_and_variations():
+	tags, movetext = game_to_pgn(_annotated_game()).split('\n\n', 1)
+
+	assert tags.splitlines()[4:] == [
+		'[White "A \\"quoted\\" name"]', '[Black "B"]', '[Result "1-0"]', '[ECO "C60"]'
+	]
+	assert ' '.join(movetext.split()) == (
+		'{Before the first move} 1. e4 e5 2. Nf3 {After Nf3} (2. Bc4 Bc5) 2... Nc6 3. Bb5 $1 1-0'
+	)
+
+
+def test_black_to_move_from_fen():
+	game = Game.from_moves(_moves(ENDGAME_FEN, ['e8d7', 'e2e4']), ENDGAME_FEN, result='*')
+
+	text = game_to_pgn(game)
+	assert '[SetUp "1"]\n[FEN "4k3/8/8/8/8/8/4P3/4K3 b - - 0 40"]' in text
+	assert '40... Kd7 41. e4 *' in text
+
+
+def test_long_games_are_wrapped():
+	ucis = ['g1f3', 'g8f6', 'f3g1', 'f6g8']*20
+	text = game_to_pgn(Game.from_moves(_moves(Position().fen(), ucis)))
+
+	movetext = text.split('\n\n')[1]
+	assert len(movetext.splitlines()) > 1
+	assert all(len(line) <= LINE_LENGTH for line in movetext.splitlines())
+
+
+def test_round_trip(tmp_path):
+	games = [
+		_annotated_game(),
+		Game.from_moves(_moves(ENDGAME_FEN, ['e8d7', 'e2e4']), ENDGAME_FEN, result='1/2-1/2'),
+		Game.from_moves(_moves(Position().fen(), ['f2f3', 'e7e5', 'g2g4', 'd8h4']), result='0-1'),
+	]
+	path = tmp_path / 'games.pgn'
+
+	with PGNWriter(path, batch_size=2) as writer:
+		for game in games:
+			writer.write_game(game)
+		assert writer.games_written == 2
+
+	assert writer.games_written == 3
+
+	with PGNReader(path) as reader:
+		read_games = list(reader)
+
+	assert len(read_games) == len(games)
+	for game, read_game in zip(games, read_games):
+		assert all(read_game.headers[name] == value for name, value in game.headers.items())
+		assert read_game.result == game.result
+		assert read_game.moves == game.moves
+		assert read_game.comments == game.comments
+		assert read_game.nags == game.nags
+		assert {
+			index: [line.moves for line in lines] for index, lines in read_game.variations.items()
+		} == {
+			index: [line.moves for line in lines] for index, lines in game.variations.items()
+		}
+		assert game_to_pgn(read_game) == game_to_pgn(game)
+
+	assert read_games[2].moves[-1] == 'Qh4#'
+
+
+def test_write_to_open_file():
+	file = io.StringIO()
+	game = Game.from_moves(_moves(Position().fen(), ['d2d4']))
+
+	with PGNWriter(file) as writer:
+		writer.write_game(game)
+
+	assert file.getvalue() == game_to_pgn(game)
@@ -0,0 +1,112 @@
+import pytest
+
+from chess.chess_constants import SQUARE_NAMES
+from chess.position import Position, encode_move, move_to_uci
+from chess.polyglot import (
+	PolyglotBook, polyglot_key, encode_book_move, decode_book_move, write_book
+)
+
+
+# The positions and keys of the Polyglot book format description, with the moves that lead to them
+REFERENCE_KEYS = [
+	([], 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1', 0x463b96181691fc9c),
+	(['e2e4'], 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1', 0x823c9b50fd114196),
+	(
+		['e2e4', 'd7d5'],
+		'rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 2', 0x0756b94461c50fb0
+	),
+	(
+		['e2e4', 'd7d5', 'e4e5'],
+		'rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR b KQkq - 0 2', 0x662fafb965db29d4
+	),
+	(
+		['e2e4', 'd7d5', 'e4e5', 'f7f5'],
+		'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3', 0x22a48b5a8e47ff78
+	),
+	(
+		['e2e4', 'd7d5', 'e4e5', 'f7f5', 'e1e2'],
+		'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPPKPPP/RNBQ1BNR b kq - 1 3', 0x652a607ca3f242c1
+	),
+	(
+		['e2e4', 'd7d5', 'e4e5', 'f7f5', 'e1e2', 'e8f7'],
+		'rnbq1bnr/ppp1pkpp/8/3pPp2/8/8/PPPPKPPP/RNBQ1BNR w - - 2 4', 0x00fdd303c946bdd9
+	),
+	(
+		['a2a4', 'b7b5', 'h2h4', 'b5b4', 'c2c4'],
+		'rnbqkbnr/p1pppppp/8/8/PpP4P/8/1P1PPPP1/RNBQKBNR b KQkq c3 0 3', 0x3c8123ea7b067637
+	),
+	(
+		['a2a4', 'b7b5', 'h2h4', 'b5b4', 'c2c4', 'b4c3', 'a1a3'],
+		'rnbqkbnr/p1pppppp/8/8/P6P/R1p5/1P1PPPP1/1NBQKBNR b Kkq - 1 4', 0x5c3f9b829b279560
+	),
+]
+
+
+def _move(position, uci):
+	return next(move for move in position.generate_legal_moves() if move_to_uci(move) == uci)
+
+
+@pytest.mark.parametrize('ucis, fen, key', REFERENCE_KEYS, ids=[f'{key:016x}' for _, _, key in REFERENCE_KEYS])
+def test_reference_keys(ucis, fen, key):
+	assert polyglot_key(Position(fen)) == key
+
+	position = Position()
+	for uci in ucis:
+		position.push(_move(position, uci))
+
+	assert position.fen() == fen
+	assert polyglot_key(position) == key
+
+
+@pytest.mark.parametrize('fen, uci, book_uci', [
+	('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1', 'e1g1', 'e1h1'),
+	('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1', 'e1c1', 'e1a1'),
+	('r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1', 'e8g8', 'e8h8'),
+	('r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1', 'e8c8', 'e8a8'),
+	('4k3/P7/8/8/8/8/8/4K3 w - - 0 1', 'a7a8q', 'a7a8q'),
+	('4k3/8/8/8/8/8/8/4K3 w - - 0 1', 'e1d1', 'e1d1'),
+])
+def test_book_moves(fen, uci, book_uci):
+	position = Position(fen)
+	move = _move(position, uci)
+	book_move = encode_book_move(position, move)
+
+	# Polyglot squares count from a1, castling is the king taking its own rook
+	assert SQUARE_NAMES[((book_move >> 6) & 63) ^ 56] + SQUARE_NAMES[(book_move & 63) ^ 56] == book_uci[:4]
+	assert (book_move >> 12) & 7 == move >> 12
+
+	assert decode_book_move(position, book_move) == move
+
+
+def test_book(tmp_path):
+	position = Position()
+	e4 = _move(position, 'e2e4')
+	d4 = _move(position, 'd2d4')
+	illegal = encode_move(SQUARE_NAMES.index('e1'), SQUARE_NAMES.index('d1'))
+	key = polyglot_key(position)
+	path = tmp_path / 'book.bin'
+
+	count = write_book([
+		(key, encode_book_move(position, d4), 1, 0),
+		(key, encode_book_move(position, e4), 3, 0),
+		# Illegal moves and the entries of other positions are left out
+		(key, encode_book_move(position, illegal), 5, 0),
+		(key + 1, encode_book_move(position, e4), 1, 0),
+	], path)
+	assert count == 4
+
+	with PolyglotBook(path) as book:
+		assert len(book) == 4
+		assert [(entry.move, entry.weight) for entry in book.entries(position)] == [(e4, 3), (d4, 1)]
+		assert book.best_move(position) == e4
+		assert book.weighted_choice(position) in (e4, d4)
+		assert book.best_move(Position('4k3/8/8/8/8/8/8/4K3 w - - 0 1')) is None
+
+
+def test_empty_book(tmp_path):
+	path = tmp_path / 'empty.bin'
+	write_book([], path)
+
+	with PolyglotBook(path) as book:
+		assert len(book) == 0
+		assert book.best_move(Position()) is None
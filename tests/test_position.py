@@ -0,0 +1,45 @@
+import pytest
+
+from chess.perft import perft
+from chess.position import Position, move_to_uci
+
+
+@pytest.mark.parametrize('fen', [
+	# The square is on the wrong rank for the side to move
+	'4k3/8/8/3pP3/8/8/8/4K3 w - d3 0 1',
+	# No pawn stands in front of the square
+	'4k3/8/8/4P3/8/8/8/4K3 w - d6 0 1',
+	'4k3/8/8/8/4p3/8/8/4K3 b - e3 0 1',
+	# The square is taken
+	'4k3/8/3n4/3pP3/8/8/8/4K3 w - d6 0 1',
+])
+def test_impossible_en_passant_square_is_cleared(fen):
+	position = Position(fen)
+	fields = fen.split()
+	fields[3] = '-'
+
+	assert position.ep_square is None
+	assert position.fen() == ' '.join(fields)
+	assert position.key == Position(' '.join(fields)).key
+	assert perft(position, 2) > 0
+
+
+def test_en_passant_square_is_kept():
+	fen = '4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1'
+	position = Position(fen)
+
+	assert position.fen() == fen
+	assert 'e5d6' in [move_to_uci(move) for move in position.generate_legal_moves()]
+
+
+def test_push_and_pop_restore_the_position():
+	fen = '4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1'
+	position = Position(fen)
+	key = position.key
+
+	for move in list(position.generate_legal_moves()):
+		position.push(move)
+		position.pop()
+
+	assert position.fen() == fen
+	assert position.key == key
@@ -0,0 +1,79 @@
+import pytest
+
+from chess.perft import PERFT_SUITE
+from chess.position import Position, move_to_uci
+from chess.san import parse_san, move_to_san, san_moves
+
+
+def _move(position, uci):
+	return next(move for move in position.generate_legal_moves() if move_to_uci(move) == uci)
+
+
+@pytest.mark.parametrize('case', PERFT_SUITE, ids=[case.name for case in PERFT_SUITE])
+def test_round_trip(case):
+	position = Position(case.fen)
+
+	for move in list(position.generate_legal_moves()):
+		position.push(move)
+		sans = san_moves(position)
+
+		assert len(set(sans.values())) == len(sans)
+		for reply, san in sans.items():
+			assert move_to_san(position, reply) == san
+			assert parse_san(position, san) == reply
+
+		position.pop()
+
+
+@pytest.mark.parametrize('fen, uci, san', [
+	# Disambiguation by file, by rank and by both
+	('4k3/8/8/8/8/2N5/8/4K1N1 w - - 0 1', 'c3e2', 'Nce2'),
+	('4k3/8/8/8/8/2N5/8/4K1N1 w - - 0 1', 'g1e2', 'Nge2'),
+	('4k3/8/8/R7/8/8/8/R3K3 w - - 0 1', 'a1a3', 'R1a3'),
+	('4k3/8/8/R7/8/8/8/R3K3 w - - 0 1', 'a5a3', 'R5a3'),
+	('4k3/8/8/8/8/Q7/8/Q1Q1K3 w - - 0 1', 'a1b2', 'Qa1b2'),
+	('4k3/8/8/8/8/Q7/8/Q1Q1K3 w - - 0 1', 'c1b2', 'Qcb2'),
+	# Captures, en passant and promotions
+	('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', 'e5d6', 'exd6'),
+	('3r2k1/4P3/8/8/8/8/8/4K3 w - - 0 1', 'e7e8q', 'e8=Q+'),
+	('3r2k1/4P3/8/8/8/8/8/4K3 w - - 0 1', 'e7d8n', 'exd8=N'),
+	('3r2k1/4P3/8/8/8/8/8/4K3 w - - 0 1', 'e7d8r', 'exd8=R+'),
+	# Castling
+	('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1', 'e1g1', 'O-O'),
+	('r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1', 'e8c8', 'O-O-O'),
+	# Check and mate
+	('4k3/8/8/8/8/8/8/R3K3 w - - 0 1', 'a1a8', 'Ra8+'),
+	('rnbqkbnr/pppp1ppp/8/4p3/6P1/5P2/PPPPP2P/RNBQKBNR b KQkq - 0 2', 'd8h4', 'Qh4#'),
+])
+def test_san(fen, uci, san):
+	position = Position(fen)
+	move = _move(position, uci)
+
+	assert move_to_san(position, move) == san
+	assert san_moves(position)[move] == san
+	assert parse_san(position, san) == move
+
+
+@pytest.mark.parametrize('fen, san, uci', [
+	# Suffixes, annotations and other spellings are accepted
+	('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1', '0-0-0', 'e1c1'),
+	('3r2k1/4P3/8/8/8/8/8/4K3 w - - 0 1', 'e8Q', 'e7e8q'),
+	('4k3/8/8/8/8/2N5/8/4K1N1 w - - 0 1', 'Nc3e2!?', 'c3e2'),
+	('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', 'ed6', 'e5d6'),
+])
+def test_parse_other_spellings(fen, san, uci):
+	position = Position(fen)
+
+	assert parse_san(position, san) == _move(position, uci)
+
+
+@pytest.mark.parametrize('fen, san', [
+	('4k3/8/8/8/8/2N5/8/4K1N1 w - - 0 1', 'Ne2'),
+	('4k3/8/8/8/8/8/8/4K3 w - - 0 1', 'O-O'),
+	('4k3/8/8/8/8/8/8/4K3 w - - 0 1', 'Ke3'),
+	('4k3/8/8/8/8/8/8/4K3 w - - 0 1', 'Xe2'),
+	('3r2k1/4P3/8/8/8/8/8/4K3 w - - 0 1', 'e8'),
+])
+def test_parse_errors(fen, san):
+	with pytest.raises(ValueError):
+		parse_san(Position(fen), san)
@@ -0,0 +1,50 @@
+import pytest
+
+from chess.chess_constants import SQUARE_NAMES, PAWN
+from chess.engine.evaluation import evaluate, PIECE_VALUES
+from chess.engine.parallel import ParallelEngine
+from chess.engine.search import Engine, INFINITY, _is_capture, _order_moves
+from chess.polyglot import PolyglotBook, polyglot_key, encode_book_move, write_book
+from chess.position import Position, encode_move
+
+
+# Black has just played d7-d5, exd6 wins the pawn
+EN_PASSANT_FEN = '4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1'
+EN_PASSANT = encode_move(SQUARE_NAMES.index('e5'), SQUARE_NAMES.index('d6'))
+
+
+def test_en_passant_is_a_capture():
+	position = Position(EN_PASSANT_FEN)
+
+	assert _is_capture(position, EN_PASSANT)
+	assert _order_moves(position, list(position.generate_legal_moves()))[0] == EN_PASSANT
+
+
+def test_quiescence_searches_en_passant():
+	position = Position(EN_PASSANT_FEN)
+	score = Engine(1)._quiescence(position, -INFINITY, INFINITY, 0)
+
+	assert score > evaluate(position) + PIECE_VALUES[PAWN] // 2
+	assert position.fen() == EN_PASSANT_FEN
+
+
+def test_search_finds_mate_in_one():
+	result = Engine(1).search(Position('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1'), 3)
+
+	assert result.move == encode_move(SQUARE_NAMES.index('a1'), SQUARE_NAMES.index('a8'))
+
+
+@pytest.mark.parametrize('engine_class', [Engine, ParallelEngine])
+def test_book_moves_are_played(tmp_path, engine_class):
+	position = Position()
+	move = encode_move(SQUARE_NAMES.index('e2'), SQUARE_NAMES.index('e4'))
+	write_book([(polyglot_key(position), encode_book_move(position, move), 1, 0)], tmp_path / 'book.bin')
+
+	with PolyglotBook(tmp_path / 'book.bin') as book:
+		if engine_class is ParallelEngine:
+			with ParallelEngine(2, 1, book=book) as engine:
+				result = engine.search(position, 4)
+		else:
+			result = Engine(1, book=book).search(position, 4)
+
+	assert (result.move, result.depth) == (move, 0)